@@ -0,0 +1,3 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
@@ -0,0 +1,165 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Load test of the broadcast server : thousands of subscribers on a Unix socket, fed by one server thread.
+Subscribers run in a separate process and note when each press reaches them;
+on a machine with a single CPU they compete with the server, so also compare the CPU time of each flush with a frame.
+The latency of a press is measured from the moment the Core registered it to the moment a subscriber decoded it.
+Presses coalesced with a later press of the same board before reaching a subscriber are counted apart.
+Run with : python -m benchmarks.bench_broadcast [subscribers] [boards] [presses]
+"""
+
+import asyncio
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.harness import percentile
+from chessclock.common import Side
+from chessclock.config import Config
+from chessclock.core import Core
+from chessclock.net import BroadcastServer, decode_frame
+from chessclock.net.protocol import LENGTH
+
+FRAME_NS = 1_000_000_000 // 60
+BATCH = 50  # connections opened at once
+
+
+class Recorder(asyncio.Protocol):
+	"""
+	A minimal subscriber, noting when data reaches it.
+	Frames are only decoded once the test is over, so that subscribers sharing a CPU with the server
+	take as little time from it as possible.
+	"""
+
+	def __init__(self, done: asyncio.Event, remaining: list[int]):
+		self.received: list[tuple[int, bytes]] = []
+		self.done = done
+		self.remaining = remaining
+
+	def data_received(self, data: bytes) -> None:
+		self.received.append((time.perf_counter_ns(), data))
+
+	def seen(self) -> dict[tuple[int, int], int]:
+		"""
+		Decode every frame received.
+		:return: the time at which each (board, half-move) pair was first seen
+		"""
+		buffer = bytearray()
+		states = {}
+		seen = {}
+		for t, data in self.received:
+			buffer += data
+			while len(buffer) >= LENGTH.size:
+				length, = LENGTH.unpack_from(buffer)
+				if len(buffer) < LENGTH.size + length:
+					break
+				for board in decode_frame(bytes(buffer[LENGTH.size:LENGTH.size + length]), states):
+					seen.setdefault((board, states[board].half_moves), t)
+				del buffer[:LENGTH.size + length]
+		return seen
+
+	def connection_lost(self, exc: Exception | None) -> None:
+		self.remaining[0] -= 1
+		if not self.remaining[0]:
+			self.done.set()
+
+
+def subscribe(path: str, n: int, connected, results) -> None:
+	"""
+	Entry point of the subscriber process; returns once the server closes every connection.
+	:param path: the path of the socket of the server
+	:param n: the number of subscribers
+	:param connected: an event set once every subscriber is connected
+	:param results: the sending end of a pipe receiving, for each (board, half-move) pair, the list of times it was seen at
+	:return: None
+	"""
+	async def run() -> None:
+		loop = asyncio.get_running_loop()
+		done = asyncio.Event()
+		remaining = [n]
+		recorders = []
+		for i in range(0, n, BATCH):
+			pairs = await asyncio.gather(*(
+				loop.create_unix_connection(lambda: Recorder(done, remaining), path)
+				for _ in range(min(BATCH, n - i))
+			))
+			recorders.extend(protocol for _, protocol in pairs)
+		connected.set()
+		await done.wait()
+		seen: dict[tuple[int, int], list[int]] = {}
+		for r in recorders:
+			for key, t in r.seen().items():
+				seen.setdefault(key, []).append(t)
+		results.send(seen)
+
+	asyncio.run(run())
+
+
+def main(subscribers: int = 2000, boards: int = 16, presses: int = 200) -> None:
+	cores = [Core(Config(time_seconds=3600)) for _ in range(boards)]
+	for core in cores:
+		core.press(Side.R)
+	server = BroadcastServer(cores)
+	flushes: list[int] = []
+	flushes_cpu: list[int] = []
+	flush = server._flush
+
+	def timed_flush() -> None:
+		begin, begin_cpu = time.perf_counter_ns(), time.thread_time_ns()
+		flush()
+		flushes.append(time.perf_counter_ns() - begin)
+		flushes_cpu.append(time.thread_time_ns() - begin_cpu)
+
+	server._flush = timed_flush
+	path = str(Path(tempfile.mkdtemp()) / 'broadcast.sock')
+	server.serve_in_thread('unix:' + path, backlog=subscribers)
+	context = multiprocessing.get_context('spawn')
+	connected = context.Event()
+	results, sender = context.Pipe(duplex=False)
+	process = context.Process(target=subscribe, args=(path, subscribers, connected, sender))
+	process.start()
+	connected.wait()
+	while len(server.subscribers) < subscribers:
+		time.sleep(0.01)
+	rng = random.Random(0)
+	pressed: dict[tuple[int, int], int] = {}
+	flushes.clear()
+	flushes_cpu.clear()
+	cpu = time.process_time()
+	for _ in range(presses):
+		# a busy hall : about 20 presses per second across all boards
+		time.sleep(rng.uniform(0.02, 0.08))
+		board = rng.randrange(boards)
+		core = cores[board]
+		core.press(core.side)
+		pressed[(board, core.half_moves)] = core.stamp
+	time.sleep(0.1)
+	asyncio.run_coroutine_threadsafe(server.close(), server.loop).result()
+	seen = results.recv()
+	cpu = time.process_time() - cpu
+	process.join()
+	latencies = [t - stamp for key, stamp in pressed.items() for t in seen.get(key, ())]
+	ms = 1_000_000
+	print(f'subscribers               : {subscribers}')
+	print(f'boards                    : {boards}')
+	print(f'presses                   : {presses}')
+	print(f'deliveries                : {len(latencies)}')
+	print(f'coalesced                 : {subscribers * presses - len(latencies)}')
+	for p in (50, 90, 99, 100):
+		print(f'latency p{p:<3}              : {percentile(latencies, p) / ms:8.3f} ms')
+	print(f'within a 60 Hz frame      : {sum(v <= FRAME_NS for v in latencies) / len(latencies):8.2%}')
+	for p in (50, 99):
+		print(f'server flush p{p:<3}         : {percentile(flushes, p) / ms:8.3f} ms per frame')
+	for p in (50, 99):
+		print(f'server flush cpu p{p:<3}     : {percentile(flushes_cpu, p) / ms:8.3f} ms per frame')
+	print(f'server process cpu        : {cpu / presses * 1000:8.3f} ms per press')
+
+
+if __name__ == '__main__':
+	main(*map(int, sys.argv[1:]))
@@ -0,0 +1,97 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Micro-benchmarks of the hot paths of Core, run on every key press and every frame.
+Only uses the standard library.
+Run with : python -m benchmarks.bench_core [--update]
+"""
+
+from functools import partial
+from operator import attrgetter
+from timeit import Timer
+from typing import Callable
+
+from benchmarks.harness import Results, count_allocations, main
+from chessclock.common import Side
+from chessclock.config import Config
+from chessclock.core import CompactCore, Core, new_snapshot
+from chessclock.core.concurrent import ConcurrentCore
+
+NUMBER = 20_000
+REPEAT = 7
+
+
+def running_core() -> Core:
+	core = Core(Config(time_seconds=3600, increment_seconds=2))
+	core.press(Side.R)
+	return core
+
+
+def running_compact_core() -> CompactCore:
+	core = CompactCore(Config(time_seconds=3600, increment_seconds=2))
+	core.press(Side.R)
+	return core
+
+
+def running_concurrent_core() -> ConcurrentCore:
+	core = ConcurrentCore(Config(time_seconds=3600, increment_seconds=2))
+	core.press(Side.R)
+	return core
+
+
+def paused_core() -> Core:
+	core = running_core()
+	core.run = False
+	return core
+
+
+def alternate_presses(core: Core) -> Callable[[], None]:
+	# the side whose turn it is presses, so that every call is a full move with increment
+	return lambda: core.press(core.side)
+
+
+def read(name: str, core: Core) -> Callable[[], object]:
+	return partial(attrgetter(name), core)
+
+
+CASES: dict[str, Callable[[], Callable[[], object]]] = {
+	'press': lambda: alternate_presses(running_core()),
+	'times': lambda: read('times', running_core()),
+	'flagged': lambda: read('flagged', running_core()),
+	'describe': lambda: read('describe', running_core()),
+	'update_times': lambda: running_core()._update_times,
+	'swap_sides': lambda: paused_core().swap_sides,
+	'add_time': lambda: partial(running_core().add_time, Side.L, 0),
+	'toggle_run': lambda: paused_core().toggle_run,
+	'compact_press': lambda: alternate_presses(running_compact_core()),
+	'compact_times': lambda: read('times', running_compact_core()),
+	'compact_snapshot_into': lambda: partial(running_compact_core().snapshot_into, new_snapshot()),
+	# uncontended : the cost of the lock for operations, and of the sequence lock for reads
+	'concurrent_press': lambda: alternate_presses(running_concurrent_core()),
+	'concurrent_times': lambda: read('times', running_concurrent_core()),
+	'concurrent_snapshot_into': lambda: partial(running_concurrent_core().snapshot_into, new_snapshot()),
+}
+
+
+def measure() -> Results:
+	results: Results = {}
+	for name, build in CASES.items():
+		op = build()
+		ns = min(Timer(op).repeat(repeat=REPEAT, number=NUMBER)) / NUMBER * 10 ** 9
+		blocks, peak = count_allocations(build(), NUMBER // 10)
+		results[name] = {
+			'ns_per_op': ns,
+			'alloc_blocks': blocks,
+			'alloc_peak_bytes': peak,
+		}
+	return results
+
+
+if __name__ == '__main__':
+	main('bench_core', measure, {
+		'ns_per_op': 0.5,
+		'alloc_blocks': 0.0,
+		'alloc_peak_bytes': 0.1,
+	})
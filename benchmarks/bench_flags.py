@@ -0,0 +1,74 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Compare flag detection by a FlagScheduler with polling Core.flagged on every clock, for many clocks.
+Run with : python -m benchmarks.bench_flags [clocks]
+"""
+
+import random
+import sys
+import time
+
+from chessclock.common import Side, SECOND
+from chessclock.config import Config
+from chessclock.core import Core, VirtualClock
+from chessclock.core.flags import FlagScheduler
+
+
+def per_call(step, n: int) -> float:
+	"""
+	Measure the average duration of a call.
+	:param step: a callable taking no arguments
+	:param n: the number of calls
+	:return: microseconds per call
+	"""
+	begin = time.perf_counter()
+	for _ in range(n):
+		step()
+	return (time.perf_counter() - begin) / n * 1e6
+
+
+def main(clocks: int = 50_000) -> None:
+	rng = random.Random(0)
+	clock = VirtualClock()
+	config = Config(time_seconds=300)
+	cores = [Core(config, clock) for _ in range(clocks)]
+	for core in cores:
+		core.press(Side.R)
+	fired = []
+	scheduler = FlagScheduler(clock)
+	begin = time.perf_counter()
+	for core in cores:
+		scheduler.attach(core, lambda c, side, t: fired.append(t))
+	attach = (time.perf_counter() - begin) / clocks * 1e6
+
+	def press() -> None:
+		clock.advance(rng.randint(0, SECOND // 1000))
+		core = cores[rng.randrange(clocks)]
+		core.press(core.side)
+
+	plain = [Core(config, clock) for _ in range(1000)]
+	for core in plain:
+		core.press(Side.R)
+
+	def press_plain() -> None:
+		clock.advance(rng.randint(0, SECOND // 1000))
+		core = plain[rng.randrange(len(plain))]
+		core.press(core.side)
+
+	print(f'clocks                          : {clocks}')
+	print(f'attach                          : {attach:10.2f} us per clock')
+	print(f'press, without scheduler        : {per_call(press_plain, 100_000):10.2f} us')
+	print(f'press, with scheduler           : {per_call(press, 100_000):10.2f} us')
+	print(f'poll, nothing due               : {per_call(scheduler.poll, 100_000):10.2f} us')
+	print(f'poll every Core.flagged         : {per_call(lambda: [c.flagged for c in cores], 3) * 1e-3:10.2f} ms')
+	clock.advance(600 * SECOND)
+	begin = time.perf_counter()
+	n = scheduler.poll()
+	print(f'fire every flag                 : {(time.perf_counter() - begin) / n * 1e6:10.2f} us per flag ({n} flags)')
+
+
+if __name__ == '__main__':
+	main(*map(int, sys.argv[1:]))
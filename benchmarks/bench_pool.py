@@ -0,0 +1,67 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Compare memory use and update throughput of one Core per board against a single ClockPool.
+Run with : python -m benchmarks.bench_pool [boards]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from chessclock.common import Side
+from chessclock.config import Config
+from chessclock.core import ClockPool, Core
+
+
+def measure_memory(build) -> tuple[object, int]:
+	"""
+	Measure the memory allocated while building an object.
+	:param build: a callable taking no arguments
+	:return: a tuple (built object, allocated bytes)
+	"""
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	obj = build()
+	after = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	return obj, after - before
+
+
+def measure_rate(step, boards: int, min_seconds: float = 1.0) -> float:
+	"""
+	Measure how many board updates per second a step achieves.
+	:param step: a callable updating every board once
+	:param boards: the number of boards updated by each step
+	:param min_seconds: minimum duration of the measurement
+	:return: board updates per second
+	"""
+	runs = 0
+	begin = time.perf_counter()
+	elapsed = 0.0
+	while elapsed < min_seconds:
+		step()
+		runs += 1
+		elapsed = time.perf_counter() - begin
+	return runs * boards / elapsed
+
+
+def main(boards: int = 10_000) -> None:
+	cores, core_bytes = measure_memory(lambda: [Core(Config()) for _ in range(boards)])
+	pool, pool_bytes = measure_memory(lambda: ClockPool(boards, Config()))
+	for i, core in enumerate(cores):
+		core.press(Side.L)
+		pool.press(i, Side.L)
+	core_rate = measure_rate(lambda: [c.times for c in cores], boards)
+	pool_rate = measure_rate(pool.times, boards)
+	print(f'boards                     : {boards}')
+	print(f'Core      bytes per board  : {core_bytes / boards:10.1f}')
+	print(f'ClockPool bytes per board  : {pool_bytes / boards:10.1f}')
+	print(f'Core      updates / second : {core_rate:14,.0f}')
+	print(f'ClockPool updates / second : {pool_rate:14,.0f}')
+
+
+if __name__ == '__main__':
+	main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,127 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Soak benchmark of the frame rate policies of the user interface, rendered offscreen with pyglet's headless mode (EGL).
+Scripted games are played on a virtual clock, and the user interface wakes up exactly when its policy would have it
+redraw, or when a key is pressed : the CPU time it takes, scaled to an hour of play, is what the clock costs a laptop
+running on battery. Each frame is waited for (glFinish), so that the work of the OpenGL driver is counted as well :
+all of it when rendering in software (llvmpipe), which is then most of the cost of a frame.
+Run with : python -m benchmarks.bench_power [--update]
+"""
+
+import pyglet
+
+# must be set before pyglet creates its first window, hence before importing chessclock
+pyglet.options['headless'] = True
+
+from time import process_time_ns
+from typing import Callable
+
+from benchmarks.harness import Results, main
+from chessclock.common import Side, SECOND, MINUTE, HOUR
+from chessclock.config import Action, Config, FRAME_RATES
+from chessclock.core import Core, VirtualClock
+from chessclock.themes import get_theme, register_local_themes
+from chessclock.ui import UI, Interface
+
+SIZE = 640, 360
+SOAK_NS = MINUTE  # of simulated play per scenario, scaled to an hour : scenarios repeat themselves
+THEMES = 'default', 'neon'
+
+
+class CoreInterface(Interface):
+	"""
+	An interface to a core running on a virtual clock.
+	"""
+
+	def __init__(self, core: Core):
+		self.core = core
+
+	def get_base_time_ns(self) -> dict[Side, int]:
+		return {Side.L: self.core.config.time_l * SECOND, Side.R: self.core.config.time_r * SECOND}
+
+	def get_increment_ns(self) -> dict[Side, int]:
+		return {Side.L: self.core.config.increment_l * SECOND, Side.R: self.core.config.increment_r * SECOND}
+
+	def get_current_times_ns(self) -> dict[Side, int]:
+		return self.core.times
+
+	def get_current_side(self) -> Side | None:
+		return self.core.side
+
+	def is_running(self) -> bool:
+		return self.core.run
+
+	def get_action_map(self) -> dict[Action, Callable[[], None]]:
+		return {}
+
+
+SCENARIOS: dict[str, tuple[int, int, int | None]] = {
+	# time and increment of both sides in seconds, nanoseconds between two presses (None : never started)
+	'paused': (15 * 60, 10, None),  # waiting for the round to start
+	'classical': (90 * 60, 30, 150 * SECOND),  # whole seconds shown
+	'scramble': (30, 2, 2 * SECOND),  # hundredths shown, the increment keeping both sides at 30 seconds
+}
+
+
+def soak(theme_name: str, policy: str, base: int, increment: int, press_every: int | None) -> tuple[int, int]:
+	"""
+	Play a scenario for SOAK_NS of simulated time.
+	:param theme_name: the name of the theme
+	:param policy: the frame rate policy
+	:param base: the time of both sides, in seconds
+	:param increment: the increment of both sides, in seconds
+	:param press_every: the time between two presses, in nanoseconds, or None if the clock is never started
+	:return: a tuple (frames drawn, CPU time spent, in nanoseconds)
+	"""
+	clock = VirtualClock()
+	core = Core(Config(time_l=base, time_r=base, increment_l=increment, increment_r=increment), clock)
+	ui = UI(CoreInterface(core), theme=get_theme(theme_name), size=SIZE, frame_rate=policy)
+	ui.on_resize(*SIZE)
+	ui.prewarm_glyphs()
+	elapsed, frames = 0, 0
+	next_press = 0 if press_every is not None else None
+	begin = process_time_ns()
+	while elapsed < SOAK_NS:
+		delay = ui.redraw.next_delay_ns(core.times, core.side, core.run)
+		wake = SOAK_NS if delay is None else min(SOAK_NS, elapsed + max(1, delay))
+		if next_press is not None and next_press <= wake:
+			clock.advance(next_press - elapsed)
+			elapsed = next_press
+			core.press(core.side or Side.R)  # the first press starts the clock of the left side
+			next_press += press_every
+		else:
+			clock.advance(wake - elapsed)
+			elapsed = wake
+		if elapsed < SOAK_NS:
+			ui.switch_to()
+			ui.on_draw()  # events are queued until the pyglet event loop runs, so call the handler directly
+			ui.flip()
+			pyglet.gl.glFinish()
+			frames += 1
+	spent = process_time_ns() - begin
+	ui.close()
+	return frames, spent
+
+
+def measure() -> Results:
+	register_local_themes(quiet=True)
+	results: Results = {}
+	for theme_name in THEMES:
+		for scenario_name, scenario in SCENARIOS.items():
+			for policy in FRAME_RATES:
+				frames, spent = soak(theme_name, policy, *scenario)
+				results[f'{theme_name}/{scenario_name}/{policy}'] = {
+					'frames_per_hour': frames * HOUR / SOAK_NS,
+					'cpu_s_per_hour': spent * HOUR / SOAK_NS / SECOND,
+				}
+	return results
+
+
+if __name__ == '__main__':
+	main('bench_power', measure, {
+		'frames_per_hour': 0.0,
+		'cpu_s_per_hour': 0.5,
+	})
@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Measure how many recorded games per second the replay engine processes, in one process and across a pool.
+Run with : python -m benchmarks.bench_replay [games] [processes]
+"""
+
+import os
+import random
+import sys
+import time
+
+from chessclock.common import Side, SECOND
+from chessclock.core import Op
+from chessclock.core.replay import event, replay_games
+
+CONTROLS = [(180, 180, 2, 2), (300, 300, 0, 0), (600, 600, 5, 5)]
+
+
+def random_game(rng: random.Random, half_moves: int = 80) -> tuple:
+	"""
+	Build a plausible recorded game : a few pauses and added time among the presses.
+	:param rng: the random number generator
+	:param half_moves: the number of half-moves of the game
+	:return: a tuple (time control, events)
+	"""
+	events = [event(0, Op.PRESS, Side.R)]
+	t = 0
+	side = Side.L
+	for _ in range(half_moves):
+		t += rng.randint(SECOND // 2, 10 * SECOND)
+		match rng.randrange(40):
+			case 0:
+				events.append(event(t, Op.RUN, arg=0))
+				t += rng.randint(SECOND, 60 * SECOND)
+				events.append(event(t, Op.RUN, arg=1))
+			case 1:
+				events.append(event(t, Op.ADD_TIME, side.opposite, 15))
+		events.append(event(t, Op.PRESS, side))
+		side = side.opposite
+	return rng.choice(CONTROLS), events
+
+
+def measure(games: list, processes: int) -> float:
+	"""
+	Replay every game once.
+	:param games: the games
+	:param processes: the number of worker processes
+	:return: games replayed per second
+	"""
+	begin = time.perf_counter()
+	for _ in replay_games(games, processes, chunksize=max(1, len(games) // (8 * processes))):
+		pass
+	return len(games) / (time.perf_counter() - begin)
+
+
+def main(n: int = 20_000, processes: int = len(os.sched_getaffinity(0))) -> None:
+	rng = random.Random(0)
+	games = [random_game(rng) for _ in range(n)]
+	print(f'games                  : {n} (80 half-moves each)')
+	print(f'1 process              : {measure(games, 1):10.0f} games/s')
+	if processes > 1:
+		print(f'{processes:<2} processes           : {measure(games, processes):10.0f} games/s')
+
+
+if __name__ == '__main__':
+	main(*map(int, sys.argv[1:]))
@@ -0,0 +1,81 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Cold start benchmark : every run starts a fresh interpreter, and times each step from the import of the clock logic
+to the first frame, drawn offscreen with pyglet's headless mode (EGL).
+Runs fail if loading the clock logic loads pyglet.
+Run with : python -m benchmarks.bench_startup [--update]
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.harness import Results, main, percentile
+
+RUNS = 9
+ROOT = Path(__file__).parent.parent
+
+# run with python -c, so that nothing but the interpreter itself is loaded before the clock
+CHILD = '''
+import time
+t = [time.perf_counter_ns()]
+import sys
+import chessclock.core, chessclock.config
+t.append(time.perf_counter_ns())
+assert 'pyglet' not in sys.modules, 'loading the clock logic loads pyglet'
+import pyglet
+pyglet.options['headless'] = True
+from chessclock.ui import UI
+from chessclock.default_interface import DefaultInterface
+t.append(time.perf_counter_ns())
+sys.argv = ['chessclock']
+interface = DefaultInterface()
+ui = UI(interface, size=(1280, 720))
+ui.on_resize(1280, 720)
+t.append(time.perf_counter_ns())
+ui.switch_to()
+ui.on_draw()
+ui.flip()
+t.append(time.perf_counter_ns())
+pyglet.clock.tick()  # what was scheduled to run after the first frame
+t.append(time.perf_counter_ns())
+interface.core.add_time(None, 3456)  # show digits that the first frame did not
+ui.on_draw()
+ui.flip()
+t.append(time.perf_counter_ns())
+print(*t)
+'''
+
+STEPS = ('interpreter', 'import_logic', 'import_ui', 'window', 'first_frame', 'idle_work', 'new_digits_frame')
+
+
+def run() -> list[int]:
+	"""
+	Start the clock in a new interpreter.
+	:return: the time at which the interpreter was started, followed by the time at the end of every step, in nanoseconds
+	"""
+	begin = time.perf_counter_ns()  # CLOCK_MONOTONIC on Linux, shared with the child
+	out = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+	return [begin, *map(int, out.split())]
+
+
+def measure() -> Results:
+	runs = [run() for _ in range(RUNS)]
+	results: Results = {}
+	for i, step in enumerate(STEPS):
+		samples = [(r[i + 1] - r[i]) / 1e6 for r in runs]
+		results[step] = {'median_ms': percentile(samples, 50), 'max_ms': max(samples)}
+	totals = [(r[STEPS.index('first_frame') + 1] - r[0]) / 1e6 for r in runs]
+	results['launch_to_first_frame'] = {'median_ms': percentile(totals, 50), 'max_ms': max(totals)}
+	return results
+
+
+if __name__ == '__main__':
+	main('bench_startup', measure, {
+		'median_ms': 0.5,
+		'max_ms': 2.0,
+	})
@@ -0,0 +1,134 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Frame-time benchmark of the user interface, rendered offscreen with pyglet's headless mode (EGL).
+Every registered theme is drawn through scripted game scenarios.
+Run with : python -m benchmarks.bench_ui [--update]
+"""
+
+import pyglet
+
+# must be set before pyglet creates its first window, hence before importing chessclock
+pyglet.options['headless'] = True
+
+from time import perf_counter_ns
+from typing import Callable
+
+from benchmarks.harness import Results, count_allocations, main, percentile
+from chessclock.common import Side, SECOND, MINUTE
+from chessclock.config import Action
+from chessclock.themes import get_theme, list_themes, register_local_themes
+from chessclock.ui import UI, Interface
+
+SIZE = 1280, 720
+FRAME_NS = SECOND // 60
+FRAMES = 600
+
+
+class ScriptedInterface(Interface):
+	"""
+	An interface whose state is set by the benchmark before each frame.
+	"""
+
+	def __init__(self, base: int):
+		self.base = base
+		self.times: dict[Side, int] = {s: base for s in Side}
+		self.side: Side | None = None
+		self.running: bool = False
+
+	def get_base_time_ns(self) -> dict[Side, int]:
+		return {s: self.base for s in Side}
+
+	def get_increment_ns(self) -> dict[Side, int]:
+		return {s: 2 * SECOND for s in Side}
+
+	def get_current_times_ns(self) -> dict[Side, int]:
+		return self.times.copy()
+
+	def get_current_side(self) -> Side | None:
+		return self.side
+
+	def is_running(self) -> bool:
+		return self.running
+
+	def get_action_map(self) -> dict[Action, Callable[[], None]]:
+		return {}
+
+
+def scenario(base: int, running: bool, press_every: int) -> Callable[[ScriptedInterface, int], None]:
+	"""
+	Build a game scenario.
+	:param base: starting time of both sides, in nanoseconds
+	:param running: whether the clock runs during the scenario
+	:param press_every: number of frames between two presses
+	:return: a callable updating an interface to the state of a given frame
+	"""
+	def step(interface: ScriptedInterface, frame: int) -> None:
+		if frame == 0:
+			interface.times = {s: base for s in Side}
+			interface.side = Side.L if running else None
+			interface.running = running
+		elif running:
+			side = interface.side
+			interface.times[side] = max(0, interface.times[side] - FRAME_NS)
+			if frame % press_every == 0:
+				interface.side = side.opposite
+	return step
+
+
+SCENARIOS: dict[str, tuple[int, Callable[[ScriptedInterface, int], None]]] = {
+	'paused': (10 * MINUTE, scenario(10 * MINUTE, False, 1)),
+	'blitz': (3 * MINUTE, scenario(3 * MINUTE, True, 180)),
+	'scramble': (20 * SECOND, scenario(20 * SECOND, True, 45)),
+	'flagged': (FRAME_NS, scenario(FRAME_NS, True, FRAMES + 1)),
+}
+
+
+def measure() -> Results:
+	register_local_themes(quiet=True)
+	results: Results = {}
+	for theme_name in list_themes():
+		for scenario_name, (base, step) in SCENARIOS.items():
+			interface = ScriptedInterface(base)
+			ui = UI(interface, theme=get_theme(theme_name), size=SIZE)
+			ui.on_resize(*SIZE)
+			ui.prewarm_glyphs()  # the event loop runs it right after the first frame
+			frame = 0
+
+			def draw() -> None:
+				nonlocal frame
+				step(interface, frame % FRAMES)
+				frame += 1
+				ui.switch_to()
+				ui.on_draw()  # events are queued until the pyglet event loop runs, so call the handler directly
+				ui.flip()
+
+			durations = []
+			updates = ui.widget_updates
+			for _ in range(FRAMES):
+				begin = perf_counter_ns()
+				draw()
+				durations.append(perf_counter_ns() - begin)
+			updates = ui.widget_updates - updates
+			blocks, peak = count_allocations(draw, FRAMES // 4)
+			ui.close()
+			results[f'{theme_name}/{scenario_name}'] = {
+				'frame_p50_us': percentile(durations, 50) / 1000,
+				'frame_p99_us': percentile(durations, 99) / 1000,
+				'alloc_blocks': blocks,
+				'alloc_peak_bytes': peak,
+				'widget_updates': updates / FRAMES,
+			}
+	return results
+
+
+if __name__ == '__main__':
+	main('bench_ui', measure, {
+		'frame_p50_us': 0.75,
+		'frame_p99_us': 3.0,
+		'alloc_blocks': 0.25,
+		'alloc_peak_bytes': 0.25,
+		'widget_updates': 0.0,
+	})
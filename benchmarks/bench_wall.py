@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Frame-time benchmark of the tournament wall display, rendered offscreen with pyglet's headless mode (EGL).
+Hundreds of boards are played through scripted scenarios, one frame per 60th of a second of game time.
+Updating the widgets is timed apart from the whole frame, whose drawing time mostly depends on the OpenGL driver.
+Run with : python -m benchmarks.bench_wall [--update]
+"""
+
+import pyglet
+
+# must be set before pyglet creates its first window, hence before importing chessclock
+pyglet.options['headless'] = True
+
+from time import perf_counter_ns
+
+from benchmarks.harness import Results, main, percentile
+from chessclock.common import Side, SECOND
+from chessclock.config import Config
+from chessclock.core import CompactCore, VirtualClock
+from chessclock.ui.wall import WallDisplay
+
+SIZE = 1920, 1080
+BOARDS = 500
+FRAME_NS = SECOND // 60
+FRAMES = 300
+
+SCENARIOS: dict[str, tuple[int, int]] = {
+	# starting time of every board in seconds, frames between two moves of a board
+	'classical': (90 * 60, 20 * 60),
+	'blitz': (3 * 60, 5 * 60),
+	'scramble': (30, 60),  # every board shows hundredths
+}
+
+
+def measure() -> Results:
+	results: Results = {}
+	for name, (base, press_every) in SCENARIOS.items():
+		clock = VirtualClock()
+		boards = [CompactCore(Config(time_l=base, time_r=base), clock) for _ in range(BOARDS)]
+		for board in boards:
+			board.press(Side.R)
+			clock.advance(1)  # boards do not all change at the same frame
+		wall = WallDisplay(boards, size=SIZE)
+		wall.on_resize(*SIZE)
+		wall.switch_to()
+		wall.on_draw()  # the first frame lays every label out
+		wall.flip()
+		updating, frames = [], []
+		updates = wall.widget_updates
+		for frame in range(FRAMES):
+			clock.advance(FRAME_NS)
+			for b in range(frame * BOARDS // press_every, (frame + 1) * BOARDS // press_every):
+				board = boards[b % BOARDS]
+				board.press(board.side)
+			begin = perf_counter_ns()
+			wall.switch_to()
+			wall.update()
+			updated = perf_counter_ns()
+			wall.on_draw()  # nothing left to update
+			wall.flip()
+			end = perf_counter_ns()
+			updating.append(updated - begin)
+			frames.append(end - begin)
+		updates = wall.widget_updates - updates
+		wall.close()
+		results[name] = {
+			'update_p50_ms': percentile(updating, 50) / 1e6,
+			'update_p99_ms': percentile(updating, 99) / 1e6,
+			'frame_p50_ms': percentile(frames, 50) / 1e6,
+			'frame_p99_ms': percentile(frames, 99) / 1e6,
+			'widget_updates': updates / FRAMES,
+		}
+	return results
+
+
+if __name__ == '__main__':
+	main('bench_wall', measure, {
+		'update_p50_ms': 0.5,
+		'update_p99_ms': 1.0,
+		'frame_p50_ms': 0.5,
+		'frame_p99_ms': 1.0,
+		'widget_updates': 0.0,
+	})
@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Small helpers shared by the benchmark suites : percentiles, allocation counting,
+and comparison of results against baselines committed in benchmarks/baselines.
+"""
+
+import json
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Callable, Sequence
+
+BASELINES = Path(__file__).parent / 'baselines'
+SLACK = 1.0  # absolute margin added to every limit, so that metrics with a baseline of zero may still be noisy
+
+Results = dict[str, dict[str, float]]
+
+
+def percentile(samples: Sequence[float], p: float) -> float:
+	"""
+	Get a percentile of a set of samples, using the nearest-rank method.
+	:param samples: the samples
+	:param p: the percentile, between 0 and 100
+	:return: the smallest sample that is greater or equal to p percent of all samples
+	"""
+	if not samples:
+		raise ValueError
+	ordered = sorted(samples)
+	rank = max(1, -(-len(ordered) * p // 100))
+	return ordered[int(rank) - 1]
+
+
+def count_allocations(step: Callable[[], object], runs: int) -> tuple[float, float]:
+	"""
+	Measure the memory allocated by a function using tracemalloc.
+	:param step: a callable taking no arguments
+	:param runs: the number of calls to measure
+	:return: a tuple (memory blocks still allocated per call, peak bytes allocated during a call)
+	"""
+	step()  # warm up caches before measuring
+	tracemalloc.start()
+	try:
+		peak = 0
+		blocks = 0
+		for _ in range(runs):
+			before = sys.getallocatedblocks()
+			tracemalloc.reset_peak()
+			current = tracemalloc.get_traced_memory()[0]
+			step()
+			peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+			blocks += sys.getallocatedblocks() - before
+	finally:
+		tracemalloc.stop()
+	return blocks / runs, peak
+
+
+def compare(results: Results, baseline: Results, tolerances: dict[str, float]) -> list[str]:
+	"""
+	Compare benchmark results against a baseline.
+	A metric regresses when it exceeds its baseline value by more than its relative tolerance (plus SLACK).
+	Metrics without a tolerance must not exceed their baseline at all.
+	:param results: the measured metrics of each benchmark case
+	:param baseline: the reference metrics of each benchmark case
+	:param tolerances: maximum relative increase allowed for each metric name
+	:return: a description of every regression, empty if there are none
+	"""
+	regressions = []
+	for case, metrics in results.items():
+		for metric, value in metrics.items():
+			reference = baseline.get(case, {}).get(metric)
+			if reference is None:
+				continue
+			limit = reference * (1 + tolerances.get(metric, 0.0)) + SLACK
+			if value > limit:
+				regressions.append(f'{case} {metric} : {value:.6g} > {limit:.6g} (baseline {reference:.6g})')
+	return regressions
+
+
+def report(results: Results) -> None:
+	"""
+	Print benchmark results as a table.
+	:param results: the measured metrics of each benchmark case
+	:return: None
+	"""
+	metrics = sorted({m for r in results.values() for m in r})
+	width = max(map(len, results), default=0)
+	print(' '.join([' ' * width] + [f'{m:>16}' for m in metrics]))
+	for case, values in results.items():
+		print(' '.join([f'{case:<{width}}'] + [f'{values.get(m, float("nan")):>16.6g}' for m in metrics]))
+
+
+def main(name: str, measure: Callable[[], Results], tolerances: dict[str, float]) -> None:
+	"""
+	Command line entry point of a benchmark suite.
+	Runs the suite, prints its results and compares them against the baseline of the suite,
+	exiting with a non-zero status when a regression is found.
+	:param name: the name of the suite, also the name of its baseline file
+	:param measure: a callable running the suite and returning its results
+	:param tolerances: maximum relative increase allowed for each metric name
+	:return: None
+	"""
+	parser = ArgumentParser(prog=f'benchmarks.{name}')
+	parser.add_argument('-u', '--update', action='store_true', help='overwrite the baseline with the new results')
+	parser.add_argument('-s', '--scale', type=float, default=1.0, help='multiply every tolerance by this factor')
+	args = parser.parse_args()
+	results = measure()
+	report(results)
+	path = BASELINES / f'{name}.json'
+	if args.update or not path.exists():
+		BASELINES.mkdir(exist_ok=True)
+		path.write_text(json.dumps(results, indent='\t', sort_keys=True) + '\n')
+		print(f'\nbaseline written to {path}')
+		return
+	regressions = compare(results, json.loads(path.read_text()), {m: t * args.scale for m, t in tolerances.items()})
+	if regressions:
+		print('\nREGRESSIONS :', *regressions, sep='\n')
+		sys.exit(1)
+	print('\nno regression')
@@ -2,15 +2,61 @@
 #
 # SPDX-License-Identifier: GPL-3.0-only
 
+from importlib import import_module
+
 from chessclock.config import parse_args, Action
 from chessclock.core import Core, Side, SECOND
-from chessclock.themes import register_local_themes
-from chessclock.ui import UI
-from .default_interface import DefaultInterface
+
+# imported on first access : the user interface loads pyglet, which connects to the display,
+# and networking loads asyncio, none of which a program only using the clock logic needs
+_LAZY: dict[str, str] = {
+	'register_local_themes': 'chessclock.themes',
+	'BroadcastServer': 'chessclock.net',
+	'SharedStateExporter': 'chessclock.net',
+	'UI': 'chessclock.ui',
+	'TerminalUI': 'chessclock.ui',
+	'LatencyProbe': 'chessclock.ui',
+	'InputBackend': 'chessclock.input',
+	'DefaultInterface': 'chessclock.default_interface',
+}
+
+
+def __getattr__(name: str):
+	if name in _LAZY:
+		return getattr(import_module(_LAZY[name]), name)
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 def main():
-	register_local_themes()
+	from .default_interface import DefaultInterface
 	interface = DefaultInterface()
-	app = UI(interface)
+	config = interface.core.config
+	if config.broadcast:
+		from chessclock.net import BroadcastServer
+		BroadcastServer(interface.core).serve_in_thread(config.broadcast)
+	exporter = None
+	if config.shared_memory:
+		from chessclock.net import SharedStateExporter
+		exporter = SharedStateExporter(interface.core, config.shared_memory)
+	backend = None
+	if config.terminal:
+		# pyglet is never loaded : it cannot start without a display server
+		from chessclock.ui.terminal import TerminalUI
+		app = TerminalUI(interface, frame_rate=config.frame_rate)
+	else:
+		from chessclock.ui import UI, LatencyProbe
+		probe = LatencyProbe(interface.get_time_source()) if config.show_latency else None
+		if config.devices:
+			from chessclock.input import InputBackend, EvdevDevice
+			backend = InputBackend()
+			for path in config.devices:
+				backend.add_device(EvdevDevice.open(path, interface.get_time_source()), config.keymap, interface)
+			backend.start()
+		app = UI(interface, latency_probe=probe, frame_rate=config.frame_rate, input_backend=backend)
 	app.run()
+	if backend is not None:
+		backend.close()
+	if exporter is not None:
+		exporter.close()
+	if interface.journal is not None:
+		interface.journal.close()
@@ -5,3 +5,4 @@
 from .constants import *
 from .format import *
 from .side import Side
+from .histogram import RollingHistogram
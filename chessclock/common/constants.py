@@ -4,7 +4,7 @@
 
 """
 A few constants representing the values of common time units in nanoseconds.
-Designed to work with time.time_ns().
+Designed to work with the nanosecond readings of time sources (see chessclock.core.TimeSource).
 """
 
 CENT: int = 10 ** 7
@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from array import array
+
+
+class RollingHistogram:
+	"""
+	A histogram of the most recent samples of a non-negative integer quantity, such as a latency in nanoseconds.
+
+	Buckets are log-linear : every power of two is split into `sub_buckets` buckets of equal width,
+	so the relative error of a percentile is below 1 / sub_buckets, whatever the magnitude of the samples.
+	Recording a sample is O(1) and does not allocate; samples older than the window are evicted.
+	"""
+
+	def __init__(self, window: int = 4096, sub_bits: int = 4):
+		"""
+		RollingHistogram constructor.
+		:param window: the number of most recent samples kept in the histogram
+		:param sub_bits: base 2 logarithm of the number of buckets per power of two
+		"""
+		if not isinstance(window, int) or not isinstance(sub_bits, int):
+			raise TypeError
+		if window <= 0 or not 0 < sub_bits < 16:
+			raise ValueError
+		self.window: int = window
+		self.sub_bits: int = sub_bits
+		self.sub_buckets: int = 1 << sub_bits
+		self.counts: array = array('q', bytes(8 * (64 - sub_bits + 1) * self.sub_buckets))
+		self._ring: array = array('q', bytes(8 * window))
+		self._next: int = 0
+		self.count: int = 0
+
+	def bucket(self, value: int) -> int:
+		"""
+		Get the bucket of a value.
+		:param value: a non-negative integer
+		:return: the index of the bucket holding the value
+		"""
+		shift = value.bit_length() - self.sub_bits - 1
+		if shift <= 0:
+			return value
+		return (shift << self.sub_bits) + (value >> shift)
+
+	def upper_bound(self, bucket: int) -> int:
+		"""
+		Get the largest value held by a bucket.
+		:param bucket: the index of the bucket
+		:return: the largest value that falls in the bucket
+		"""
+		shift = (bucket >> self.sub_bits) - 1
+		if shift <= 0:
+			return bucket
+		mantissa = bucket - (shift << self.sub_bits)
+		return ((mantissa + 1) << shift) - 1
+
+	def record(self, value: int) -> None:
+		"""
+		Add a sample to the histogram, evicting the oldest sample if the window is full.
+		:param value: the sample; negative values are counted as 0
+		:return: None
+		"""
+		value = value if value > 0 else 0
+		if self.count == self.window:
+			self.counts[self.bucket(self._ring[self._next])] -= 1
+		else:
+			self.count += 1
+		self._ring[self._next] = value
+		self._next = (self._next + 1) % self.window
+		self.counts[self.bucket(value)] += 1
+
+	def percentile(self, p: float) -> int | None:
+		"""
+		Get a percentile of the samples in the window.
+		:param p: the percentile, between 0 and 100
+		:return: an upper bound of the percentile, or None if there are no samples
+		"""
+		if not self.count:
+			return None
+		rank = max(1, -(-self.count * p // 100))
+		seen = 0
+		for bucket, n in enumerate(self.counts):
+			seen += n
+			if seen >= rank:
+				return self.upper_bound(bucket)
+		return None
+
+	def percentiles(self, ps: tuple[float, ...] = (50, 90, 99, 100)) -> dict[float, int | None]:
+		"""
+		Get several percentiles of the samples in the window.
+		:param ps: the percentiles, between 0 and 100
+		:return: a dictionary mapping each percentile to its upper bound
+		"""
+		return {p: self.percentile(p) for p in ps}
+
+	def clear(self) -> None:
+		"""
+		Forget every sample.
+		:return: None
+		"""
+		self.counts = array('q', bytes(8 * len(self.counts)))
+		self._next = 0
+		self.count = 0
@@ -3,5 +3,6 @@
 # SPDX-License-Identifier: GPL-3.0-only
 
 from .args import parse_args
-from .conf import Config
+from .conf import Config, FRAME_RATES
+from .control import Mode, Stage, TimeControl
 from .keymap import Action, Keymap
@@ -2,10 +2,12 @@
 #
 # SPDX-License-Identifier: GPL-3.0-only
 
+import re
 from argparse import ArgumentParser
 
-from .conf import Config
-from chessclock.themes import list_themes
+from .conf import Config, FRAME_RATES
+from .control import Mode, Stage, TimeControl
+from chessclock.themes import DEFAULT_THEME_NAME, THEMES, list_themes
 
 
 def parse_time(s: str, incr: bool = False, multiplier: int = 1) -> int:
@@ -37,6 +39,42 @@ def parse_time(s: str, incr: bool = False, multiplier: int = 1) -> int:
 	return multiplier * t
 
 
+STAGE = re.compile(r'(?:(\d+)/)?([\d:]+)(?:([+db])([\d:]+))?')
+HOURGLASS = 'hourglass:'
+
+
+def parse_control(s: str) -> TimeControl | None:
+	"""
+	Parses a time control specification into a TimeControl.
+	Format : "[hourglass:]STAGE[,STAGE...]", each stage being "[MOVES/]TIME[+INCREMENT|dDELAY|bDELAY]",
+	where TIME is formatted as for parse_time, and increments and delays as for parse_time with incr=True.
+	For instance, "40/90+30,30+30" gives 90 minutes for the first 40 moves, then 30 more minutes for the rest of the game,
+	with a 30 seconds increment per move from the first move on.
+	:param s: input string
+	:return: the time control, or None if the string is empty
+	"""
+	if not isinstance(s, str):
+		raise TypeError
+	if not s:
+		return None
+	hourglass = s.startswith(HOURGLASS)
+	if hourglass:
+		s = s[len(HOURGLASS):]
+	stages = []
+	for part in s.split(','):
+		m = STAGE.fullmatch(part.strip())
+		if m is None:
+			raise ValueError(f'invalid time control stage : "{part}"')
+		moves, time, mode, bonus = m.groups()
+		stages.append(Stage(
+			time=parse_time(time, incr=False),
+			moves=int(moves or 0),
+			bonus=parse_time(bonus or '', incr=True),
+			mode=Mode(mode or Mode.FISCHER.value),
+		))
+	return TimeControl(stages, hourglass)
+
+
 def parse_args() -> Config:
 	"""
 	Parse command line arguments into a Config object.
@@ -66,6 +104,17 @@ def parse_args() -> Config:
 	parser.add_argument('-L', '--increment-l', default='', help='time for clock on the left, defaults to --increment')
 	parser.add_argument('-R', '--increment-r', default='', help='time for clock on the right, defaults to --increment')
 
+	# TIME CONTROL
+	parser.add_argument(
+		'-c', '--control',
+		default='',
+		help='time control for both players, overriding times and increments; format :  '
+			'"[hourglass:]STAGE[,STAGE...]" where STAGE is "[MOVES/]TIME[+INCREMENT|dDELAY|bDELAY]", '
+			'e.g. "40/90+30,30+30" (d : simple delay, b : Bronstein delay)',
+	)
+	parser.add_argument('--control-l', default='', help='time control for clock on the left, defaults to --control')
+	parser.add_argument('--control-r', default='', help='time control for clock on the right, defaults to --control')
+
 	# FONT
 	parser.add_argument(
 		'-f', '--font',
@@ -77,19 +126,105 @@ def parse_args() -> Config:
 	parser.add_argument(
 		'-s', '--theme',
 		type=str,
-		default='default',
-		choices=list_themes(),
-		help='name of the color theme to use',
+		default=DEFAULT_THEME_NAME,
+		help='name of the color theme to use (see --list-themes)',
+	)
+	parser.add_argument(
+		'--list-themes',
+		action='store_true',
+		help='list the available color themes and exit',
+	)
+
+	# JOURNAL
+	parser.add_argument(
+		'-j', '--journal',
+		default=None,
+		metavar='PATH',
+		help='journal every operation to this file, and resume the game it holds if it exists',
+	)
+
+	# BROADCAST
+	parser.add_argument(
+		'-b', '--broadcast',
+		default=None,
+		metavar='ADDRESS',
+		help='stream the state of the clock to spectator displays connecting to "[HOST:]PORT" or "unix:PATH"',
+	)
+
+	# SHARED MEMORY
+	parser.add_argument(
+		'-m', '--shared-memory',
+		default=None,
+		metavar='NAME',
+		help='export the state of the clock to the shared memory segment NAME, for overlays and external displays',
+	)
+
+	# DISPLAY
+	parser.add_argument(
+		'--frame-rate',
+		choices=FRAME_RATES,
+		default='adaptive',
+		help='when to redraw : whenever the display changes (adaptive), at most 10 times a second and never while '
+		'paused, for clocks running on battery (low-power), or 30 times a second (fixed)',
+	)
+	parser.add_argument(
+		'--terminal',
+		action='store_true',
+		help='show the clock in the terminal, for computers without a graphical display; A and L end the turns, '
+		'Escape quits',
+	)
+
+	# INPUT
+	parser.add_argument(
+		'-d', '--device',
+		action='append',
+		default=[],
+		metavar='PATH',
+		help='read key presses from the input device PATH (e.g. /dev/input/by-id/...-event-kbd), dated by the device '
+		'rather than by the window; the device is taken from the display server; may be repeated',
+	)
+
+	# DEBUG
+	parser.add_argument(
+		'--latency',
+		action='store_true',
+		help='measure how long key presses take to register and to be shown, and display it on screen',
 	)
 
 	args = parser.parse_args()
+	# other themes are only looked for when one of them is asked for
+	if args.list_themes:
+		parser.exit(message='\n'.join(list_themes()) + '\n')
+	if args.device and args.terminal:
+		parser.error('input devices need the graphical frontend')
+	if args.theme not in THEMES and args.theme not in list_themes():
+		parser.error(f'unknown theme "{args.theme}" (choose from {", ".join(list_themes())})')
+
+	def convert(option: str, parse, **kwargs):
+		# a usage error rather than a traceback for values that cannot be parsed
+		value = getattr(args, option)
+		try:
+			return parse(value, **kwargs)
+		except ValueError as e:
+			parser.error(f'argument --{option.replace("_", "-")}: invalid value "{value}"' + (f' ({e})' if str(e) else ''))
+
 	return Config(
-		time_seconds=parse_time(args.time, incr=False),
-		time_l=parse_time(args.time_l, incr=False),
-		time_r=parse_time(args.time_r, incr=False),
-		increment_seconds=parse_time(args.increment, incr=True),
-		increment_l=parse_time(args.increment_l, incr=True),
-		increment_r=parse_time(args.increment_r, incr=True),
+		time_seconds=convert('time', parse_time, incr=False),
+		time_l=convert('time_l', parse_time, incr=False),
+		time_r=convert('time_r', parse_time, incr=False),
+		increment_seconds=convert('increment', parse_time, incr=True),
+		increment_l=convert('increment_l', parse_time, incr=True),
+		increment_r=convert('increment_r', parse_time, incr=True),
+		control=convert('control', parse_control),
+		control_l=convert('control_l', parse_control),
+		control_r=convert('control_r', parse_control),
 		font=args.font,
 		theme_name=args.theme,
+		show_latency=args.latency,
+		journal=args.journal,
+		broadcast=args.broadcast,
+		shared_memory=args.shared_memory,
+		frame_rate=args.frame_rate,
+		terminal=args.terminal,
+		devices=tuple(args.device),
 	)
@@ -4,8 +4,11 @@
 
 import sys
 
+from .control import TimeControl
 from .keymap import Keymap
 
+FRAME_RATES = ('adaptive', 'low-power', 'fixed')  # redraw policies of the user interface (see RedrawScheduler)
+
 
 class Config:
 	def __init__(
@@ -17,9 +20,19 @@ class Config:
 			increment_seconds: int = 0,
 			increment_l: int = 0,
 			increment_r: int = 0,
+			control: TimeControl | None = None,
+			control_l: TimeControl | None = None,
+			control_r: TimeControl | None = None,
 			font: str = 'monospace',
 			theme_name: str | None = None,
 			keymap: Keymap | None = None,
+			show_latency: bool = False,
+			journal: str | None = None,
+			broadcast: str | None = None,
+			shared_memory: str | None = None,
+			frame_rate: str = 'adaptive',
+			terminal: bool = False,
+			devices: tuple[str, ...] = (),
 	):
 		"""
 		:param time_seconds: time for both players, in seconds (defaults to 10 minutes)
@@ -28,8 +41,19 @@ class Config:
 		:param increment_seconds: increment for both players, in seconds (defaults to no increment)
 		:param increment_l: increment for the player on the left, in seconds; overwrites increment_s
 		:param increment_r: increment for the player on the right, in seconds; overwrites increment_s
+		:param control: time control for both players; overwrites times and increments
+		:param control_l: time control for the player on the left; overwrites control
+		:param control_r: time control for the player on the right; overwrites control
 		:param font: the name of the system font to use for the display
 		:param theme_name: the name of the theme to
+		:param keymap: the mapping of keys to actions
+		:param show_latency: if True, measure key press latencies and show them on screen
+		:param journal: path of a file journaling every operation, to recover the game after a crash
+		:param broadcast: address spectator displays connect to, as "[HOST:]PORT" or "unix:PATH"
+		:param shared_memory: name of a shared memory segment the state of the clock is exported to
+		:param frame_rate: when the display is redrawn, one of FRAME_RATES
+		:param terminal: if True, show the clock in the terminal instead of opening a window
+		:param devices: paths of input devices (evdev) read on a thread of their own, with the keymap of the clock
 		"""
 		# params
 		if not isinstance(font, str) or not all(map(
@@ -41,11 +65,28 @@ class Config:
 		time_l = time_seconds if time_l <= 0 else time_l
 		time_r = time_seconds if time_r <= 0 else time_r
 		increment_seconds = 0 if increment_seconds < 0 else increment_seconds
-		increment_l = increment_seconds if increment_l < 0 else increment_l
-		increment_r = increment_seconds if increment_r < 0 else increment_r
+		increment_l = increment_seconds if increment_l <= 0 else increment_l
+		increment_r = increment_seconds if increment_r <= 0 else increment_r
+		# time controls
+		if any(c is not None and not isinstance(c, TimeControl) for c in (control, control_l, control_r)):
+			raise TypeError
+		control_l = control_l or control or TimeControl.fischer(time_l, increment_l)
+		control_r = control_r or control or TimeControl.fischer(time_r, increment_r)
 		# themes
 		if theme_name and not isinstance(theme_name, str):
 			raise TypeError
+		# journal and exports
+		if any(v is not None and not isinstance(v, str) for v in (journal, broadcast, shared_memory)):
+			raise TypeError
+		# display
+		if not isinstance(frame_rate, str):
+			raise TypeError
+		if frame_rate not in FRAME_RATES:
+			raise ValueError
+		# input
+		devices = tuple(devices)
+		if not all(isinstance(d, str) for d in devices):
+			raise TypeError
 		# keymap
 		if not keymap:
 			keymap = Keymap()
@@ -54,12 +95,21 @@ class Config:
 		if not keymap.complete:
 			print('\nWARNING :\nThe keymap being used is incomplete !\nSome features may be disabled.\n')
 		# assign
-		self.time_l: int = time_l
-		self.time_r: int = time_r
-		self.increment_l: int = increment_l
-		self.increment_r: int = increment_r
+		self.control_l: TimeControl = control_l
+		self.control_r: TimeControl = control_r
+		self.time_l: int = control_l.time
+		self.time_r: int = control_r.time
+		self.increment_l: int = control_l.increment
+		self.increment_r: int = control_r.increment
 		self.theme_name = theme_name
 		self.keymap = keymap
+		self.show_latency = bool(show_latency)
+		self.journal = journal
+		self.broadcast = broadcast
+		self.shared_memory = shared_memory
+		self.frame_rate = frame_rate
+		self.terminal = bool(terminal)
+		self.devices = devices
 
 	def swap_sides(self) -> None:
 		"""
@@ -69,3 +119,4 @@ class Config:
 		"""
 		self.time_l, self.time_r = self.time_r, self.time_l
 		self.increment_l, self.increment_r = self.increment_r, self.increment_l
+		self.control_l, self.control_r = self.control_r, self.control_l
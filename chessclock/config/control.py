@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from enum import Enum
+from typing import Iterable, NamedTuple
+
+
+class Mode(Enum):
+	"""
+	How the time granted for each move of a stage is given to the player.
+	"""
+	FISCHER = '+'  # added after every move
+	DELAY = 'd'  # simple delay : the clock only starts counting down once the delay has elapsed
+	BRONSTEIN = 'b'  # after every move, the time used during the move is given back, up to the delay
+
+
+class Stage(NamedTuple):
+	"""
+	A period of the game, such as "40 moves in 90 minutes, 30 seconds increment per move".
+	"""
+	time: int  # in seconds, added to the clock when the stage starts
+	moves: int = 0  # the number of moves of the stage, or 0 for the rest of the game
+	bonus: int = 0  # increment or delay per move, in seconds
+	mode: Mode = Mode.FISCHER
+
+
+class TimeControl:
+	"""
+	The time control of one player, as a sequence of stages.
+	The first stage gives the starting time, each following stage adds its time once the previous one is over.
+	If the last stage has a number of moves, it is repeated until the end of the game.
+	"""
+
+	def __init__(self, stages: Iterable[Stage], hourglass: bool = False):
+		"""
+		TimeControl constructor.
+		:param stages: the stages, in order
+		:param hourglass: if True, time used by this player is given to their opponent
+		"""
+		self.stages: tuple[Stage, ...] = tuple(stages)
+		self.hourglass: bool = bool(hourglass)
+		if not self.stages or not all(isinstance(s, Stage) and isinstance(s.mode, Mode) for s in self.stages):
+			raise TypeError
+		if not all(isinstance(v, int) for s in self.stages for v in (s.time, s.moves, s.bonus)):
+			raise TypeError
+		if any(v < 0 for s in self.stages for v in (s.time, s.moves, s.bonus)):
+			raise ValueError
+		if self.stages[0].time <= 0 or any(s.moves == 0 for s in self.stages[:-1]):
+			raise ValueError
+
+	@staticmethod
+	def fischer(time: int, increment: int = 0) -> 'TimeControl':
+		"""
+		Build a single stage time control with a Fischer increment.
+		:param time: time for the whole game, in seconds
+		:param increment: increment per move, in seconds
+		:return: the time control
+		"""
+		return TimeControl([Stage(time, 0, increment, Mode.FISCHER)])
+
+	@property
+	def simple(self) -> bool:
+		"""
+		Whether this time control is a single stage with a Fischer increment (or no increment at all).
+		:return: True if the time control is fully described by a starting time and an increment
+		"""
+		return len(self.stages) == 1 and not self.stages[0].moves and self.stages[0].mode == Mode.FISCHER and not self.hourglass
+
+	@property
+	def time(self) -> int:
+		"""
+		:return: the starting time, in seconds
+		"""
+		return self.stages[0].time
+
+	@property
+	def increment(self) -> int:
+		"""
+		:return: the Fischer increment of the first stage, in seconds (0 for other modes)
+		"""
+		first = self.stages[0]
+		return first.bonus if first.mode == Mode.FISCHER else 0
+
+	def __eq__(self, other) -> bool:
+		return isinstance(other, TimeControl) and (self.stages, self.hourglass) == (other.stages, other.hourglass)
+
+	def __hash__(self) -> int:
+		return hash((self.stages, self.hourglass))
+
+	def __repr__(self) -> str:
+		return f'TimeControl({list(self.stages)!r}, hourglass={self.hourglass})'
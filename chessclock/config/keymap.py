@@ -4,7 +4,25 @@
 
 from enum import Enum, auto
 
-from pyglet.window import key
+
+class Key:
+	"""
+	The key symbols bound by default, with the same values as in pyglet.window.key.
+	Importing pyglet.window connects to the display : configuring the clock must not need it.
+	"""
+	LCTRL = 0xffe3
+	RCTRL = 0xffe4
+	A = 0x61
+	L = 0x6c
+	P = 0x70
+	Q = 0x71
+	R = 0x72
+	Z = 0x7a
+	SPACE = 0x20
+	ENTER = 0xff0d
+	ESCAPE = 0xff1b
+	NUM_ENTER = 0xff8d
+	NUM_9 = 0xffb9
 
 
 class Action(Enum):
@@ -30,13 +48,13 @@ class Keymap:
 			self,
 			use_numpad_for_right: bool = False,
 			*,
-			key_press_l: int = key.LCTRL,
-			key_press_r: int = key.RCTRL,
-			key_addtime_l: int = key.P,
-			key_addtime_r: int = key.Q,
-			key_play_pause: int = key.SPACE,
-			key_swap_sides: int = key.Z,
-			key_reset: int = key.R,
+			key_press_l: int = Key.LCTRL,
+			key_press_r: int = Key.RCTRL,
+			key_addtime_l: int = Key.P,
+			key_addtime_r: int = Key.Q,
+			key_play_pause: int = Key.SPACE,
+			key_swap_sides: int = Key.Z,
+			key_reset: int = Key.R,
 	):
 		"""
 		Keymap constructor.
@@ -50,8 +68,8 @@ class Keymap:
 		:param key_reset: key used to set the clock to its starting state, ready to begin a new game
 		"""
 		if use_numpad_for_right:
-			key_press_r = key.NUM_ENTER
-			key_addtime_l = key.NUM_9
+			key_press_r = Key.NUM_ENTER
+			key_addtime_l = Key.NUM_9
 		keys = [key_press_l, key_press_r, key_addtime_l, key_addtime_r, key_play_pause, key_swap_sides, key_reset]
 		acts = [Action.PRESS_L, Action.PRESS_R, Action.ADDTIME_L, Action.ADDTIME_R, Action.PLAY_PAUSE, Action.SWAP_SIDES, Action.RESET]
 		if not len(set(keys)) == len(keys):
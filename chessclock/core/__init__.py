@@ -2,11 +2,14 @@
 #
 # SPDX-License-Identifier: GPL-3.0-only
 
-from time import time_ns
-
 from chessclock.config import Config
 from chessclock.common.constants import *
 from chessclock.common.side import Side
+from .timesource import TimeSource, MonotonicClock, VirtualClock
+from .events import Op, Observer
+from .pool import ClockPool
+from .schedule import Schedule
+from .compact import CompactCore, new_snapshot
 
 
 class Core:
@@ -27,32 +30,108 @@ class Core:
 			Side.R: SECOND * (cfg.increment_r if incr else cfg.time_r),  # in nanoseconds
 		}
 
-	def __init__(self, cfg: Config | None = None):
+	def __init__(self, cfg: Config | None = None, time_source: TimeSource | None = None):
+		"""
+		Core constructor.
+		:param cfg: the clock configuration
+		:param time_source: where to read the current time from; defaults to a monotonic clock
+		"""
 		if cfg is None:
 			cfg = Config()
+		if time_source is None:
+			time_source = MonotonicClock()
 		assert isinstance(cfg, Config)
+		assert isinstance(time_source, TimeSource)
 		# constant
 		self.config: Config = cfg
-		self.incr: dict[Side, int] = Core.config_to_time(self.config, incr=True)
+		self.time_source: TimeSource = time_source
+		self._now = time_source.now
+		self.schedule: dict[Side, Schedule] = {Side.L: Schedule(cfg.control_l), Side.R: Schedule(cfg.control_r)}
 		# variable
 		self._running: bool = False
 		self._times: dict[Side, int] = Core.config_to_time(self.config)
 		self.side: Side | None = None
 		self.half_moves: int = 0
-		self._stamp: int = time_ns()
+		self.moves: dict[Side, int] = {Side.L: 0, Side.R: 0}  # moves completed by each side
+		self._grace: int = 0  # simple delay left for the current move, in nanoseconds
+		self._spent: int = 0  # time counted down during the current move, in nanoseconds
+		self._stamp: int = self._now()
+		# observers, notified after each operation
+		self.observers: list[Observer] = []
 
-	def _update_times(self) -> None:
+	def _notify(self, op: Op, side: Side | None = None, arg: int = 0) -> None:
+		"""
+		Notify every observer of an operation that just happened.
+		This method should only be called from inside this class.
+		:param op: the operation
+		:param side: the side concerned by the operation, if any
+		:param arg: the integer argument of the operation, if any
+		:return: None
+		"""
+		for observer in self.observers:
+			observer(op, side, arg, self._stamp)
+
+	def set_time_source(self, time_source: TimeSource) -> None:
+		"""
+		Read time from another time source from now on.
+		Time elapsed on the previous source is accounted for up to the switch.
+		:param time_source: the new time source
+		:return: None
+		"""
+		assert isinstance(time_source, TimeSource)
+		self._update_times()
+		self.time_source = time_source
+		self._now = time_source.now
+		self._stamp = self._now()
+
+	def _update_times(self, at: int | None = None) -> None:
 		"""
 		Update the timers.
 		Use this method before returning any value to code residing outside of this class.
 		This method should only be called from inside this class.
+		:param at: update the timers up to this time rather than now, if it is earlier (see press)
 		:return: None
 		"""
-		t = time_ns()
-		if self._running and self.side in Side:
-			self._times[self.side] = max(0, self._times[self.side] + self._stamp - t)
+		t = self._now()
+		if at is not None and at < t:
+			t = at if at > self._stamp else self._stamp
+		side = self.side
+		if self._running and isinstance(side, Side):
+			used = t - self._stamp
+			if self._grace:
+				free = used if used < self._grace else self._grace
+				self._grace -= free
+				used -= free
+			if used:
+				left = self._times[side]
+				v = left - used
+				v = v if v > 0 else 0
+				self._times[side] = v
+				self._spent += left - v
+				if self.schedule[side].hourglass:
+					self._times[side.opposite] += left - v
 		self._stamp = t
 
+	@property
+	def stamp(self) -> int:
+		"""
+		Time at which the timers were last updated, read from the time source of this clock.
+		Right after a press, this is the time at which the press was registered.
+		:return: the time of the last update, in nanoseconds
+		"""
+		return self._stamp
+
+	@property
+	def deadline(self) -> int | None:
+		"""
+		Time at which the active side flags, read from the time source of this clock.
+		Exact as long as no operation changes the state of the clock in the meantime.
+		:return: the flag time, in nanoseconds, or None if the clock is not running
+		"""
+		if not self.run:
+			return None
+		return self._stamp + self._grace + self._times[self.side]
+
 	@property
 	def times(self) -> dict[Side, int]:
 		"""
@@ -62,13 +141,26 @@ class Core:
 		self._update_times()
 		return self._times.copy()
 
+	@property
+	def incr(self) -> dict[Side, int]:
+		"""
+		Get the time granted per move to each side, for the next move of that side.
+		:return: a dictionary mapping each side to its increment or delay, in nanoseconds
+		"""
+		schedule, moves = self.schedule, self.moves
+		return {
+			Side.L: schedule[Side.L].increment(moves[Side.L] + 1),
+			Side.R: schedule[Side.R].increment(moves[Side.R] + 1),
+		}
+
 	@property
 	def describe(self) -> dict[Side, tuple[int, int]]:
 		"""
 		Describe each side's state.
 		:return: a dictionary mapping each side to a tuple composed of time left and increment per turn
 		"""
-		return {s: (self._times[s], self.incr[s]) for s in Side}
+		incr = self.incr
+		return {s: (self._times[s], incr[s]) for s in Side}
 
 	@property
 	def flagged(self) -> dict[Side, bool]:
@@ -85,7 +177,7 @@ class Core:
 		Whether the clock is running or not.
 		:return: True if the clock is running, False otherwise
 		"""
-		return self._running and self.side in Side
+		return self._running and isinstance(self.side, Side)
 
 	@run.setter
 	def run(self, is_start: bool) -> None:
@@ -95,7 +187,8 @@ class Core:
 		:return: None
 		"""
 		self._update_times()
-		self._running = bool(is_start) and self.side in Side
+		self._running = bool(is_start) and isinstance(self.side, Side)
+		self._notify(Op.RUN, None, int(self._running))
 
 	def reset(self) -> None:
 		"""
@@ -107,7 +200,11 @@ class Core:
 		self._times = Core.config_to_time(self.config)
 		self.side = None
 		self.half_moves = 0
+		self.moves = {Side.L: 0, Side.R: 0}
+		self._grace = 0
+		self._spent = 0
 		self._update_times()
+		self._notify(Op.RESET)
 
 	def swap_sides(self) -> bool:
 		"""
@@ -116,10 +213,12 @@ class Core:
 		"""
 		if self._running:
 			return False
-		self.incr = {s: self.incr[s.opposite] for s in Side}
+		for d in (self.schedule, self.moves):
+			d[Side.L], d[Side.R] = d[Side.R], d[Side.L]
 		self._times = {s: self._times[s.opposite] for s in Side}
-		if self.side in Side:
+		if isinstance(self.side, Side):
 			self.side = self.side.opposite
+		self._notify(Op.SWAP_SIDES)
 		return True
 
 	def toggle_run(self) -> None:
@@ -129,23 +228,31 @@ class Core:
 		"""
 		self.run = not self.run
 
-	def press(self, pressed_side: Side) -> None:
+	def press(self, pressed_side: Side, at: int | None = None) -> None:
 		"""
 		Called when player on `side` side of the clock presses their button.
 		:param pressed_side: side relative to the clock of the button being pressed
+		:param at: when the button was pressed, read from the time source of this clock, if known to be earlier than now
+			(the time an input device registered the press, for instance); never earlier than the last update,
+			as time counted down before it cannot be given back; defaults to now
 		:return: True if a switch happened, False otherwise
 		"""
 		assert pressed_side in Side
-		self._update_times()
-		if all([
-			self._running,
-			pressed_side == self.side,
-			self._times.get(self.side, 0) > 0,
-		]):
-			self._times[self.side] += self.incr[self.side]
+		self._update_times(at)
+		side = self.side
+		moved = self._running and pressed_side == side and self._times.get(side, 0) > 0
+		if moved:
+			move = self.moves[side] + 1
+			self.moves[side] = move
+			self._times[side] += self.schedule[side].after(move, self._spent)
 			self.half_moves += 1
 		self._running = True
 		self.side = pressed_side.opposite
+		if moved or self.side != side:
+			# a new move starts
+			self._spent = 0
+			self._grace = self.schedule[self.side].delay(self.moves[self.side] + 1)
+		self._notify(Op.PRESS, pressed_side)
 
 	def add_time(self, player: Side | None = None, seconds: int = 15) -> None:
 		"""
@@ -163,3 +270,4 @@ class Core:
 				self._times[s] += SECOND * seconds
 		else:
 			self._times[player] += SECOND * seconds
+		self._notify(Op.ADD_TIME, player, seconds)
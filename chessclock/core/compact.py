@@ -0,0 +1,317 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from array import array
+
+from chessclock.config import Config
+from chessclock.common.constants import SECOND
+from chessclock.common.side import Side
+from .events import Op, Observer
+from .schedule import Schedule
+from .timesource import TimeSource, MonotonicClock
+
+NO_SIDE: int = 0
+SIDES: tuple[Side | None, Side, Side] = (None, Side.L, Side.R)  # indexed by Side.value, NO_SIDE being 0
+
+# layout of a snapshot, as filled by CompactCore.snapshot_into : the time of a side is at index Side.value
+STAMP, TIME_L, TIME_R, SIDE, RUNNING, HALF_MOVES = range(6)
+SNAPSHOT: int = 6
+
+
+def new_snapshot() -> array:
+	"""
+	Allocate a buffer for CompactCore.snapshot_into, to be reused for every snapshot.
+	:return: a zeroed array of SNAPSHOT signed 64 bits integers
+	"""
+	return array('q', bytes(8 * SNAPSHOT))
+
+
+class CompactCore:
+	"""
+	A chess clock following the exact same rules as Core, with a fixed memory layout.
+
+	Per-side values are stored in lists indexed by Side.value, and the active side as a Side.value (NO_SIDE before
+	the first press). Once the game has started, press, the run setter and snapshot_into allocate no container,
+	so that reading the clock on every frame adds no pressure on the garbage collector.
+	Properties returning dictionaries (times, flagged, describe) are kept for compatibility with Core.
+	"""
+
+	__slots__ = (
+		'config', 'time_source', 'observers', 'half_moves',
+		'_now', '_schedule', '_times', '_moves', '_side', '_running', '_stamp', '_grace', '_spent',
+	)
+
+	def __init__(self, cfg: Config | None = None, time_source: TimeSource | None = None):
+		"""
+		CompactCore constructor.
+		:param cfg: the clock configuration
+		:param time_source: where to read the current time from; defaults to a monotonic clock
+		"""
+		if cfg is None:
+			cfg = Config()
+		if time_source is None:
+			time_source = MonotonicClock()
+		assert isinstance(cfg, Config)
+		assert isinstance(time_source, TimeSource)
+		# constant
+		self.config: Config = cfg
+		self.time_source: TimeSource = time_source
+		self._now = time_source.now
+		self._schedule: list[Schedule | None] = [None, Schedule(cfg.control_l), Schedule(cfg.control_r)]
+		# variable
+		self._running: bool = False
+		self._times: list[int] = [0, SECOND * cfg.time_l, SECOND * cfg.time_r]
+		self._side: int = NO_SIDE
+		self.half_moves: int = 0
+		self._moves: list[int] = [0, 0, 0]
+		self._grace: int = 0
+		self._spent: int = 0
+		self._stamp: int = self._now()
+		# observers, notified after each operation
+		self.observers: list[Observer] = []
+
+	def _notify(self, op: Op, side: Side | None = None, arg: int = 0) -> None:
+		"""
+		Notify every observer of an operation that just happened.
+		This method should only be called from inside this class.
+		:param op: the operation
+		:param side: the side concerned by the operation, if any
+		:param arg: the integer argument of the operation, if any
+		:return: None
+		"""
+		if self.observers:
+			for observer in self.observers:
+				observer(op, side, arg, self._stamp)
+
+	def set_time_source(self, time_source: TimeSource) -> None:
+		"""
+		Read time from another time source from now on.
+		Time elapsed on the previous source is accounted for up to the switch.
+		:param time_source: the new time source
+		:return: None
+		"""
+		assert isinstance(time_source, TimeSource)
+		self._update_times()
+		self.time_source = time_source
+		self._now = time_source.now
+		self._stamp = self._now()
+
+	def _update_times(self, at: int | None = None) -> None:
+		"""
+		Update the timers, exactly as Core._update_times does.
+		This method should only be called from inside this class.
+		:param at: update the timers up to this time rather than now, if it is earlier
+		:return: None
+		"""
+		t = self._now()
+		if at is not None and at < t:
+			t = at if at > self._stamp else self._stamp
+		s = self._side
+		if self._running and s:
+			used = t - self._stamp
+			if self._grace:
+				free = used if used < self._grace else self._grace
+				self._grace -= free
+				used -= free
+			if used:
+				times = self._times
+				left = times[s]
+				v = left - used
+				v = v if v > 0 else 0
+				times[s] = v
+				self._spent += left - v
+				if self._schedule[s].hourglass:
+					times[s ^ 0b11] += left - v
+		self._stamp = t
+
+	def snapshot_into(self, buffer) -> object:
+		"""
+		Write the current state of the clock into a buffer owned by the caller, without allocating.
+		The layout is given by the STAMP, TIME_L, TIME_R, SIDE, RUNNING and HALF_MOVES indices of this module.
+		:param buffer: a writable sequence of at least SNAPSHOT integers, such as the array returned by new_snapshot
+		:return: the buffer
+		"""
+		self._update_times()
+		times = self._times
+		buffer[STAMP] = self._stamp
+		buffer[TIME_L] = times[1]
+		buffer[TIME_R] = times[2]
+		buffer[SIDE] = self._side
+		buffer[RUNNING] = self._running and self._side != NO_SIDE
+		buffer[HALF_MOVES] = self.half_moves
+		return buffer
+
+	@property
+	def side(self) -> Side | None:
+		"""
+		:return: the side currently counting down, or None before the first press
+		"""
+		return SIDES[self._side]
+
+	@property
+	def stamp(self) -> int:
+		"""
+		Time at which the timers were last updated, read from the time source of this clock.
+		:return: the time of the last update, in nanoseconds
+		"""
+		return self._stamp
+
+	@property
+	def deadline(self) -> int | None:
+		"""
+		Time at which the active side flags, read from the time source of this clock.
+		:return: the flag time, in nanoseconds, or None if the clock is not running
+		"""
+		if not (self._running and self._side):
+			return None
+		return self._stamp + self._grace + self._times[self._side]
+
+	@property
+	def schedule(self) -> dict[Side, Schedule]:
+		"""
+		:return: a dictionary mapping each side to its compiled time control
+		"""
+		return {Side.L: self._schedule[1], Side.R: self._schedule[2]}
+
+	@property
+	def moves(self) -> dict[Side, int]:
+		"""
+		:return: a dictionary mapping each side to the number of moves it completed
+		"""
+		return {Side.L: self._moves[1], Side.R: self._moves[2]}
+
+	@property
+	def times(self) -> dict[Side, int]:
+		"""
+		Get time left for each side.
+		Allocates a dictionary : prefer snapshot_into on hot paths.
+		:return: a dictionary mapping each side to the time it has left until flagging
+		"""
+		self._update_times()
+		return {Side.L: self._times[1], Side.R: self._times[2]}
+
+	@property
+	def incr(self) -> dict[Side, int]:
+		"""
+		Get the time granted per move to each side, for the next move of that side.
+		:return: a dictionary mapping each side to its increment or delay, in nanoseconds
+		"""
+		schedule, moves = self._schedule, self._moves
+		return {Side.L: schedule[1].increment(moves[1] + 1), Side.R: schedule[2].increment(moves[2] + 1)}
+
+	@property
+	def describe(self) -> dict[Side, tuple[int, int]]:
+		"""
+		Describe each side's state.
+		:return: a dictionary mapping each side to a tuple composed of time left and increment per turn
+		"""
+		incr = self.incr
+		return {Side.L: (self._times[1], incr[Side.L]), Side.R: (self._times[2], incr[Side.R])}
+
+	@property
+	def flagged(self) -> dict[Side, bool]:
+		"""
+		Get flagged state for both players.
+		:return: a dictionary mapping each player to a boolean indicating whether they have flagged or not
+		"""
+		self._update_times()
+		return {Side.L: self._times[1] <= 0, Side.R: self._times[2] <= 0}
+
+	@property
+	def run(self) -> bool:
+		"""
+		Whether the clock is running or not.
+		:return: True if the clock is running, False otherwise
+		"""
+		return self._running and self._side != NO_SIDE
+
+	@run.setter
+	def run(self, is_start: bool) -> None:
+		"""
+		Set the running state of the clock.
+		:param is_start: set to True if clock is to run; set to False otherwise
+		:return: None
+		"""
+		self._update_times()
+		self._running = bool(is_start) and self._side != NO_SIDE
+		self._notify(Op.RUN, None, 1 if self._running else 0)
+
+	def reset(self) -> None:
+		"""
+		Place the clock in a state in which it is set and ready for a new game, using the same configuration.
+		:return: None
+		"""
+		self._running = False
+		self._times[1] = SECOND * self.config.time_l
+		self._times[2] = SECOND * self.config.time_r
+		self._side = NO_SIDE
+		self.half_moves = 0
+		self._moves[1] = self._moves[2] = 0
+		self._grace = 0
+		self._spent = 0
+		self._update_times()
+		self._notify(Op.RESET)
+
+	def swap_sides(self) -> bool:
+		"""
+		Swaps all aspects of the clock between sides.
+		:return: True if the sides were swapped, False if the clock is running
+		"""
+		if self._running:
+			return False
+		for values in (self._schedule, self._times, self._moves):
+			values[1], values[2] = values[2], values[1]
+		if self._side:
+			self._side ^= 0b11
+		self._notify(Op.SWAP_SIDES)
+		return True
+
+	def toggle_run(self) -> None:
+		"""
+		Pause and resume clock countdown.
+		:return: None
+		"""
+		self.run = not self.run
+
+	def press(self, pressed_side: Side, at: int | None = None) -> None:
+		"""
+		Called when player on `side` side of the clock presses their button.
+		:param pressed_side: side relative to the clock of the button being pressed
+		:param at: when the button was pressed, if earlier than now (see Core.press); defaults to now
+		:return: None
+		"""
+		assert pressed_side in Side
+		self._update_times(at)
+		p = pressed_side.value
+		s = self._side
+		moved = self._running and p == s and self._times[s] > 0
+		if moved:
+			move = self._moves[s] + 1
+			self._moves[s] = move
+			self._times[s] += self._schedule[s].after(move, self._spent)
+			self.half_moves += 1
+		self._running = True
+		self._side = p ^ 0b11
+		if moved or self._side != s:
+			# a new move starts
+			self._spent = 0
+			self._grace = self._schedule[self._side].delay(self._moves[self._side] + 1)
+		self._notify(Op.PRESS, pressed_side)
+
+	def add_time(self, player: Side | None = None, seconds: int = 15) -> None:
+		"""
+		Add time to the opponent's clock (inspired by chess.com).
+		:param player: side to which time is to be added; if None, adds time to both sides
+		:param seconds: time to add to the clock(s), in seconds
+		:return: None
+		"""
+		assert isinstance(player, Side) or player is None
+		assert isinstance(seconds, int)
+		self._update_times()
+		if player is None:
+			self._times[1] += SECOND * seconds
+			self._times[2] += SECOND * seconds
+		else:
+			self._times[player.value] += SECOND * seconds
+		self._notify(Op.ADD_TIME, player, seconds)
@@ -0,0 +1,219 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import threading
+from time import sleep
+from typing import Callable, TypeVar
+
+from chessclock.common.side import Side
+from chessclock.config import Config
+from chessclock.core import Core
+from .compact import STAMP, TIME_L, TIME_R, SIDE, RUNNING, HALF_MOVES
+from .events import Op
+from .timesource import TimeSource
+
+T = TypeVar('T')
+
+
+class ConcurrentCore(Core):
+	"""
+	A Core that any number of threads may operate and read at once : the network, input devices and the user interface.
+
+	Operations are serialized by a lock, and each takes effect at a single instant, read from the time source
+	while holding the lock. Reads take no lock : the state is guarded by a sequence lock, as the slots of
+	chessclock.net.shm are. Writers make the sequence odd while they change the state, and even again once done;
+	a reader copies what it needs and reads the time, then retries if the sequence was odd or changed meanwhile.
+	Readers never block writers, and never change the state : unlike Core, reading the times does not update them.
+	Instead, the stamp is kept for each thread : the time of its last read or operation, so that times and stamp read
+	one after the other on a thread match, as they do on a Core.
+
+	Observers are notified in the order of the operations, on the thread that operated the clock, once the new
+	state is readable; they may read the clock, but must not operate it.
+	"""
+
+	def __init__(self, cfg: Config | None = None, time_source: TimeSource | None = None):
+		"""
+		ConcurrentCore constructor.
+		:param cfg: the clock configuration
+		:param time_source: where to read the current time from, from any thread; defaults to a monotonic clock
+		"""
+		super().__init__(cfg, time_source)
+		self._lock = threading.Lock()
+		self._sequence: int = 0  # odd while an operation is changing the state
+		self._pending: list[tuple[Op, Side | None, int, int]] = []  # notifications of the operation in progress
+		self._local = threading.local()  # the stamp of each thread
+
+	# WRITES
+
+	def _write(self, operation: Callable[..., T], *args) -> T:
+		"""
+		Run an operation of Core on the state of this clock, then notify the observers.
+		This method should only be called from inside this class.
+		:param operation: the operation, a method of Core
+		:param args: the arguments of the operation
+		:return: what the operation returns
+		"""
+		with self._lock:
+			self._sequence += 1
+			try:
+				result = operation(self, *args)
+			finally:
+				self._sequence += 1
+			self._local.stamp = self._stamp
+			pending = self._pending
+			for op, side, arg, stamp in pending:
+				for observer in self.observers:
+					observer(op, side, arg, stamp)
+			pending.clear()
+		return result
+
+	def _notify(self, op: Op, side: Side | None = None, arg: int = 0) -> None:
+		"""
+		Notify the observers once the state is readable again (see _write).
+		This method should only be called from inside this class.
+		:param op: the operation
+		:param side: the side concerned by the operation, if any
+		:param arg: the integer argument of the operation, if any
+		:return: None
+		"""
+		self._pending.append((op, side, arg, self._stamp))
+
+	def set_time_source(self, time_source: TimeSource) -> None:
+		self._write(Core.set_time_source, time_source)
+
+	def press(self, pressed_side: Side, at: int | None = None) -> None:
+		self._write(Core.press, pressed_side, at)
+
+	def add_time(self, player: Side | None = None, seconds: int = 15) -> None:
+		self._write(Core.add_time, player, seconds)
+
+	def reset(self) -> None:
+		self._write(Core.reset)
+
+	def swap_sides(self) -> bool:
+		return self._write(Core.swap_sides)
+
+	def toggle_run(self) -> None:
+		# two toggles always cancel out
+		self._write(ConcurrentCore._toggle)
+
+	def _toggle(self) -> None:
+		"""
+		Pause and resume clock countdown, reading whether the clock runs while holding the lock.
+		This method should only be called from inside this class.
+		:return: None
+		"""
+		Core.run.fset(self, not Core.run.fget(self))
+
+	@property
+	def run(self) -> bool:
+		return self._read(Core.run.fget)
+
+	@run.setter
+	def run(self, is_start: bool) -> None:
+		self._write(Core.run.fset, is_start)
+
+	# READS
+
+	def _read(self, read: Callable[['ConcurrentCore'], T]) -> T:
+		"""
+		Read the state of this clock, consistently, without taking the lock.
+		This method should only be called from inside this class.
+		:param read: reads the state, given this clock; must not change it, and must read each attribute only once
+		:return: what read returns, from a state no operation was changing
+		"""
+		while True:
+			sequence = self._sequence
+			if not sequence & 1:
+				value = read(self)
+				if self._sequence == sequence:
+					return value
+			sleep(0)  # let the writer finish
+
+	def _current(self) -> tuple[int, int, int, Side | None, bool, int]:
+		"""
+		Read the times of both sides now, counting down the running side from the last operation, as
+		Core._update_times does, without updating anything.
+		This method should only be called from inside this class.
+		:return: a tuple (time of the read, time left to the left side, to the right side, side, running, half moves)
+		"""
+		while True:
+			sequence = self._sequence
+			if not sequence & 1:
+				stamp, times, side, running, grace = self._stamp, self._times, self.side, self._running, self._grace
+				left_l, left_r, half_moves = times[Side.L], times[Side.R], self.half_moves
+				hourglass = side is not None and self.schedule[side].hourglass
+				t = self._now()  # while the sequence is checked : no operation took effect in between
+				if self._sequence == sequence:
+					break
+			sleep(0)  # let the writer finish
+		self._local.stamp = t
+		running = running and side is not None
+		if running:
+			used = t - stamp
+			used -= used if used < grace else grace
+			if used > 0:
+				left = left_l if side is Side.L else left_r
+				v = left - used if left > used else 0
+				if side is Side.L:
+					left_l = v
+					left_r += (left - v) if hourglass else 0
+				else:
+					left_r = v
+					left_l += (left - v) if hourglass else 0
+		return t, left_l, left_r, side, running, half_moves
+
+	def snapshot_into(self, buffer) -> object:
+		"""
+		Write the state of the clock at one instant into a buffer owned by the caller, as in CompactCore.snapshot_into.
+		STAMP is the time of the read, not of the last operation.
+		:param buffer: a writable sequence of at least SNAPSHOT integers, such as the array returned by new_snapshot
+		:return: the buffer
+		"""
+		t, left_l, left_r, side, running, half_moves = self._current()
+		buffer[STAMP] = t
+		buffer[TIME_L] = left_l
+		buffer[TIME_R] = left_r
+		buffer[SIDE] = side.value if side is not None else 0
+		buffer[RUNNING] = running
+		buffer[HALF_MOVES] = half_moves
+		return buffer
+
+	@property
+	def stamp(self) -> int:
+		"""
+		Time of the last read or operation of the calling thread, read from the time source of this clock;
+		right after a press, the time at which the press was registered.
+		:return: the time, in nanoseconds
+		"""
+		return getattr(self._local, 'stamp', self._stamp)
+
+	@property
+	def times(self) -> dict[Side, int]:
+		_, left_l, left_r, _, _, _ = self._current()
+		return {Side.L: left_l, Side.R: left_r}
+
+	@property
+	def flagged(self) -> dict[Side, bool]:
+		_, left_l, left_r, _, _, _ = self._current()
+		return {Side.L: left_l <= 0, Side.R: left_r <= 0}
+
+	@property
+	def deadline(self) -> int | None:
+
+		def read(core: ConcurrentCore) -> int | None:
+			side, running = core.side, core._running
+			if not running or side is None:
+				return None
+			return core._stamp + core._grace + core._times[side]
+
+		return self._read(read)
+
+	@property
+	def incr(self) -> dict[Side, int]:
+		return self._read(Core.incr.fget)
+
+	@property
+	def describe(self) -> dict[Side, tuple[int, int]]:
+		return self._read(Core.describe.fget)
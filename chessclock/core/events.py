@@ -0,0 +1,26 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from enum import Enum
+from typing import Callable
+
+from chessclock.common.side import Side
+
+
+class Op(Enum):
+	"""
+	The operations changing the state of a Core, as reported to its observers.
+	"""
+	PRESS = 1  # side : the side whose button was pressed
+	ADD_TIME = 2  # side : the side receiving time, None for both; arg : seconds added
+	RUN = 3  # arg : 1 if the clock was set to run, 0 if it was paused
+	SWAP_SIDES = 4
+	RESET = 5
+
+
+Observer = Callable[[Op, Side | None, int, int], None]
+"""
+A callable notified after every operation on a Core,
+with the operation, its side (or None), its integer argument (or 0) and the time of the operation, in nanoseconds.
+"""
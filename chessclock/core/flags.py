@@ -0,0 +1,199 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import heapq
+import threading
+from typing import Callable
+
+from chessclock.common.side import Side
+from chessclock.core import Core, CompactCore
+from .events import Op
+from .timesource import TimeSource, MonotonicClock
+
+FlagCallback = Callable[[Core, Side, int], None]
+"""
+Called when a side of a Core flags, with the Core, the side and the exact time it flagged at, in nanoseconds.
+"""
+
+
+class FlagScheduler:
+	"""
+	Detects flags as they happen, instead of when someone reads Core.flagged.
+
+	The flag deadline of each running clock is kept in a min-heap, and updated whenever
+	an operation on the clock changes it (press, add time, pause, swap, reset) : O(log n) per operation,
+	whatever the number of clocks. Outdated heap entries are skipped when they reach the top of the heap.
+	Every clock must read time from the same time base as the scheduler.
+	"""
+
+	def __init__(self, time_source: TimeSource | None = None):
+		"""
+		FlagScheduler constructor.
+		:param time_source: where to read the current time from; defaults to a monotonic clock
+		"""
+		if time_source is None:
+			time_source = MonotonicClock()
+		if not isinstance(time_source, TimeSource):
+			raise TypeError
+		self.time_source: TimeSource = time_source
+		self._now = time_source.now
+		self._heap: list[tuple[int, int, int]] = []  # (deadline, generation, key)
+		self._clocks: dict[int, tuple[Core, FlagCallback, Callable]] = {}
+		self._generation: dict[int, int] = {}  # generation of the live heap entry of each clock, 0 if none
+		self._flagged: dict[int, set[Side]] = {}  # sides whose flag already fired, until they get time again
+		self._counter: int = 0
+		self._next_key: int = 0
+		self._lock = threading.Condition()
+		self._thread: threading.Thread | None = None
+		self._stopped = False
+
+	def __len__(self) -> int:
+		return len(self._clocks)
+
+	def attach(self, core: Core, callback: FlagCallback) -> int:
+		"""
+		Start watching a Core.
+		:param core: the Core
+		:param callback: called when a side of the Core flags
+		:return: a key identifying the Core in this scheduler
+		"""
+		if not isinstance(core, (Core, CompactCore)):
+			raise TypeError
+		key = self._next_key
+		self._next_key += 1
+
+		def observer(op: Op, side: Side | None, arg: int, stamp: int) -> None:
+			self.reschedule(key)
+
+		with self._lock:
+			self._clocks[key] = (core, callback, observer)
+			self._generation[key] = 0
+			self._flagged[key] = set()
+		core.observers.append(observer)
+		self.reschedule(key)
+		return key
+
+	def detach(self, key: int) -> None:
+		"""
+		Stop watching a Core.
+		:param key: the key returned by attach
+		:return: None
+		"""
+		with self._lock:
+			core, _, observer = self._clocks.pop(key)
+			del self._generation[key]
+			del self._flagged[key]
+		core.observers.remove(observer)
+
+	def reschedule(self, key: int) -> None:
+		"""
+		Update the deadline of a Core after its state changed.
+		Called by the Core itself after every operation; safe to call from any thread.
+		:param key: the key returned by attach
+		:return: None
+		"""
+		with self._lock:
+			entry = self._clocks.get(key)
+			if entry is None:
+				return
+			core = entry[0]
+			deadline = core.deadline
+			if deadline is not None and deadline > core.stamp:
+				self._flagged[key].discard(core.side)
+			elif deadline is not None and core.side in self._flagged[key]:
+				deadline = None  # resumed while already flagged
+			if deadline is None:
+				self._generation[key] = 0
+				return
+			self._counter += 1
+			self._generation[key] = self._counter
+			earliest = self._heap[0][0] if self._heap else None
+			heapq.heappush(self._heap, (deadline, self._counter, key))
+			if len(self._heap) > 2 * len(self._clocks) + 64:
+				self._compact()
+			if earliest is None or deadline < earliest:
+				self._lock.notify()
+
+	def _compact(self) -> None:
+		"""
+		Drop outdated entries from the heap.
+		This method should only be called from inside this class, holding the lock.
+		:return: None
+		"""
+		generation = self._generation
+		self._heap = [e for e in self._heap if generation.get(e[2]) == e[1]]
+		heapq.heapify(self._heap)
+
+	def next_deadline(self) -> int | None:
+		"""
+		Get the earliest flag deadline.
+		:return: the time of the next flag, in nanoseconds, or None if no clock is running
+		"""
+		with self._lock:
+			return self._peek()
+
+	def _peek(self) -> int | None:
+		heap, generation = self._heap, self._generation
+		while heap and generation.get(heap[0][2]) != heap[0][1]:
+			heapq.heappop(heap)
+		return heap[0][0] if heap else None
+
+	def poll(self, now: int | None = None) -> int:
+		"""
+		Fire the callbacks of every flag whose deadline has passed.
+		Callbacks run on the calling thread, in the order of the deadlines.
+		:param now: the current time, in nanoseconds; defaults to the time read from the time source
+		:return: the number of flags fired
+		"""
+		if now is None:
+			now = self._now()
+		due = []
+		with self._lock:
+			while (deadline := self._peek()) is not None and deadline <= now:
+				_, _, key = heapq.heappop(self._heap)
+				self._generation[key] = 0
+				core, callback, _ = self._clocks[key]
+				self._flagged[key].add(core.side)
+				due.append((callback, core, core.side, deadline))
+		for callback, core, side, deadline in due:
+			callback(core, side, deadline)
+		return len(due)
+
+	def start(self) -> threading.Thread:
+		"""
+		Fire callbacks from a background thread, sleeping until the next deadline.
+		:return: the thread
+		"""
+		self._stopped = False
+		self._thread = threading.Thread(target=self._run, name='chessclock-flags', daemon=True)
+		self._thread.start()
+		return self._thread
+
+	def _run(self) -> None:
+		while True:
+			with self._lock:
+				if self._stopped:
+					return
+				deadline = self._peek()
+				if deadline is None:
+					self._lock.wait()
+					continue
+				delay = deadline - self._now()
+				if delay > 0:
+					# woken up early when an earlier deadline is scheduled
+					self._lock.wait(delay / 1e9)
+					continue
+			self.poll()
+
+	def stop(self) -> None:
+		"""
+		Stop the background thread.
+		:return: None
+		"""
+		with self._lock:
+			self._stopped = True
+			self._lock.notify()
+		if self._thread is not None:
+			self._thread.join()
+			self._thread = None
@@ -0,0 +1,286 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+An append-only binary journal of every operation on a Core, to recover a game after a crash or a power loss.
+
+File layout : a header holding the time controls of both players, stage by stage, followed by fixed-size records.
+Each record holds the time of the operation (as read from the time source of the Core), its integer argument,
+its opcode, its side and a CRC32 of all previous fields, so that a record torn by a crash is detected and dropped.
+
+Time sources are not comparable from one run of the program to the next,
+so every run starts with a SESSION record. The clock is always paused when a game is recovered :
+no time elapses between the last record of a session and the start of the next one.
+"""
+
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Iterable
+
+from chessclock.config import Config, Mode, Stage, TimeControl
+from chessclock.common.side import Side
+from chessclock.core import Core
+from .events import Op
+from .timesource import TimeSource, MonotonicClock, VirtualClock
+
+MAGIC = b'CCJ\x02'
+HEADER = struct.Struct('<4sBBBx')  # magic, number of stages of the left and right time controls, hourglass flags
+STAGE = struct.Struct('<qqq1s7x')  # time, moves, bonus (in seconds), mode; the stages of the left side come first
+PAYLOAD = struct.Struct('<qqBB')  # stamp, arg, opcode, side
+RECORD = struct.Struct('<qqBB2xI')  # payload, padding, crc32 of the payload
+SESSION = 0  # opcode of the record starting a new run of the program
+NO_SIDE = 0
+
+
+class FsyncPolicy(Enum):
+	"""
+	When the journal asks the operating system to commit records to disk.
+	Records are always written by a background thread, so no policy ever blocks the operations of the Core.
+	"""
+	ALWAYS = 'always'  # after every record
+	GROUP = 'group'  # at most once every group interval, committing every record written in the meantime
+	NEVER = 'never'  # let the operating system decide
+
+
+def pack_record(stamp: int, op: int, side: Side | None = None, arg: int = 0) -> bytes:
+	"""
+	Encode a journal record.
+	:param stamp: the time of the operation, in nanoseconds
+	:param op: the opcode of the operation (Op.value or SESSION)
+	:param side: the side concerned by the operation, if any
+	:param arg: the integer argument of the operation
+	:return: the encoded record
+	"""
+	s = side.value if side is not None else NO_SIDE
+	crc = zlib.crc32(PAYLOAD.pack(stamp, arg, op, s))
+	return RECORD.pack(stamp, arg, op, s, crc)
+
+
+def pack_header(cfg: Config) -> bytes:
+	"""
+	Encode the header of a journal.
+	:param cfg: the configuration of the game
+	:return: the encoded header, holding the time controls of both players
+	"""
+	l, r = cfg.control_l, cfg.control_r
+	header = HEADER.pack(MAGIC, len(l.stages), len(r.stages), l.hourglass | r.hourglass << 1)
+	return header + b''.join(STAGE.pack(s.time, s.moves, s.bonus, s.mode.value.encode()) for s in l.stages + r.stages)
+
+
+def unpack_header(data: bytes) -> tuple[tuple[TimeControl, TimeControl], int]:
+	"""
+	Decode the header of a journal.
+	:param data: the beginning of the journal file
+	:return: a tuple (time controls of the left and right players, size of the header)
+	"""
+	if len(data) < HEADER.size:
+		raise ValueError('journal header is missing')
+	magic, count_l, count_r, hourglass = HEADER.unpack_from(data)
+	if magic != MAGIC:
+		raise ValueError('not a chess clock journal')
+	size = HEADER.size + (count_l + count_r) * STAGE.size
+	if len(data) < size:
+		raise ValueError('journal header is missing')
+	fields = STAGE.iter_unpack(data[HEADER.size:size])
+	stages = [Stage(t, moves, bonus, Mode(mode.decode())) for t, moves, bonus, mode in fields]
+	control_l = TimeControl(stages[:count_l], bool(hourglass & 1))
+	control_r = TimeControl(stages[count_l:], bool(hourglass & 2))
+	return (control_l, control_r), size
+
+
+def read_journal(path: str | Path) -> tuple[tuple[TimeControl, TimeControl], list[tuple[int, int, int, int]], int]:
+	"""
+	Read a journal file, stopping at the first incomplete or corrupted record.
+	:param path: the path of the journal
+	:return: a tuple (time controls of the left and right players, records as (stamp, arg, opcode, side),
+		length of the valid part of the file)
+	"""
+	data = Path(path).read_bytes()
+	controls, start = unpack_header(data)
+	end = start + (len(data) - start) // RECORD.size * RECORD.size
+	view = memoryview(data)
+	records = []
+	valid = start
+	for stamp, arg, op, side, crc in RECORD.iter_unpack(view[start:end]):
+		if zlib.crc32(view[valid:valid + PAYLOAD.size]) != crc:
+			break
+		records.append((stamp, arg, op, side))
+		valid += RECORD.size
+	return controls, records, valid
+
+
+def replay(
+		core: Core,
+		clock: VirtualClock,
+		records: Iterable[tuple[int, int, int, int]],
+		on_move: Callable[[Core], None] | None = None,
+) -> None:
+	"""
+	Apply journal records to a Core reading time from a virtual clock.
+	:param core: the Core, in the state in which the journal started
+	:param clock: the time source of the Core
+	:param records: the records, as returned by read_journal
+	:param on_move: if given, called with the Core after every press completing a half-move
+	:return: None
+	"""
+	offset = 0
+	for stamp, arg, op, side in records:
+		if op == SESSION:
+			# time base changed : pause, and continue from the current time
+			core.run = False
+			offset = clock.now() - stamp
+			continue
+		clock.set(max(clock.now(), stamp + offset))
+		s = Side(side) if side != NO_SIDE else None
+		match Op(op):
+			case Op.PRESS:
+				half_moves = core.half_moves
+				core.press(s)
+				if on_move is not None and core.half_moves != half_moves:
+					on_move(core)
+			case Op.ADD_TIME:
+				core.add_time(s, arg)
+			case Op.RUN:
+				core.run = bool(arg)
+			case Op.SWAP_SIDES:
+				core.swap_sides()
+			case Op.RESET:
+				core.reset()
+
+
+class Journal:
+	"""
+	Appends the operations of a Core to a journal file.
+	Attach it to a Core by adding it to Core.observers : encoding a record and queuing it is all that
+	happens on the caller's thread, while a background thread writes and commits records to disk.
+	"""
+
+	def __init__(
+			self,
+			path: str | Path,
+			cfg: Config,
+			policy: FsyncPolicy = FsyncPolicy.GROUP,
+			group_interval: float = 0.05,
+	):
+		"""
+		Journal constructor.
+		Creates the journal file if it does not exist yet, otherwise appends to it.
+		:param path: the path of the journal file
+		:param cfg: the configuration of the game, stored in the header of a new journal
+		:param policy: when to commit records to disk
+		:param group_interval: with FsyncPolicy.GROUP, maximum time between two commits, in seconds
+		"""
+		if not isinstance(cfg, Config) or not isinstance(policy, FsyncPolicy):
+			raise TypeError
+		self.path = Path(path)
+		self.policy = policy
+		self.group_interval = group_interval
+		self._file = open(self.path, 'ab')
+		if self._file.tell() == 0:
+			self._file.write(pack_header(cfg))
+		self._queue: deque[bytes] = deque()
+		self._lock = threading.Lock()
+		self._wakeup = threading.Event()
+		self._closed = False
+		self._writer = threading.Thread(target=self._write_loop, name='chessclock-journal', daemon=True)
+		self._writer.start()
+
+	def __call__(self, op: Op, side: Side | None, arg: int, stamp: int) -> None:
+		"""
+		Queue an operation of the Core; signature of chessclock.core.Observer.
+		:return: None
+		"""
+		self._queue.append(pack_record(stamp, op.value, side, arg))
+		self._wakeup.set()
+
+	def start_session(self, stamp: int) -> None:
+		"""
+		Queue the record starting a new run of the program.
+		:param stamp: the current time of the time source used from now on, in nanoseconds
+		:return: None
+		"""
+		self._queue.append(pack_record(stamp, SESSION))
+		self._wakeup.set()
+
+	def _write_loop(self) -> None:
+		while not self._closed:
+			self._wakeup.wait()
+			self._wakeup.clear()
+			if self.policy is FsyncPolicy.GROUP and not self._closed:
+				time.sleep(self.group_interval)  # let the rest of the group join the commit
+			self.flush()
+
+	def flush(self) -> None:
+		"""
+		Write every queued record now (and commit them, unless the policy is FsyncPolicy.NEVER).
+		:return: None
+		"""
+		with self._lock:
+			if not self._queue or self._file.closed:
+				return
+			records = []
+			while self._queue:
+				records.append(self._queue.popleft())
+			self._file.write(b''.join(records))
+			self._file.flush()
+			if self.policy is not FsyncPolicy.NEVER:
+				os.fsync(self._file.fileno())
+
+	def close(self) -> None:
+		"""
+		Write every queued record and close the journal file.
+		:return: None
+		"""
+		if self._closed:
+			return
+		self._closed = True
+		self._wakeup.set()
+		self._writer.join()
+		self.flush()
+		with self._lock:
+			self._file.close()
+
+
+def open_journaled_core(
+		path: str | Path,
+		cfg: Config | None = None,
+		time_source: TimeSource | None = None,
+		policy: FsyncPolicy = FsyncPolicy.GROUP,
+) -> tuple[Core, Journal]:
+	"""
+	Get a Core whose operations are journaled, recovering its state from the journal if it already exists.
+	A recovered clock is always paused.
+	:param path: the path of the journal file
+	:param cfg: the configuration of the game; if None, taken from the journal (or the default configuration for a new journal)
+	:param time_source: where the Core reads the current time from; defaults to a monotonic clock
+	:param policy: when to commit records to disk
+	:return: a tuple (Core, Journal) ; close the journal when the game is over
+	"""
+	path = Path(path)
+	records = []
+	if path.exists() and path.stat().st_size > 0:
+		controls, records, valid = read_journal(path)
+		if cfg is None:
+			cfg = Config(control_l=controls[0], control_r=controls[1])
+		elif controls != (cfg.control_l, cfg.control_r):
+			raise ValueError('the journal belongs to a game with another time control')
+		# drop a record torn by a crash, so that new records are appended right after the last valid one
+		os.truncate(path, valid)
+	if cfg is None:
+		cfg = Config()
+	clock = VirtualClock()
+	core = Core(cfg, clock)
+	replay(core, clock, records)
+	core.run = False
+	core.set_time_source(MonotonicClock() if time_source is None else time_source)
+	journal = Journal(path, cfg, policy)
+	journal.start_session(core.stamp)
+	core.observers.append(journal)
+	return core, journal
@@ -0,0 +1,269 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from array import array
+from typing import Iterable
+
+from chessclock.config import Config
+from chessclock.common.constants import *
+from chessclock.common.side import Side
+from .timesource import TimeSource, MonotonicClock
+
+
+NO_SIDE: int = 0
+
+
+class ClockPool:
+	"""
+	Many independent chess clocks stored in contiguous arrays.
+	Every board follows the exact same rules as a Core instance,
+	but all boards can be updated and queried in a single pass.
+
+	Per-side values are interleaved : the value of side `s` of board `b` lives at index `2 * b + s.value - 1`.
+	The active side of a board is stored as `Side.value`, or NO_SIDE before the first press.
+	"""
+
+	@staticmethod
+	def index(board: int, side: Side) -> int:
+		"""
+		Get the position of one side of one board in the per-side arrays.
+		:param board: the index of the board
+		:param side: the side of the clock
+		:return: the index of that side of that board in times(), flagged() and increments
+		"""
+		return 2 * board + side.value - 1
+
+	def __init__(self, size: int, cfg: Config | Iterable[Config] | None = None, time_source: TimeSource | None = None):
+		"""
+		ClockPool constructor.
+		:param size: the number of boards in the pool
+		:param cfg: a configuration shared by all boards, or one configuration per board
+		:param time_source: where to read the current time from; defaults to a monotonic clock
+		"""
+		if time_source is None:
+			time_source = MonotonicClock()
+		if not isinstance(time_source, TimeSource):
+			raise TypeError
+		if not isinstance(size, int):
+			raise TypeError
+		if size < 0:
+			raise ValueError
+		if cfg is None:
+			cfg = Config()
+		configs = [cfg] * size if isinstance(cfg, Config) else list(cfg)
+		if len(configs) != size or not all(isinstance(c, Config) for c in configs):
+			raise ValueError
+		if not all(c.control_l.simple and c.control_r.simple for c in configs):
+			raise ValueError('boards of a pool only support a starting time and a Fischer increment')
+		self.size: int = size
+		self.time_source: TimeSource = time_source
+		self._now = time_source.now
+		# constant
+		self._base: array = array('q', (SECOND * t for c in configs for t in (c.time_l, c.time_r)))
+		self.incr: array = array('q', (SECOND * i for c in configs for i in (c.increment_l, c.increment_r)))
+		# variable
+		self._times: array = array('q', self._base)
+		self._side: array = array('b', bytes(size))
+		self._running: array = array('b', bytes(size))
+		self.half_moves: array = array('q', bytes(8 * size))
+		self._stamp: array = array('q', [self._now()]) * size
+
+	def __len__(self) -> int:
+		return self.size
+
+	def _update(self, board: int, t: int) -> None:
+		"""
+		Update the timer of a single board, exactly as Core._update_times does.
+		This method should only be called from inside this class.
+		:param board: the index of the board
+		:param t: the current time, in nanoseconds
+		:return: None
+		"""
+		s = self._side[board]
+		if self._running[board] and s:
+			i = 2 * board + s - 1
+			v = self._times[i] + self._stamp[board] - t
+			self._times[i] = v if v > 0 else 0
+		self._stamp[board] = t
+
+	def _update_all(self) -> None:
+		"""
+		Update the timers of every board in one pass, using a single time reading.
+		This method should only be called from inside this class.
+		:return: None
+		"""
+		t = self._now()
+		times, sides, running, stamp = self._times, self._side, self._running, self._stamp
+		for b in range(self.size):
+			s = sides[b]
+			if running[b] and s:
+				i = 2 * b + s - 1
+				v = times[i] + stamp[b] - t
+				times[i] = v if v > 0 else 0
+			stamp[b] = t
+
+	def times(self) -> array:
+		"""
+		Get time left for each side of every board.
+		:return: a copy of the interleaved per-side array of times left, in nanoseconds
+		"""
+		self._update_all()
+		return array('q', self._times)
+
+	def flagged(self) -> array:
+		"""
+		Get flagged state for each side of every board.
+		:return: an interleaved per-side array holding 1 where that side has flagged and 0 otherwise
+		"""
+		self._update_all()
+		return array('b', [v <= 0 for v in self._times])
+
+	def board_times(self, board: int) -> dict[Side, int]:
+		"""
+		Get time left for each side of a single board, like Core.times does.
+		:param board: the index of the board
+		:return: a dictionary mapping each side to the time it has left until flagging
+		"""
+		self._update(board, self._now())
+		return {s: self._times[2 * board + s.value - 1] for s in Side}
+
+	def side(self, board: int) -> Side | None:
+		"""
+		Get the side currently counting down on a board.
+		:param board: the index of the board
+		:return: the active side, or None if the board has not been started yet
+		"""
+		s = self._side[board]
+		return Side(s) if s else None
+
+	def is_running(self, board: int) -> bool:
+		"""
+		Whether a board is running or not, like Core.run does.
+		:param board: the index of the board
+		:return: True if the board is counting down, False otherwise
+		"""
+		return bool(self._running[board] and self._side[board])
+
+	def press(self, board: int, pressed_side: Side) -> None:
+		"""
+		Called when the player on `pressed_side` of a board presses their button.
+		Follows the same rules as Core.press.
+		:param board: the index of the board
+		:param pressed_side: side relative to the clock of the button being pressed
+		:return: None
+		"""
+		assert pressed_side in Side
+		self._update(board, self._now())
+		s = self._side[board]
+		if self._running[board] and s == pressed_side.value:
+			i = 2 * board + s - 1
+			if self._times[i] > 0:
+				self._times[i] += self.incr[i]
+				self.half_moves[board] += 1
+		self._running[board] = 1
+		self._side[board] = pressed_side.value ^ 0b11
+
+	def press_many(self, boards: Iterable[int], sides: Iterable[Side]) -> None:
+		"""
+		Press buttons on several boards at once.
+		All presses of a single call share the same time reading.
+		:param boards: the indices of the boards
+		:param sides: for each board, the side of the button being pressed
+		:return: None
+		"""
+		t = self._now()
+		times, incr, running, side_of, half_moves = self._times, self.incr, self._running, self._side, self.half_moves
+		for board, pressed_side in zip(boards, sides):
+			assert pressed_side in Side
+			self._update(board, t)
+			s = side_of[board]
+			if running[board] and s == pressed_side.value:
+				i = 2 * board + s - 1
+				if times[i] > 0:
+					times[i] += incr[i]
+					half_moves[board] += 1
+			running[board] = 1
+			side_of[board] = pressed_side.value ^ 0b11
+
+	def add_time(self, board: int | None = None, player: Side | None = None, seconds: int = 15) -> None:
+		"""
+		Add time to one or both sides of one or every board.
+		:param board: the index of the board; if None, adds time to every board
+		:param player: side to which time is to be added; if None, adds time to both sides
+		:param seconds: time to add to the clock(s), in seconds
+		:return: None
+		"""
+		assert isinstance(player, Side) or player is None
+		assert isinstance(seconds, int)
+		boards = range(self.size) if board is None else (board,)
+		sides = tuple(Side) if player is None else (player,)
+		t = self._now()
+		for b in boards:
+			self._update(b, t)
+			for s in sides:
+				self._times[2 * b + s.value - 1] += SECOND * seconds
+
+	def set_running(self, board: int, is_start: bool) -> None:
+		"""
+		Set the running state of a board, like the Core.run setter does.
+		:param board: the index of the board
+		:param is_start: set to True if the board is to run; set to False otherwise
+		:return: None
+		"""
+		self._update(board, self._now())
+		self._running[board] = int(bool(is_start) and self._side[board] != NO_SIDE)
+
+	def toggle_run(self, board: int) -> None:
+		"""
+		Pause and resume countdown of a single board.
+		:param board: the index of the board
+		:return: None
+		"""
+		self.set_running(board, not self.is_running(board))
+
+	def pause_all(self) -> None:
+		"""
+		Pause every board.
+		:return: None
+		"""
+		self._update_all()
+		self._running = array('b', bytes(self.size))
+
+	def resume_all(self) -> None:
+		"""
+		Resume every board that has already been started.
+		:return: None
+		"""
+		self._update_all()
+		self._running = array('b', (s != NO_SIDE for s in self._side))
+
+	def swap_sides(self, board: int) -> bool:
+		"""
+		Swaps all aspects of a board between sides.
+		:param board: the index of the board
+		:return: True if sides were swapped, False if the board is running
+		"""
+		if self._running[board]:
+			return False
+		i = 2 * board
+		self.incr[i], self.incr[i + 1] = self.incr[i + 1], self.incr[i]
+		self._times[i], self._times[i + 1] = self._times[i + 1], self._times[i]
+		if self._side[board]:
+			self._side[board] ^= 0b11
+		return True
+
+	def reset(self, board: int | None = None) -> None:
+		"""
+		Place one or every board in a state in which it is set and ready for a new game.
+		:param board: the index of the board; if None, resets every board
+		:return: None
+		"""
+		t = self._now()
+		for b in range(self.size) if board is None else (board,):
+			i = 2 * b
+			self._running[b] = 0
+			self._times[i], self._times[i + 1] = self._base[i], self._base[i + 1]
+			self._side[b] = NO_SIDE
+			self.half_moves[b] = 0
+			self._stamp[b] = t
@@ -0,0 +1,236 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Replay recorded games as fast as possible, to resolve disputes or to audit the behaviour of the clock.
+
+A game is a time control (time_l, time_r, increment_l, increment_r, in seconds)
+and a sequence of events, in the format of the journal records : (stamp, arg, opcode, side).
+Time is read from the stamps of the events, so replaying never waits,
+and batches of games can be spread across a pool of processes.
+
+replay_game runs a flat state machine following the exact same rules as Core, like ClockPool does;
+replay_core drives an actual Core on a virtual clock, and serves as the reference when auditing.
+Journals of games with stages, delays or an hourglass are replayed on a Core, since only Core follows those rules.
+"""
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Sequence
+
+from chessclock.config import Config
+from chessclock.common.constants import SECOND
+from chessclock.common.side import Side
+from chessclock.core import Core
+from .events import Op
+from .journal import NO_SIDE, SESSION, read_journal, replay
+from .timesource import VirtualClock
+
+Control = tuple[int, int, int, int]
+Event = tuple[int, int, int, int]
+
+PRESS, ADD_TIME, RUN, SWAP_SIDES, RESET = (op.value for op in (Op.PRESS, Op.ADD_TIME, Op.RUN, Op.SWAP_SIDES, Op.RESET))
+SIDES: tuple[Side | None, ...] = (None, Side.L, Side.R)  # indexed by Side.value, NO_SIDE being 0
+
+
+class GameState(NamedTuple):
+	"""
+	The state of the clock right after a half-move.
+	"""
+	half_moves: int
+	stamp: int  # time of the press, in nanoseconds, on the time base of the recording
+	time_l: int  # in nanoseconds
+	time_r: int  # in nanoseconds
+	side: Side  # the side now counting down
+
+
+def event(stamp: int, op: Op, side: Side | None = None, arg: int = 0) -> Event:
+	"""
+	Build an event of a recorded game.
+	:param stamp: the time of the event, in nanoseconds
+	:param op: the operation
+	:param side: the side concerned by the operation, if any
+	:param arg: the integer argument of the operation (seconds for Op.ADD_TIME, 0 or 1 for Op.RUN)
+	:return: the event, in the format of a journal record
+	"""
+	return stamp, arg, op.value, side.value if side is not None else NO_SIDE
+
+
+@lru_cache(maxsize=256)
+def _config(control: Control) -> Config:
+	# building a Config builds a Keymap; games of an archive share a handful of time controls
+	return Config(time_l=control[0], time_r=control[1], increment_l=control[2], increment_r=control[3])
+
+
+def _replay_flat(control: Control, events: Iterable[Event]) -> list[int]:
+	"""
+	Replay a single game, following the exact same rules as Core.
+	This function should only be called from inside this module.
+	:param control: the time control of the game, as (time_l, time_r, increment_l, increment_r) in seconds
+	:param events: the events of the game, in the order in which they happened
+	:return: the fields of the state of the clock after each half-move, concatenated, the side being a Side.value
+	"""
+	base = [SECOND * control[0], SECOND * control[1]]
+	incr = [SECOND * control[2], SECOND * control[3]]
+	times = base.copy()
+	running = False
+	side = NO_SIDE
+	half_moves = 0
+	now = 0  # time of the virtual clock
+	offset = 0  # from the time base of the current session to the virtual clock
+	states: list[int] = []
+	extend = states.extend
+	for stamp, arg, op, s in events:
+		if op == SESSION:
+			running = False
+			offset = now - stamp
+			continue
+		t = stamp + offset
+		if t > now:
+			if running and side:
+				v = times[side - 1] + now - t
+				times[side - 1] = v if v > 0 else 0
+			now = t
+		if op == PRESS:
+			if running and s == side and times[s - 1] > 0:
+				times[s - 1] += incr[s - 1]
+				half_moves += 1
+				extend((half_moves, now, times[0], times[1], s ^ 0b11))
+			running = True
+			side = s ^ 0b11
+		elif op == ADD_TIME:
+			if s == NO_SIDE:
+				times[0] += SECOND * arg
+				times[1] += SECOND * arg
+			else:
+				times[s - 1] += SECOND * arg
+		elif op == RUN:
+			running = bool(arg) and side != NO_SIDE
+		elif op == SWAP_SIDES:
+			if not running:
+				incr.reverse()
+				times.reverse()
+				if side:
+					side ^= 0b11
+		elif op == RESET:
+			running = False
+			times = base.copy()
+			side = NO_SIDE
+			half_moves = 0
+	return states
+
+
+def _unpack(flat: Sequence[int]) -> list[GameState]:
+	n = len(GameState._fields)
+	return list(map(GameState, flat[0::n], flat[1::n], flat[2::n], flat[3::n], map(SIDES.__getitem__, flat[4::n])))
+
+
+def replay_game(control: Control, events: Iterable[Event]) -> list[GameState]:
+	"""
+	Replay a single game.
+	:param control: the time control of the game, as (time_l, time_r, increment_l, increment_r) in seconds
+	:param events: the events of the game, in the order in which they happened
+	:return: the state of the clock after each half-move
+	"""
+	return _unpack(_replay_flat(control, events))
+
+
+def replay_core(control: Control | Config, events: Iterable[Event]) -> list[GameState]:
+	"""
+	Replay a single game on a Core reading time from a virtual clock.
+	Slower than replay_game, but exercises the actual clock logic.
+	:param control: the time control of the game, as (time_l, time_r, increment_l, increment_r) in seconds, or a Config
+	:param events: the events of the game, in the order in which they happened
+	:return: the state of the clock after each half-move
+	"""
+	clock = VirtualClock()
+	core = Core(control if isinstance(control, Config) else _config(tuple(control)), clock)
+	states: list[GameState] = []
+
+	def record(c: Core) -> None:
+		times = c.times
+		states.append(GameState(c.half_moves, c.stamp, times[Side.L], times[Side.R], c.side))
+
+	replay(core, clock, events, record)
+	return states
+
+
+def replay_journal(path: str | Path) -> list[GameState]:
+	"""
+	Replay the game held by a journal file.
+	:param path: the path of the journal
+	:return: the state of the clock after each half-move
+	"""
+	control, records = _read_game(path)
+	if isinstance(control, Config):
+		return replay_core(control, records)
+	return replay_game(control, records)
+
+
+def _read_game(path: str | Path) -> tuple[Control | Config, list[Event]]:
+	"""
+	Read the game held by a journal file.
+	This function should only be called from inside this module.
+	:param path: the path of the journal
+	:return: a tuple (time control, events), the time control being a Config unless replay_game can follow it
+	"""
+	(control_l, control_r), records, _ = read_journal(path)
+	if control_l.simple and control_r.simple:
+		return (control_l.time, control_r.time, control_l.increment, control_r.increment), records
+	return Config(control_l=control_l, control_r=control_r), records
+
+
+def _replay_game_packed(game: tuple[Control, Iterable[Event]]) -> array:
+	return array('q', _replay_flat(*game))
+
+
+def _replay_journal_packed(path: str | Path) -> array:
+	control, records = _read_game(path)
+	if isinstance(control, Config):
+		return array('q', (v for s in replay_core(control, records) for v in (*s[:-1], s.side.value)))
+	return array('q', _replay_flat(control, records))
+
+
+def _map(function, items: Iterable, processes: int | None, chunksize: int) -> Iterator[list[GameState]]:
+	# named tuples and enums are slow to pickle : workers send flat arrays of integers back
+	with ProcessPoolExecutor(max_workers=processes) as pool:
+		for packed in pool.map(function, items, chunksize=chunksize):
+			yield _unpack(packed)
+
+
+def replay_games(
+		games: Iterable[tuple[Control, Iterable[Event]]],
+		processes: int | None = None,
+		chunksize: int = 64,
+) -> Iterator[list[GameState]]:
+	"""
+	Replay a batch of games across a pool of processes.
+	:param games: the games, as (time control, events) tuples
+	:param processes: the number of worker processes; None for one per CPU, 1 to replay in this process
+	:param chunksize: the number of games sent to a worker at once
+	:return: an iterator over the states of each game, in the order of the games
+	"""
+	if processes == 1:
+		return (replay_game(*game) for game in games)
+	return _map(_replay_game_packed, games, processes, chunksize)
+
+
+def replay_journals(
+		paths: Iterable[str | Path],
+		processes: int | None = None,
+		chunksize: int = 16,
+) -> Iterator[list[GameState]]:
+	"""
+	Replay an archive of journal files across a pool of processes.
+	Each worker reads the journals it replays, so that records are never sent between processes.
+	:param paths: the paths of the journals
+	:param processes: the number of worker processes; None for one per CPU, 1 to replay in this process
+	:param chunksize: the number of journals sent to a worker at once
+	:return: an iterator over the states of each game, in the order of the paths
+	"""
+	if processes == 1:
+		return map(replay_journal, paths)
+	return _map(_replay_journal_packed, paths, processes, chunksize)
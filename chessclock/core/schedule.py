@@ -0,0 +1,81 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from chessclock.common.constants import SECOND
+from chessclock.config.control import Mode, TimeControl
+
+
+class Schedule:
+	"""
+	A time control compiled for one side, before the game starts.
+
+	Every move before the last stage has its own entry in flat tuples, indexed by move number,
+	and every move of the last stage shares the entry following them :
+	looking up what a move earns is a couple of reads, whatever the number of stages.
+	Tuples rather than arrays, as reading an array item creates a new integer object.
+	"""
+
+	def __init__(self, control: TimeControl):
+		"""
+		Schedule constructor.
+		:param control: the time control to compile
+		"""
+		if not isinstance(control, TimeControl):
+			raise TypeError
+		stages = control.stages
+		self.control: TimeControl = control
+		self.hourglass: bool = control.hourglass
+		self.start: int = SECOND * stages[0].time  # in nanoseconds
+		self.end: int = sum(s.moves for s in stages[:-1])  # the number of moves before the last stage
+		# indexed by move number, from 1 to end + 1; in nanoseconds
+		size = self.end + 2
+		fischer, bronstein, delay = [0] * size, [0] * size, [0] * size
+		bonus = [0] * size  # time of the next stage, after its last move
+		m = 1
+		for i, stage in enumerate(stages):
+			count = stage.moves if i < len(stages) - 1 else 1
+			per_move = {Mode.FISCHER: fischer, Mode.BRONSTEIN: bronstein, Mode.DELAY: delay}[stage.mode]
+			for _ in range(count):
+				per_move[m] = SECOND * stage.bonus
+				m += 1
+			if i < len(stages) - 1:
+				bonus[m - 1] = SECOND * stages[i + 1].time
+		self._fischer: tuple[int, ...] = tuple(fischer)
+		self._bronstein: tuple[int, ...] = tuple(bronstein)
+		self._delay: tuple[int, ...] = tuple(delay)
+		self._bonus: tuple[int, ...] = tuple(bonus)
+		self._increment: tuple[int, ...] = tuple(map(sum, zip(fischer, bronstein, delay)))
+		last = stages[-1]
+		self.period: int = last.moves  # the last stage repeats every period moves, if not 0
+		self.period_time: int = SECOND * last.time
+
+	def after(self, move: int, spent: int) -> int:
+		"""
+		Get the time a player earns once they complete a move.
+		:param move: the number of the move just completed, starting at 1
+		:param spent: the time counted down during the move, in nanoseconds
+		:return: the time to add to the clock of the player, in nanoseconds
+		"""
+		k = move if move <= self.end else self.end + 1
+		bronstein = self._bronstein[k]
+		t = self._fischer[k] + self._bonus[k] + (spent if spent < bronstein else bronstein)
+		if k > self.end and self.period and not (move - self.end) % self.period:
+			t += self.period_time
+		return t
+
+	def delay(self, move: int) -> int:
+		"""
+		Get the simple delay before the clock starts counting down a move.
+		:param move: the move number, starting at 1
+		:return: the delay, in nanoseconds
+		"""
+		return self._delay[move if move <= self.end else self.end + 1]
+
+	def increment(self, move: int) -> int:
+		"""
+		Get the time granted per move, whatever the way it is granted.
+		:param move: the move number, starting at 1
+		:return: the increment or delay, in nanoseconds
+		"""
+		return self._increment[move if move <= self.end else self.end + 1]
@@ -0,0 +1,74 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from time import perf_counter_ns
+
+
+class TimeSource:
+	"""
+	Where the clock reads the current time from.
+	Subclass this class and override now() to provide another source of time.
+	"""
+
+	def now(self) -> int:
+		"""
+		Get the current time.
+		Only differences between two readings are meaningful; the origin of the time is arbitrary.
+		:return: the current time, in nanoseconds
+		"""
+		raise NotImplementedError
+
+
+class MonotonicClock(TimeSource):
+	"""
+	The default time source : the highest resolution monotonic clock of the system.
+	Unlike wall-clock time, it never jumps when the system time is adjusted (by NTP for instance).
+	"""
+
+	def now(self) -> int:
+		return perf_counter_ns()
+
+
+class VirtualClock(TimeSource):
+	"""
+	A time source that only moves forward when told to.
+	Lets tests, simulations and replays run hours of play in no time.
+	"""
+
+	def __init__(self, start: int = 0):
+		"""
+		VirtualClock constructor.
+		:param start: the initial time, in nanoseconds
+		"""
+		if not isinstance(start, int):
+			raise TypeError
+		self.time: int = start
+
+	def now(self) -> int:
+		return self.time
+
+	def advance(self, ns: int) -> int:
+		"""
+		Move time forward.
+		:param ns: the duration to move forward by, in nanoseconds
+		:return: the new current time, in nanoseconds
+		"""
+		if not isinstance(ns, int):
+			raise TypeError
+		if ns < 0:
+			raise ValueError
+		self.time += ns
+		return self.time
+
+	def set(self, ns: int) -> None:
+		"""
+		Move time forward to a given time.
+		:param ns: the new current time, in nanoseconds; must not be in the past
+		:return: None
+		"""
+		if not isinstance(ns, int):
+			raise TypeError
+		if ns < self.time:
+			raise ValueError
+		self.time = ns
@@ -6,15 +6,20 @@ from typing import Callable
 
 from chessclock.common import Side, SECOND
 from chessclock.config import Action, parse_args
-from chessclock.core import Core
+from chessclock.core import Core, TimeSource
+from chessclock.core.journal import Journal, open_journaled_core
 from chessclock.themes import Theme, get_theme
-from chessclock.ui import Interface
+from chessclock.ui import ClockState, Interface
 
 
 class DefaultInterface(Interface):
 	def __init__(self):
 		cfg = parse_args()
-		self.core = Core(cfg)
+		self.journal: Journal | None = None
+		if cfg.journal:
+			self.core, self.journal = open_journaled_core(cfg.journal, cfg)
+		else:
+			self.core = Core(cfg)
 		self.actions: dict[Action, Callable] = {
 			Action.PRESS_L: (lambda: self.core.press(Side.L)),
 			Action.PRESS_R: (lambda: self.core.press(Side.R)),
@@ -30,32 +35,34 @@ class DefaultInterface(Interface):
 	def get_theme(self) -> Theme | None:
 		return get_theme(self.core.config.theme_name)
 
-	# CONFIG
+	# STATE
 
-	def get_base_time_ns(self) -> dict[Side, int]:
-		return {
-			Side.L: self.core.config.time_l * SECOND,
-			Side.R: self.core.config.time_r * SECOND,
-		}
-
-	def get_increment_ns(self) -> dict[Side, int]:
-		return {
-			Side.L: self.core.config.increment_l * SECOND,
-			Side.R: self.core.config.increment_r * SECOND,
-		}
+	def snapshot(self) -> ClockState:
+		core = self.core
+		times = core.times  # the only read of the time source
+		incr = core.incr  # granted for the next move of each side, whatever the stage and the way it is granted
+		cfg = core.config
+		return ClockState(
+			times[Side.L], times[Side.R], core.side, core.run,
+			cfg.time_l * SECOND, cfg.time_r * SECOND, incr[Side.L], incr[Side.R],
+			core.stamp,
+		)
 
-	# GETTERS
+	# TIMING
 
-	def get_current_times_ns(self) -> dict[Side, int]:
-		return self.core.times
+	def get_time_source(self) -> TimeSource | None:
+		return self.core.time_source
 
-	def get_current_side(self) -> Side | None:
-		return self.core.side
-
-	def is_running(self) -> bool:
-		return self.core.run
+	def get_last_update_ns(self) -> int | None:
+		return self.core.stamp
 
 	# ACTIONS
 
 	def get_action_map(self) -> dict[Action, Callable[[], None]]:
 		return self.actions
+
+	def act(self, action: Action | None, stamp: int | None = None) -> None:
+		if action in (Action.PRESS_L, Action.PRESS_R):
+			self.core.press(Side.L if action is Action.PRESS_L else Side.R, stamp)
+		else:
+			super().act(action, stamp)
@@ -0,0 +1,6 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from .devices import InputDevice, EvdevDevice, SyntheticDevice, EVDEV_KEYS
+from .backend import InputBackend, InputEvent
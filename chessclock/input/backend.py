@@ -0,0 +1,170 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import os
+import select
+import threading
+from collections import deque
+from typing import Callable, NamedTuple
+
+from chessclock.common import Side
+from chessclock.config.keymap import Action, Keymap
+from chessclock.core import Core, CompactCore
+from chessclock.ui.interface import Interface
+from .devices import InputDevice
+
+Target = Interface | Core | CompactCore
+
+# actions on a Core, dated by an input device : presses happened at that date, anything else happens now
+OPERATIONS: dict[Action, Callable[[Core | CompactCore, int | None], object]] = {
+	Action.PRESS_L: lambda core, stamp: core.press(Side.L, stamp),
+	Action.PRESS_R: lambda core, stamp: core.press(Side.R, stamp),
+	Action.ADDTIME_L: lambda core, stamp: core.add_time(Side.L),
+	Action.ADDTIME_R: lambda core, stamp: core.add_time(Side.R),
+	Action.PLAY_PAUSE: lambda core, stamp: core.toggle_run(),
+	Action.SWAP_SIDES: lambda core, stamp: core.swap_sides(),
+	Action.RESET: lambda core, stamp: core.reset(),
+}
+
+
+class InputEvent(NamedTuple):
+	device: int  # the index of the device in InputBackend.devices
+	symbol: int  # the key symbol
+	action: Action
+	stamp: int  # when the device registered the press, read from the time source of the clock, in nanoseconds
+
+
+class Binding(NamedTuple):
+	device: InputDevice
+	keymap: Keymap
+	target: Target  # the board the device operates
+
+
+class InputBackend:
+	"""
+	Reads key presses from input devices on a dedicated thread, and hands them to the clocks through a queue.
+
+	Presses keep the time the device registered them at, so that a press waiting for a slow frame to end,
+	or for the event loop of the user interface to dispatch it, is not counted against the player who made it.
+	Each device has a Keymap of its own and operates a board of its own : several boards can share a host,
+	each with its own keyboard or pedals, and the same key means something else on each device.
+
+	The reader thread only appends events to a deque, and the thread operating the clocks only pops them :
+	both operations are atomic in CPython, so neither thread ever waits for the other.
+	"""
+
+	def __init__(self):
+		self.devices: list[Binding] = []
+		self.queue: deque[InputEvent] = deque()
+		self.wakeup: Callable[[], None] | None = None  # called on the reader thread whenever events were queued
+		self.dispatched: int = 0
+		self._reading: set[int] = set()  # devices still readable
+		self._thread: threading.Thread | None = None
+		self._stopped = False
+		self._wake_r, self._wake_w = os.pipe()  # interrupts the reader thread waiting for devices
+
+	def add_device(self, device: InputDevice, keymap: Keymap, target: Target) -> int:
+		"""
+		Read key presses from a device.
+		:param device: the device
+		:param keymap: the mapping of the keys of the device to actions
+		:param target: the Interface or Core the actions apply to
+		:return: the index of the device in this backend
+		"""
+		if not isinstance(device, InputDevice) or not isinstance(keymap, Keymap):
+			raise TypeError
+		if not isinstance(target, (Interface, Core, CompactCore)):
+			raise TypeError
+		index = len(self.devices)
+		self.devices.append(Binding(device, keymap, target))
+		self._reading.add(index)
+		os.write(self._wake_w, b'\0')  # the reader thread waits for this device as well from now on
+		return index
+
+	def poll(self, timeout: float | None = 0) -> int:
+		"""
+		Wait for devices to be ready, and queue the presses they registered that are bound to an action.
+		Called in a loop by the reader thread.
+		:param timeout: the longest time to wait, in seconds, or None to wait for as long as it takes
+		:return: the number of events queued
+		"""
+		reading = sorted(self._reading)
+		ready = select.select([self._wake_r, *(self.devices[i].device for i in reading)], [], [], timeout)[0]
+		if self._wake_r in ready:
+			os.read(self._wake_r, 4096)
+		batch: list[InputEvent] = []
+		for index in reading:
+			device, keymap, _ = self.devices[index]
+			if device not in ready:
+				continue
+			try:
+				presses = device.read()
+			except OSError:
+				self._reading.discard(index)  # unplugged
+				continue
+			for symbol, stamp in presses:
+				action = keymap.get(symbol)
+				if action is not None:
+					batch.append(InputEvent(index, symbol, action, stamp))
+		# devices are read one after the other : queue their presses in the order they were registered in
+		batch.sort(key=lambda event: event.stamp)
+		self.queue.extend(batch)
+		if batch and self.wakeup is not None:
+			self.wakeup()
+		return len(batch)
+
+	def dispatch(self) -> int:
+		"""
+		Apply the queued events to their boards, in the order the devices registered them.
+		Call this method on the thread operating the boards, before reading them : a board read after a press was
+		registered but before it is applied has already counted the time up to the read against the player.
+		:return: the number of events applied
+		"""
+		queue, applied = self.queue, 0
+		while queue:
+			event = queue.popleft()
+			target = self.devices[event.device].target
+			if isinstance(target, Interface):
+				target.act(event.action, event.stamp)
+			else:
+				OPERATIONS[event.action](target, event.stamp)
+			applied += 1
+		self.dispatched += applied
+		return applied
+
+	def start(self) -> threading.Thread:
+		"""
+		Read the devices from a background thread.
+		:return: the thread
+		"""
+		self._stopped = False
+		self._thread = threading.Thread(target=self._run, name='chessclock-input', daemon=True)
+		self._thread.start()
+		return self._thread
+
+	def _run(self) -> None:
+		while not self._stopped:
+			self.poll(None)
+
+	def stop(self) -> None:
+		"""
+		Stop the background thread.
+		:return: None
+		"""
+		self._stopped = True
+		os.write(self._wake_w, b'\0')
+		if self._thread is not None:
+			self._thread.join()
+			self._thread = None
+
+	def close(self) -> None:
+		"""
+		Stop the background thread, and close every device.
+		:return: None
+		"""
+		self.stop()
+		for binding in self.devices:
+			binding.device.close()
+		os.close(self._wake_r)
+		os.close(self._wake_w)
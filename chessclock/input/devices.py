@@ -0,0 +1,182 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import os
+import struct
+import time
+
+from chessclock.common import SECOND
+from chessclock.config.keymap import Key
+from chessclock.core import TimeSource, MonotonicClock
+
+# struct input_event of the Linux input subsystem : struct timeval (seconds, microseconds), type, code, value
+EVENT = struct.Struct('llHHi')
+EV_SYN = 0x00
+EV_KEY = 0x01
+KEY_UP, KEY_DOWN, KEY_REPEAT = 0, 1, 2  # values of EV_KEY events
+EVIOCGRAB = 0x40044590  # _IOW('E', 0x90, int) : take the device from every other reader, the display server included
+EVIOCSCLOCKID = 0x400445a0  # _IOW('E', 0xa0, int) : the clock events are timestamped with
+
+# Linux key codes (linux/input-event-codes.h) to key symbols, with the same values as in pyglet.window.key
+EVDEV_KEYS: dict[int, int] = {
+	1: Key.ESCAPE,
+	11: ord('0'),
+	**{2 + i: ord(str(i + 1)) for i in range(9)},
+	**{16 + i: ord(c) for i, c in enumerate('qwertyuiop')},
+	**{30 + i: ord(c) for i, c in enumerate('asdfghjkl')},
+	**{44 + i: ord(c) for i, c in enumerate('zxcvbnm')},
+	28: Key.ENTER,
+	29: Key.LCTRL,
+	42: 0xffe1,  # left shift
+	54: 0xffe2,  # right shift
+	57: Key.SPACE,
+	97: Key.RCTRL,
+	96: Key.NUM_ENTER,
+	**{code: 0xffb0 + n for code, n in zip((82, 79, 80, 81, 75, 76, 77, 71, 72, 73), range(10))},  # numpad 0 to 9
+}
+
+
+class InputDevice:
+	"""
+	A source of key presses read by an InputBackend, on its reader thread.
+	Subclass this class and override fileno() and read() to read presses from another kind of device.
+	"""
+
+	name: str = ''
+
+	def fileno(self) -> int:
+		"""
+		:return: a file descriptor that is ready for reading whenever presses can be read
+		"""
+		raise NotImplementedError
+
+	def read(self) -> list[tuple[int, int]]:
+		"""
+		Read the key presses that are ready, without blocking.
+		:return: a list of tuples (key symbol, time of the press read from the time source of the clock, in nanoseconds)
+		"""
+		raise NotImplementedError
+
+	def close(self) -> None:
+		pass
+
+
+class EvdevDevice(InputDevice):
+	"""
+	A stream of Linux input events (evdev), as read from /dev/input/event*.
+	Each press is dated by the kernel, when the device reported it, and not by when the clock gets to handle it.
+	"""
+
+	@staticmethod
+	def open(path: str, time_source: TimeSource | None = None, grab: bool = True) -> 'EvdevDevice':
+		"""
+		Open an input device.
+		:param path: the path of the device, e.g. /dev/input/event3 or a link in /dev/input/by-id
+		:param time_source: the time source of the clock the presses are for; defaults to a monotonic clock
+		:param grab: if True, the device is taken from the display server : its keys do not reach windows anymore,
+			so that no press is registered twice by a window listening to the keyboard as well
+		:return: the device
+		"""
+		import fcntl  # not available on Windows, which has no evdev devices anyway
+		if time_source is None:
+			time_source = MonotonicClock()
+		if not isinstance(time_source, TimeSource):
+			raise TypeError
+		fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+		try:
+			clock = time.CLOCK_MONOTONIC
+			try:
+				fcntl.ioctl(fd, EVIOCSCLOCKID, struct.pack('i', clock))
+			except OSError:
+				clock = time.CLOCK_REALTIME  # the default clock of event timestamps
+			if grab:
+				fcntl.ioctl(fd, EVIOCGRAB, 1)
+		except BaseException:
+			os.close(fd)
+			raise
+		# the time source and the clock of the device tick at the same rate : only their origins differ
+		offset = time_source.now() - time.clock_gettime_ns(clock)
+		return EvdevDevice(fd, offset, path)
+
+	def __init__(self, fd: int, offset: int = 0, name: str = ''):
+		"""
+		EvdevDevice constructor.
+		:param fd: a file descriptor to read input events from, set to non-blocking mode
+		:param offset: added to the timestamps of events to get times of the time source of the clock, in nanoseconds
+		:param name: a name for the device, e.g. its path
+		"""
+		if not all(isinstance(x, int) for x in (fd, offset)) or not isinstance(name, str):
+			raise TypeError
+		self.fd: int = fd
+		self.offset: int = offset
+		self.name = name
+		self._partial: bytes = b''  # the beginning of an event not read entirely yet
+
+	def fileno(self) -> int:
+		return self.fd
+
+	def read(self) -> list[tuple[int, int]]:
+		try:
+			data = self._partial + os.read(self.fd, EVENT.size * 64)
+		except BlockingIOError:
+			return []
+		end = len(data) - len(data) % EVENT.size
+		self._partial = data[end:]
+		presses = []
+		for seconds, microseconds, kind, code, value in EVENT.iter_unpack(data[:end]):
+			# releases and auto repeats are no presses
+			if kind == EV_KEY and value == KEY_DOWN and code in EVDEV_KEYS:
+				presses.append((EVDEV_KEYS[code], seconds * SECOND + microseconds * 1000 + self.offset))
+		return presses
+
+	def close(self) -> None:
+		if self.fd >= 0:
+			os.close(self.fd)
+			self.fd = -1
+
+
+class SyntheticDevice(EvdevDevice):
+	"""
+	An input device fed by the program itself, for tests and simulations.
+	Events are written to a pipe in the format of the Linux input subsystem, and read as an EvdevDevice reads a device.
+	"""
+
+	def __init__(self, name: str = 'synthetic'):
+		"""
+		SyntheticDevice constructor.
+		:param name: a name for the device
+		"""
+		fd, self.write_fd = os.pipe()
+		os.set_blocking(fd, False)
+		super().__init__(fd, 0, name)  # events are timestamped with times of the time source of the clock
+
+	def emit(self, code: int, value: int, stamp: int, kind: int = EV_KEY) -> None:
+		"""
+		Write one input event, followed by the report that ends every batch of events of a device.
+		:param code: a Linux key code (see EVDEV_KEYS)
+		:param value: KEY_DOWN, KEY_UP or KEY_REPEAT
+		:param stamp: the time of the event, read from the time source of the clock, in nanoseconds
+		:param kind: the type of the event
+		:return: None
+		"""
+		seconds, rest = divmod(stamp, SECOND)
+		microseconds = rest // 1000
+		event = EVENT.pack(seconds, microseconds, kind, code, value)
+		os.write(self.write_fd, event + EVENT.pack(seconds, microseconds, EV_SYN, 0, 0))
+
+	def press(self, code: int, stamp: int) -> None:
+		"""
+		Press and release a key.
+		:param code: a Linux key code (see EVDEV_KEYS)
+		:param stamp: the time of the press, read from the time source of the clock, in nanoseconds
+		:return: None
+		"""
+		self.emit(code, KEY_DOWN, stamp)
+		self.emit(code, KEY_UP, stamp)
+
+	def close(self) -> None:
+		super().close()
+		if self.write_fd >= 0:
+			os.close(self.write_fd)
+			self.write_fd = -1
@@ -0,0 +1,8 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from .protocol import BoardState, encode_update, encode_frame, decode_frame
+from .server import BroadcastServer, board_state
+from .client import Spectator
+from .shm import SharedStateExporter, SharedStateReader, Snapshot
@@ -0,0 +1,76 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import asyncio
+import time
+from typing import AsyncIterator
+
+from chessclock.common.side import Side
+from .protocol import LENGTH, BoardState, decode_frame
+
+
+class Spectator:
+	"""
+	Receives the state of the boards of a BroadcastServer, for display on a spectator screen or a stream overlay.
+	"""
+
+	def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+		"""
+		Spectator constructor; use Spectator.connect_tcp or Spectator.connect_unix instead.
+		:param reader: the stream frames are read from
+		:param writer: the other end of the connection
+		"""
+		self.reader = reader
+		self.writer = writer
+		self.boards: dict[int, BoardState] = {}
+		self.received_ns: dict[int, int] = {}  # time of the last update of each board, read from time.perf_counter_ns
+
+	@classmethod
+	async def connect_tcp(cls, host: str = '127.0.0.1', port: int = 0) -> 'Spectator':
+		return cls(*await asyncio.open_connection(host, port))
+
+	@classmethod
+	async def connect_unix(cls, path: str) -> 'Spectator':
+		return cls(*await asyncio.open_unix_connection(path))
+
+	async def receive(self) -> set[int]:
+		"""
+		Wait for the next frame and apply it.
+		:return: the indices of the boards that changed
+		:raise asyncio.IncompleteReadError: when the server closes the connection
+		"""
+		length, = LENGTH.unpack(await self.reader.readexactly(LENGTH.size))
+		changed = decode_frame(await self.reader.readexactly(length), self.boards)
+		t = time.perf_counter_ns()
+		for board in changed:
+			self.received_ns[board] = t
+		return changed
+
+	async def updates(self) -> AsyncIterator[set[int]]:
+		"""
+		Iterate over the boards changed by each frame, until the server closes the connection.
+		:return: an asynchronous iterator over sets of board indices
+		"""
+		while True:
+			try:
+				yield await self.receive()
+			except asyncio.IncompleteReadError:
+				return
+
+	def times(self, board: int) -> dict[Side, int]:
+		"""
+		Get time left for each side of a board, counting down the active side since its last update.
+		:param board: the index of the board
+		:return: a dictionary mapping each side to the time it has left until flagging, in nanoseconds
+		"""
+		state = self.boards[board]
+		times = {Side.L: state.time_l, Side.R: state.time_r}
+		if state.running and state.active_side is not None:
+			elapsed = time.perf_counter_ns() - self.received_ns[board]
+			times[state.active_side] = max(0, times[state.active_side] - elapsed)
+		return times
+
+	async def close(self) -> None:
+		self.writer.close()
+		await self.writer.wait_closed()
@@ -0,0 +1,108 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Wire format of the broadcast server.
+
+The server sends frames, each made of a 4 byte length followed by board updates.
+An update is the index of the board (2 bytes), a mask of the fields that changed (1 byte),
+and the new value of each changed field, in the order of BoardState, as an 8 byte signed integer.
+All integers are little-endian. The first frame received by a subscriber holds every field of every board.
+
+Times are those of the moment the state changed : while a board is running,
+subscribers count down the time of the active side themselves.
+"""
+
+import struct
+from functools import lru_cache
+from typing import NamedTuple
+
+from chessclock.common.side import Side
+
+LENGTH = struct.Struct('<I')
+UPDATE = struct.Struct('<HB')
+NO_SIDE = 0
+
+
+class BoardState(NamedTuple):
+	"""
+	The state of a board, as seen by subscribers.
+	"""
+	time_l: int  # in nanoseconds
+	time_r: int  # in nanoseconds
+	side: int  # Side.value of the side counting down, or NO_SIDE before the first press
+	running: int  # 1 if the board is counting down, 0 otherwise
+	half_moves: int
+
+	@property
+	def active_side(self) -> Side | None:
+		"""
+		The side counting down.
+		:return: the active side, or None if the board has not been started yet
+		"""
+		return Side(self.side) if self.side != NO_SIDE else None
+
+
+FIELDS = len(BoardState._fields)
+FULL = (1 << FIELDS) - 1  # mask of an update holding every field
+
+
+@lru_cache(maxsize=1 << FIELDS)
+def _values(mask: int) -> struct.Struct:
+	return struct.Struct('<' + 'q' * mask.bit_count())
+
+
+def encode_update(board: int, old: BoardState | None, new: BoardState) -> bytes:
+	"""
+	Encode the changes of a board.
+	:param board: the index of the board
+	:param old: the state last sent to the subscriber, or None if it has not received any
+	:param new: the current state
+	:return: the encoded update, empty if nothing changed
+	"""
+	if old is None:
+		mask, values = FULL, new
+	else:
+		mask = 0
+		values = []
+		for i in range(FIELDS):
+			if old[i] != new[i]:
+				mask |= 1 << i
+				values.append(new[i])
+		if not mask:
+			return b''
+	return UPDATE.pack(board, mask) + _values(mask).pack(*values)
+
+
+def encode_frame(updates: list[bytes]) -> bytes:
+	"""
+	Assemble updates into a frame.
+	:param updates: encoded updates, as returned by encode_update
+	:return: the frame, empty if there are no updates
+	"""
+	body = b''.join(updates)
+	return LENGTH.pack(len(body)) + body if body else b''
+
+
+def decode_frame(body: bytes, states: dict[int, BoardState]) -> set[int]:
+	"""
+	Apply the updates of a frame.
+	:param body: the frame, without its length
+	:param states: the states of the boards, updated in place
+	:return: the indices of the boards that changed
+	"""
+	changed = set()
+	offset = 0
+	while offset < len(body):
+		board, mask = UPDATE.unpack_from(body, offset)
+		offset += UPDATE.size
+		values = _values(mask)
+		it = iter(values.unpack_from(body, offset))
+		offset += values.size
+		old = states.get(board)
+		if old is None and mask != FULL:
+			raise ValueError('partial update of an unknown board')
+		states[board] = BoardState(*(next(it) if mask >> i & 1 else old[i] for i in range(FIELDS)))
+		changed.add(board)
+	return changed
@@ -0,0 +1,242 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import asyncio
+import threading
+from typing import Iterable
+
+from chessclock.common.side import Side
+from chessclock.core import Core, CompactCore, Op
+from .protocol import NO_SIDE, BoardState, encode_frame, encode_update
+
+
+def board_state(core: Core) -> BoardState:
+	"""
+	Read the state of a Core.
+	:param core: the Core
+	:return: its state, as sent to subscribers
+	"""
+	times = core.times
+	return BoardState(
+		times[Side.L],
+		times[Side.R],
+		core.side.value if isinstance(core.side, Side) else NO_SIDE,
+		int(core.run),
+		core.half_moves,
+	)
+
+
+class Subscriber(asyncio.Protocol):
+	"""
+	A connection to a spectator display.
+	Never read from : subscribers only receive frames.
+	"""
+
+	def __init__(self, server: 'BroadcastServer'):
+		self.server = server
+		self.transport: asyncio.WriteTransport | None = None
+		self.paused: bool = False
+		# states last sent, while the subscriber lags behind the published states; None when in sync
+		self.behind: list[BoardState | None] | None = None
+
+	def connection_made(self, transport: asyncio.BaseTransport) -> None:
+		self.transport = transport
+		transport.set_write_buffer_limits(high=self.server.write_buffer)
+		self.server.subscribers.add(self)
+		self.transport.write(encode_frame([encode_update(b, None, s) for b, s in enumerate(self.server.published)]))
+
+	def connection_lost(self, exc: Exception | None) -> None:
+		self.server.subscribers.discard(self)
+
+	def pause_writing(self) -> None:
+		self.paused = True
+
+	def resume_writing(self) -> None:
+		self.paused = False
+		if self.behind is not None:
+			self.server.schedule()
+
+
+class BroadcastServer:
+	"""
+	Pushes the state of one or many Core instances to spectator displays, over TCP or a Unix socket.
+
+	Cores notify the server after every operation, from whichever thread operates them :
+	the server only records the new state and wakes up its event loop, so it never slows down the clock.
+	All changes made before the event loop wakes up are coalesced into a single frame, encoded once,
+	and sent to every subscriber that received all previous frames.
+	A subscriber whose connection cannot keep up is skipped; once it drains, it receives a single frame
+	holding every change it missed.
+	"""
+
+	def __init__(self, cores: Core | Iterable[Core] = (), write_buffer: int = 1 << 16):
+		"""
+		BroadcastServer constructor.
+		:param cores: the Core (or Cores) to broadcast; more can be attached later
+		:param write_buffer: the number of bytes queued on a connection above which its subscriber is skipped
+		"""
+		self.write_buffer = write_buffer
+		self.cores: list[Core] = []
+		self.published: list[BoardState] = []  # states sent in the last frame, one per board
+		self.subscribers: set[Subscriber] = set()
+		self.loop: asyncio.AbstractEventLoop | None = None
+		self._servers: list[asyncio.AbstractServer] = []
+		self._lock = threading.Lock()
+		self._pending: dict[int, BoardState] = {}
+		self._scheduled = False
+		for core in [cores] if isinstance(cores, (Core, CompactCore)) else cores:
+			self.attach(core)
+
+	def attach(self, core: Core) -> int:
+		"""
+		Start broadcasting a Core.
+		:param core: the Core
+		:return: the index of its board
+		"""
+		if not isinstance(core, (Core, CompactCore)):
+			raise TypeError
+		state = board_state(core)
+		with self._lock:
+			board = len(self.cores)
+			self.cores.append(core)
+			self._pending[board] = state
+
+		def observer(op: Op, side: Side | None, arg: int, stamp: int) -> None:
+			self.update(board)
+
+		core.observers.append(observer)
+		self.schedule()
+		return board
+
+	def update(self, board: int) -> None:
+		"""
+		Record the current state of a board, to be sent to subscribers.
+		Safe to call from any thread.
+		:param board: the index of the board
+		:return: None
+		"""
+		state = board_state(self.cores[board])
+		with self._lock:
+			self._pending[board] = state
+		self.schedule()
+
+	def schedule(self) -> None:
+		"""
+		Wake up the event loop of the server to send pending changes, unless it is already scheduled to.
+		Safe to call from any thread.
+		:return: None
+		"""
+		with self._lock:
+			if self._scheduled or self.loop is None:
+				return
+			self._scheduled = True
+		self.loop.call_soon_threadsafe(self._flush)
+
+	def _flush(self) -> None:
+		"""
+		Send pending changes to every subscriber.
+		This method should only be called from inside this class, on the event loop of the server.
+		:return: None
+		"""
+		with self._lock:
+			self._scheduled = False
+			pending, self._pending = self._pending, {}
+			boards = len(self.cores)
+		old = self.published
+		new = old + [None] * (boards - len(old))  # boards attached since the last frame
+		updates = []
+		for board, state in pending.items():
+			updates.append(encode_update(board, new[board], state))
+			new[board] = state
+		self.published = new
+		frame = encode_frame(updates)
+		for subscriber in self.subscribers:
+			if subscriber.behind is not None:
+				if not subscriber.paused:
+					behind, subscriber.behind = subscriber.behind, None
+					subscriber.transport.write(encode_frame([
+						encode_update(b, behind[b] if b < len(behind) else None, s) for b, s in enumerate(new)
+					]))
+			elif subscriber.paused:
+				if frame:
+					subscriber.behind = old
+			elif frame:
+				subscriber.transport.write(frame)
+
+	async def start_tcp(self, host: str | None = '127.0.0.1', port: int = 0, backlog: int = 100) -> tuple:
+		"""
+		Accept subscribers over TCP.
+		Must be awaited on the event loop the server is to run on.
+		:param host: the address to listen on
+		:param port: the port to listen on; 0 to pick a free port
+		:param backlog: the number of connections waiting to be accepted
+		:return: the address actually listened on
+		"""
+		self._bind_loop()
+		server = await self.loop.create_server(lambda: Subscriber(self), host, port, backlog=backlog)
+		self._servers.append(server)
+		return server.sockets[0].getsockname()
+
+	async def start_unix(self, path: str, backlog: int = 100) -> str:
+		"""
+		Accept subscribers over a Unix socket.
+		Must be awaited on the event loop the server is to run on.
+		:param path: the path of the socket
+		:param backlog: the number of connections waiting to be accepted
+		:return: the path of the socket
+		"""
+		self._bind_loop()
+		server = await self.loop.create_unix_server(lambda: Subscriber(self), path, backlog=backlog)
+		self._servers.append(server)
+		return path
+
+	def _bind_loop(self) -> None:
+		with self._lock:
+			self.loop = asyncio.get_running_loop()
+			self._scheduled = False
+		self.schedule()
+
+	async def close(self) -> None:
+		"""
+		Stop accepting subscribers and disconnect every subscriber.
+		:return: None
+		"""
+		for server in self._servers:
+			server.close()
+		for subscriber in list(self.subscribers):
+			subscriber.transport.close()
+		for server in self._servers:
+			await server.wait_closed()
+		self._servers.clear()
+
+	def serve_in_thread(self, address: str, backlog: int = 100) -> threading.Thread:
+		"""
+		Run the server on an event loop of its own, in a background thread.
+		:param address: "unix:PATH" for a Unix socket, otherwise "[HOST:]PORT" for TCP
+		:param backlog: the number of connections waiting to be accepted
+		:return: the thread running the server
+		"""
+		ready = threading.Event()
+		errors: list[Exception] = []
+
+		async def serve() -> None:
+			try:
+				if address.startswith('unix:'):
+					await self.start_unix(address[len('unix:'):], backlog)
+				else:
+					host, _, port = address.rpartition(':')
+					await self.start_tcp(host or '127.0.0.1', int(port), backlog)
+			except Exception as e:
+				errors.append(e)
+				return
+			finally:
+				ready.set()
+			await asyncio.Event().wait()
+
+		thread = threading.Thread(target=asyncio.run, args=(serve(),), name='chessclock-broadcast', daemon=True)
+		thread.start()
+		ready.wait()
+		if errors:
+			raise errors[0]
+		return thread
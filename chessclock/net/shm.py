@@ -0,0 +1,189 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Export the state of Core instances to a shared memory segment, for overlays, LED board drivers or loggers
+that poll the live times without going through a socket or a Python API.
+
+Layout of the segment (little-endian) :
+	header, 16 bytes : magic b'CCSM', version (u8), 3 padding bytes, boards (u16), slot size (u16), 4 padding bytes
+	then one slot of SLOT bytes per board, at offset HEADER.size + board * SLOT :
+		sequence (u64), stamp (i64), time_l (i64), time_r (i64), side (u8), running (u8), 6 padding bytes, half_moves (i64)
+
+Each slot is a sequence lock with a single writer : the sequence is odd while the slot is being written.
+A reader reads the sequence, the fields, then the sequence again, and retries if it was odd or changed.
+Times are in nanoseconds, as of `stamp`, read from the time source of the Core
+(time.perf_counter_ns by default, CLOCK_MONOTONIC on Linux) : while running, readers count down the active side.
+"""
+
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterable, NamedTuple
+
+from chessclock.common.side import Side
+from chessclock.core import Core, CompactCore, Op, Observer
+from .protocol import BoardState
+from .server import board_state
+
+MAGIC = b'CCSM'
+VERSION = 1
+HEADER = struct.Struct('<4sB3xHH4x')
+SEQUENCE = struct.Struct('<Q')
+BODY = struct.Struct('<qqqBB6xq')  # stamp, time_l, time_r, side, running, half_moves
+SLOT = 64  # one cache line per board
+
+_exported: set[str] = set()  # names of the segments created by this process
+
+
+class Snapshot(NamedTuple):
+	"""
+	A consistent read of a slot of the segment.
+	"""
+	sequence: int  # incremented twice by every write
+	stamp: int  # time of the state, in nanoseconds, read from the time source of the Core
+	state: BoardState
+
+
+class SharedStateExporter:
+	"""
+	Writes the state of one or many Core instances to a shared memory segment after every operation.
+	Writing a slot takes a few microseconds, on the thread operating the Core.
+	"""
+
+	def __init__(self, cores: Core | Iterable[Core], name: str | None = None):
+		"""
+		SharedStateExporter constructor.
+		:param cores: the Core (or Cores) to export, one slot each, in order
+		:param name: the name of the segment; if None, a unique name is chosen (see the name attribute)
+		"""
+		self.cores: list[Core] = [cores] if isinstance(cores, (Core, CompactCore)) else list(cores)
+		if not all(isinstance(c, (Core, CompactCore)) for c in self.cores):
+			raise TypeError
+		if not self.cores:
+			raise ValueError
+		self.shm = SharedMemory(name, create=True, size=HEADER.size + SLOT * len(self.cores))
+		self.name: str = self.shm.name
+		_exported.add(self.name)
+		self._buf = self.shm.buf
+		HEADER.pack_into(self._buf, 0, MAGIC, VERSION, len(self.cores), SLOT)
+		self._observers = [self._observer(board) for board in range(len(self.cores))]
+		for board, core in enumerate(self.cores):
+			self.write(board)
+			core.observers.append(self._observers[board])
+
+	def _observer(self, board: int) -> Observer:
+		def observer(op: Op, side: Side | None, arg: int, stamp: int) -> None:
+			self.write(board)
+		return observer
+
+	def write(self, board: int) -> None:
+		"""
+		Write the current state of a board to its slot.
+		Must not be called concurrently for a single board.
+		:param board: the index of the board
+		:return: None
+		"""
+		core = self.cores[board]
+		state = board_state(core)
+		offset = HEADER.size + board * SLOT
+		sequence, = SEQUENCE.unpack_from(self._buf, offset)
+		SEQUENCE.pack_into(self._buf, offset, sequence + 1)
+		BODY.pack_into(self._buf, offset + SEQUENCE.size, core.stamp, *state)
+		SEQUENCE.pack_into(self._buf, offset, sequence + 2)
+
+	def close(self) -> None:
+		"""
+		Stop exporting and remove the segment.
+		:return: None
+		"""
+		for core, observer in zip(self.cores, self._observers):
+			core.observers.remove(observer)
+		self._buf = None
+		self.shm.close()
+		self.shm.unlink()
+		_exported.discard(self.name)
+
+
+class SharedStateReader:
+	"""
+	Polls the state exported by a SharedStateExporter, possibly from another process.
+	Reads go straight to the shared segment : no copy of the segment and no lock.
+	"""
+
+	def __init__(self, name: str):
+		"""
+		SharedStateReader constructor.
+		:param name: the name of the segment
+		"""
+		if sys.version_info >= (3, 13):
+			self.shm = SharedMemory(name, track=False)
+		else:
+			self.shm = SharedMemory(name)
+			# attaching registers the segment as if it had been created here, but the exporter owns it
+			if self.shm.name not in _exported:
+				resource_tracker.unregister(self.shm._name, 'shared_memory')
+		self._buf = self.shm.buf
+		magic, version, self.boards, slot = HEADER.unpack_from(self._buf)
+		if magic != MAGIC or version != VERSION or slot != SLOT:
+			self.close()
+			raise ValueError('not a chess clock state segment')
+		self._last: list[int] = [0] * self.boards
+
+	def read(self, board: int = 0, retries: int = 1000) -> Snapshot | None:
+		"""
+		Read the state of a board.
+		:param board: the index of the board
+		:param retries: how many times to retry while the slot is being written
+		:return: the state, or None if no consistent read succeeded
+		"""
+		if not 0 <= board < self.boards:
+			raise IndexError
+		buf = self._buf
+		offset = HEADER.size + board * SLOT
+		for _ in range(retries):
+			before, = SEQUENCE.unpack_from(buf, offset)
+			if before & 1:
+				continue
+			stamp, *state = BODY.unpack_from(buf, offset + SEQUENCE.size)
+			after, = SEQUENCE.unpack_from(buf, offset)
+			if before == after:
+				return Snapshot(before, stamp, BoardState(*state))
+		return None
+
+	def poll(self, board: int = 0) -> Snapshot | None:
+		"""
+		Read the state of a board if it changed since the previous call.
+		Checking for changes only reads the sequence of the slot.
+		:param board: the index of the board
+		:return: the new state, or None if it did not change
+		"""
+		sequence, = SEQUENCE.unpack_from(self._buf, HEADER.size + board * SLOT)
+		if sequence == self._last[board]:
+			return None
+		snapshot = self.read(board)
+		if snapshot is not None:
+			self._last[board] = snapshot.sequence
+		return snapshot
+
+	@staticmethod
+	def times(snapshot: Snapshot, now: int | None = None) -> dict[Side, int]:
+		"""
+		Get time left for each side, counting down the active side since the stamp of the snapshot.
+		:param snapshot: a snapshot returned by read or poll
+		:param now: the current time on the time source of the Core; defaults to time.perf_counter_ns()
+		:return: a dictionary mapping each side to the time it has left until flagging, in nanoseconds
+		"""
+		state = snapshot.state
+		times = {Side.L: state.time_l, Side.R: state.time_r}
+		if state.running and state.active_side is not None:
+			elapsed = (time.perf_counter_ns() if now is None else now) - snapshot.stamp
+			times[state.active_side] = max(0, times[state.active_side] - elapsed)
+		return times
+
+	def close(self) -> None:
+		self._buf = None
+		self.shm.close()
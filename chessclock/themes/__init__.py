@@ -2,13 +2,18 @@
 #
 # SPDX-License-Identifier: GPL-3.0-only
 
-import inspect
 from typing import Callable
 
 from .theme import Theme
+from .formatter import TimeFormatter
+from .palette import Palette, compile_theme
+from .data import DataTheme, DATA_THEME_SUFFIXES
+from .animation import AnimatedTheme, ColorRamp, Keyframe, EASINGS
+from .index import ThemeEntry, find_themes
 
 DEFAULT_THEME_NAME = 'default'
 THEMES: dict[str, Callable[[], Theme]] = {DEFAULT_THEME_NAME: (lambda: Theme())}
+_local_themes_registered: bool = False
 
 
 def add_theme(name: str, new_theme: Callable[[], Theme] = Theme, overwrite: bool = False) -> None:
@@ -35,6 +40,8 @@ def get_theme(name: str | None = None, strict: bool = False) -> Theme:
 	"""
 	if name is None:
 		name = DEFAULT_THEME_NAME
+	if name not in THEMES:
+		register_local_themes(quiet=True)
 	if strict and name not in THEMES:
 		raise KeyError
 	return THEMES.get(name, Theme)()
@@ -45,22 +52,33 @@ def list_themes():
 	Get a list of all known theme names.
 	:return: a list of all known theme names, in alphabetical order
 	"""
+	register_local_themes(quiet=True)
 	return sorted(THEMES.keys())
 
 
-def register_local_themes(quiet: bool = False) -> None:
+def register_local_themes(quiet: bool = False, refresh: bool = False) -> None:
 	"""
-	Register all themes placed in chessclock/x/themes
-	and listed in chessclock/x/themes/__init__.py .
+	Register all themes found by the theme index (see chessclock.themes.index) :
+	the themes listed in chessclock/themes/extensions/__init__.py , the data themes (JSON or TOML files)
+	placed in the same directory, and the themes declared by installed packages as entry points.
+	No theme is imported : each one is registered as a factory importing it when it is used.
+	Only registers them once : list_themes and get_theme call this function when they need to,
+	so that launching the clock with the default theme never looks for the others.
+	Themes already registered under the same name are kept.
+	:param quiet: if False, print the name of every theme found
+	:param refresh: if True, rebuild the index, even if it is cached and up to date
 	:return: None
 	"""
-	from . import extensions as theme_root
+	global _local_themes_registered
+	if _local_themes_registered and not refresh:
+		return
+	_local_themes_registered = True
 	if not quiet:
 		print("\n\nAVAILABLE THEMES :\n------------------")
-	for name, cl in inspect.getmembers(theme_root, inspect.isclass):
-		if issubclass(cl, Theme):
-			if not quiet:
-				print(cl.get_theme_name())
-			add_theme(cl.get_theme_name(), cl)
+	for entry in find_themes(refresh=refresh):
+		if not quiet:
+			print(entry.name)
+		if entry.name not in THEMES:
+			add_theme(entry.name, entry.load)
 	if not quiet:
 		print()
@@ -0,0 +1,192 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Animated colors for themes, as keyframes precomputed into color ramps.
+
+A ramp loops over a period : its keyframes give colors at phases of the period, from 0 (included) to 1 (excluded),
+and colors in between are interpolated along an easing curve, the last keyframe leading back to the first one.
+The whole period is sampled once, when the ramp is built, so that getting the color of a frame is a table lookup.
+
+Ramps are sampled by the time of the frame, shared by every label of the frame (see Theme.set_frame) :
+ramps with the same period are always in phase, whatever the theme or the window using them.
+"""
+
+from copy import copy
+from typing import Callable, NamedTuple, Sequence
+
+from .palette import COLOR_METHODS, Palette, RGBA
+from .theme import Theme
+
+DEFAULT_STEPS = 240  # samples per period
+
+EASINGS: dict[str, Callable[[float], float]] = {
+	'linear': lambda t: t,
+	'ease_in': lambda t: t * t,
+	'ease_out': lambda t: t * (2 - t),
+	'ease_in_out': lambda t: t * t * (3 - 2 * t),
+	'step': lambda t: 0.0,  # hold each keyframe until the next one
+}
+
+
+class Keyframe(NamedTuple):
+	"""
+	The color of a ramp at a given phase of its period.
+	"""
+	phase: float  # from 0 (included) to 1 (excluded)
+	color: tuple[int, int, int]
+
+
+class ColorRamp:
+	"""
+	A looping color animation, sampled into a table of colors usable by pyglet.
+	"""
+
+	def __init__(self, keyframes: Sequence[Keyframe], period_ns: int, easing: str = 'linear', steps: int = DEFAULT_STEPS):
+		"""
+		ColorRamp constructor.
+		:param keyframes: the keyframes, sorted by phase
+		:param period_ns: the duration of one loop, in nanoseconds
+		:param easing: the name of the easing curve applied between consecutive keyframes (see EASINGS)
+		:param steps: the number of colors sampled over the period
+		"""
+		keyframes = [Keyframe(*k) for k in keyframes]
+		if not isinstance(period_ns, int) or not isinstance(steps, int):
+			raise TypeError
+		if easing not in EASINGS:
+			raise KeyError
+		if not keyframes or period_ns <= 0 or steps <= 0:
+			raise ValueError
+		phases = [k.phase for k in keyframes]
+		if phases != sorted(phases) or phases[0] < 0 or phases[-1] >= 1:
+			raise ValueError
+		if not all(len(k.color) == 3 and all(isinstance(c, int) and 0 <= c <= 255 for c in k.color) for k in keyframes):
+			raise ValueError
+		self.keyframes: tuple[Keyframe, ...] = tuple(keyframes)
+		self.period_ns: int = period_ns
+		self.steps: int = steps
+		self.easing: str = easing
+		ease = EASINGS[easing]
+		loop = keyframes + [Keyframe(keyframes[0].phase + 1, keyframes[0].color)]
+		colors = []
+		for i in range(steps):
+			phase = i / steps
+			if phase < loop[0].phase:
+				phase += 1  # before the first keyframe : the end of the previous loop
+			k = 0
+			while loop[k + 1].phase <= phase:
+				k += 1
+			a, b = loop[k], loop[k + 1]
+			t = ease((phase - a.phase) / (b.phase - a.phase)) if b.phase > a.phase else 0.0
+			colors.append((*(round(x + (y - x) * t) for x, y in zip(a.color, b.color)), 255))
+		self.colors: tuple[RGBA, ...] = tuple(colors)
+
+	@property
+	def step_ns(self) -> int:
+		"""
+		:return: the time during which each sampled color is shown, in nanoseconds (rounded down)
+		"""
+		return self.period_ns // self.steps
+
+	def map(self, channel: Callable[[int], int]) -> 'ColorRamp':
+		"""
+		Derive a ramp in step with this one, by transforming every channel of every sampled color.
+		:param channel: a function mapping a red, green or blue value to another one, from 0 to 255
+		:return: the derived ramp
+		"""
+		ramp = copy(self)
+		ramp.keyframes = tuple(Keyframe(k.phase, tuple(map(channel, k.color))) for k in self.keyframes)
+		ramp.colors = tuple((*map(channel, c[:3]), 255) for c in self.colors)
+		return ramp
+
+	def sample(self, frame_ns: int) -> RGBA:
+		"""
+		Get the color of a frame.
+		:param frame_ns: the time of the frame, in nanoseconds
+		:return: the color, as a tuple (r, g, b, a) usable by pyglet
+		"""
+		return self.colors[frame_ns % self.period_ns * self.steps // self.period_ns]
+
+
+class AnimatedTheme(Theme):
+	"""
+	A theme whose colors loop over color ramps, to be subclassed.
+	Set the background, foreground and meta attributes to ramps in the constructor; sections without a ramp keep
+	the colors of the color methods, so that an animated theme can still override them.
+	Colors are those of the time of the current frame, set by the user interface through set_frame.
+	Colors of sections without a ramp are precomputed into a palette, under the same conditions as other themes
+	(see Palette.compilable) : then, every color of a frame is a table lookup.
+	"""
+
+	animated = True
+	background: ColorRamp | None = None
+	foreground: ColorRamp | None = None
+	meta: ColorRamp | None = None
+	frame_ns: int = 0
+	_static: Palette | None | bool = False  # False until compiled
+
+	@property
+	def step_ns(self) -> int:
+		"""
+		:return: the shortest time during which the colors of this theme hold still, in nanoseconds
+		"""
+		return min((r.step_ns for r in (self.background, self.foreground, self.meta) if r is not None), default=0)
+
+	def set_frame(self, frame_ns: int) -> None:
+		self.frame_ns = frame_ns
+
+	def _static_colors(self, is_current: bool, is_running: bool, time_left_ns: int) -> tuple[RGBA, RGBA, RGBA] | None:
+		"""
+		Look up the colors of sections without a ramp, compiling them on first use.
+		This method should only be called from inside this class.
+		:param is_current: True if coloring the active side of the clock
+		:param is_running: True if the clock is running, False otherwise
+		:param time_left_ns: the time left on the counter, in nanoseconds
+		:return: the colors of every section, only valid for those without a ramp, or None if they cannot be compiled
+		"""
+		static = self._static
+		if static is False:
+			self._static = None  # while compiling, color methods must not look the palette up
+			cls = type(self)
+			overrides = any(getattr(cls, m) is not getattr(AnimatedTheme, m) for m in COLOR_METHODS)
+			declares = any('time_buckets' in vars(c) for c in cls.__mro__ if c not in (Theme, AnimatedTheme))
+			if self.time_buckets is not None and (not overrides or declares):
+				self._static = Palette.from_theme(self)
+			static = self._static
+		return None if static is None else static.colors(is_current, is_running, time_left_ns)
+
+	def get_back_color(self, is_current: bool, is_running: bool, time_left_ns: int) -> RGBA:
+		if self.background is not None:
+			return self.background.sample(self.frame_ns)
+		static = self._static_colors(is_current, is_running, time_left_ns)
+		return super().get_back_color(is_current, is_running, time_left_ns) if static is None else static[0]
+
+	def get_text_color(self, is_current: bool, is_running: bool, time_left_ns: int) -> RGBA:
+		if self.foreground is not None:
+			return self.foreground.sample(self.frame_ns)
+		static = self._static_colors(is_current, is_running, time_left_ns)
+		return super().get_text_color(is_current, is_running, time_left_ns) if static is None else static[1]
+
+	def get_meta_color(self, is_current: bool, is_running: bool, time_left_ns: int) -> RGBA:
+		if self.meta is not None:
+			return self.meta.sample(self.frame_ns)
+		if self.foreground is not None and type(self).rgb_meta is AnimatedTheme.rgb_meta:
+			return self.foreground.sample(self.frame_ns)  # meta colors default to text colors
+		static = self._static_colors(is_current, is_running, time_left_ns)
+		return super().get_meta_color(is_current, is_running, time_left_ns) if static is None else static[2]
+
+	def rgb_background(self, is_current: bool, is_running: bool, time_left_ns: int) -> tuple[int, int, int]:
+		if self.background is None:
+			return super().rgb_background(is_current, is_running, time_left_ns)
+		return self.background.sample(self.frame_ns)[:3]
+
+	def rgb_foreground(self, is_current: bool, is_running: bool, time_left_ns: int) -> tuple[int, int, int]:
+		if self.foreground is None:
+			return super().rgb_foreground(is_current, is_running, time_left_ns)
+		return self.foreground.sample(self.frame_ns)[:3]
+
+	def rgb_meta(self, is_current: bool, is_running: bool, time_left_ns: int) -> tuple[int, int, int]:
+		if self.meta is None:
+			return super().rgb_meta(is_current, is_running, time_left_ns)
+		return self.meta.sample(self.frame_ns)[:3]
@@ -0,0 +1,139 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Themes declared as data, in JSON or TOML files.
+
+Example (TOML) :
+
+	name = "alarm"
+	font = "monospace"
+	thresholds = [10, 60]  # in seconds : 3 time buckets, below 10 s, below 60 s, and from 60 s upwards
+
+	[background]
+	default = "#202020"
+	current_running = ["#800000", "#806000", "#004000"]  # one color per time bucket
+
+	[foreground]
+	default = [255, 255, 255]
+
+Each color section (background, foreground, meta) may define the keys
+current_running, current_paused, other_running, other_paused and default.
+A value is either a single color or a list of one color per time bucket,
+and a color is either a "#rrggbb" string or a list of three integers.
+Missing keys fall back to default, and missing defaults fall back to the colors of the basic theme
+(meta falls back to foreground).
+"""
+
+from pathlib import Path
+
+from chessclock.common import SECOND
+from .palette import Palette, RGBA
+from .theme import Theme
+
+DATA_THEME_SUFFIXES = ('.json', '.toml')
+SECTIONS = ('background', 'foreground', 'meta')
+
+
+def parse_color(value) -> tuple[int, int, int]:
+	"""
+	Parse a color declared in a data theme.
+	:param value: a "#rrggbb" string or a sequence of three integers
+	:return: the color as a tuple (r, g, b)
+	"""
+	if isinstance(value, str):
+		value = value.removeprefix('#')
+		if len(value) != 6:
+			raise ValueError
+		rgb = tuple(int(value[i:i + 2], 16) for i in range(0, 6, 2))
+	else:
+		rgb = tuple(value)
+	if len(rgb) != 3 or not all(isinstance(c, int) and 0 <= c <= 255 for c in rgb):
+		raise ValueError
+	return rgb
+
+
+class DataTheme(Theme):
+	"""
+	A theme built from a mapping, usually loaded from a JSON or TOML file.
+	Its colors are compiled into a Palette when the theme is built.
+	"""
+
+	def __init__(self, data: dict):
+		"""
+		DataTheme constructor.
+		:param data: the declaration of the theme, as described in the documentation of this module
+		"""
+		if not isinstance(data, dict):
+			raise TypeError
+		self.name: str = data.get('name', DataTheme.get_theme_name())
+		self.font: str = data.get('font', Theme.get_font(self))
+		self.time_buckets = tuple(sorted(int(SECOND * s) for s in data.get('thresholds', ())))
+		basic = Theme()
+		buckets = len(self.time_buckets) + 1
+		samples = (0,) + self.time_buckets
+		columns = {}
+		for section, method in zip(SECTIONS, (basic.rgb_background, basic.rgb_foreground, None)):
+			declared = data.get(section, {})
+			if not isinstance(declared, dict):
+				raise TypeError
+			column = []
+			for is_current in (False, True):
+				for is_running in (False, True):
+					key = f'{"current" if is_current else "other"}_{"running" if is_running else "paused"}'
+					value = declared.get(key, declared.get('default'))
+					if value is None:
+						if method is None:  # meta defaults to foreground
+							column.extend(columns['foreground'][len(column):len(column) + buckets])
+							continue
+						value = [method(is_current, is_running, t) for t in samples]
+					if isinstance(value, list) and value and not isinstance(value[0], int):
+						if len(value) != buckets:
+							raise ValueError
+						column.extend((*parse_color(v), 255) for v in value)
+					else:
+						column.extend([(*parse_color(value), 255)] * buckets)
+			columns[section] = column
+		self.palette = Palette(self.time_buckets, list(zip(*(columns[s] for s in SECTIONS))))
+
+	@staticmethod
+	def load(path: str | Path) -> 'DataTheme':
+		"""
+		Load a theme from a JSON or TOML file.
+		:param path: the path of the file
+		:return: the theme declared in the file
+		"""
+		path = Path(path)
+		match path.suffix:
+			# parsers are imported here, as data themes are only loaded when another theme than the default is used
+			case '.json':
+				import json
+				with open(path, 'r') as f:
+					data = json.load(f)
+			case '.toml':
+				try:
+					import tomllib
+				except ImportError:  # Python < 3.11
+					raise ImportError('TOML themes require Python 3.11 or later')
+				with open(path, 'rb') as f:
+					data = tomllib.load(f)
+			case _:
+				raise ValueError
+		data.setdefault('name', path.stem)
+		return DataTheme(data)
+
+	def _rgb(self, section: int, is_current: bool, is_running: bool, time_left_ns: int) -> tuple[int, int, int]:
+		return self.palette.colors(is_current, is_running, time_left_ns)[section][:3]
+
+	def rgb_background(self, is_current: bool, is_running: bool, time_left_ns: int) -> tuple[int, int, int]:
+		return self._rgb(0, is_current, is_running, time_left_ns)
+
+	def rgb_foreground(self, is_current: bool, is_running: bool, time_left_ns: int) -> tuple[int, int, int]:
+		return self._rgb(1, is_current, is_running, time_left_ns)
+
+	def rgb_meta(self, is_current: bool, is_running: bool, time_left_ns: int) -> tuple[int, int, int]:
+		return self._rgb(2, is_current, is_running, time_left_ns)
+
+	def get_font(self) -> str:
+		return self.font
@@ -3,7 +3,21 @@
 # SPDX-License-Identifier: GPL-3.0-only
 
 """
-Import all themes that should be automatically registered here.
+Declare all themes that should be automatically registered here, as "module:attribute" targets.
+Theme modules are only imported when their theme is used.
 """
 
-from .neon import Neon
+from importlib import import_module
+
+BUILTIN_THEMES: dict[str, str] = {
+	'neon': 'chessclock.themes.extensions.neon:Neon',
+}
+
+
+def __getattr__(name: str):
+	# compatibility with code importing theme classes from this package
+	for target in BUILTIN_THEMES.values():
+		module, _, attribute = target.partition(':')
+		if attribute == name:
+			return getattr(import_module(module), name)
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
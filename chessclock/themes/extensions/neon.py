@@ -2,42 +2,21 @@
 #
 # SPDX-License-Identifier: GPL-3.0-only
 
-import time
+from chessclock.common import SECOND
+from chessclock.themes import AnimatedTheme, ColorRamp, Keyframe
 
-from chessclock.themes import Theme
 
-
-class Neon(Theme):
+class Neon(AnimatedTheme):
 	"""
-	Quick and dirty example theme for testing theme selection from command line and loading.
+	Example of an animated theme : text glowing back and forth between two colors.
 	"""
 
-	def __init__(self):
-		self.begin = 0xB2, 0x0F, 0x3D
-		self.end = 0x33, 0xCC, 0x33
-		self.period_ns = 5 * 10 ** 9
-		self.stamp = time.time_ns()
-		self.rise = True
-		self.color: tuple[int, int, int] = self.begin
-
-	@property
-	def half_period_ns(self):
-		return self.period_ns >> 1
-
-	def rgb_background(self, is_current: bool, is_running: bool, time_left_ns: int):
-		return super().rgb_background(is_current, is_running, time_left_ns)
-
-	def rgb_foreground(self, is_current: bool, is_running: bool, time_left_ns: int):
-		ts = time.time_ns()
-		t_diff = ts - self.stamp
-		if t_diff > self.half_period_ns:
-			t_diff = self.half_period_ns
-			self.stamp = ts
-			self.rise = False
-		if self.rise:
-			return tuple(b + ((e - b) * t_diff) // self.half_period_ns for b, e in zip(self.begin, self.end))
-		else:
-			return tuple(b + ((b - e) * t_diff) // self.half_period_ns for b, e in zip(self.begin, self.end))
-
-	def rgb_meta(self, is_current: bool, is_running: bool, time_left_ns: int):
-		return tuple(x ^ 0xff for x in self.rgb_foreground(is_current, is_running, time_left_ns))
+	def __init__(self, period_ns: int = 5 * SECOND):
+		"""
+		Neon constructor.
+		:param period_ns: the time the text takes to go from the first color to the second one and back
+		"""
+		begin = 0xB2, 0x0F, 0x3D
+		end = 0x33, 0xCC, 0x33
+		self.foreground = ColorRamp([Keyframe(0, begin), Keyframe(0.5, end)], period_ns)
+		self.meta = self.foreground.map(lambda c: c ^ 0xff)  # the inverse of text colors
@@ -0,0 +1,118 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from typing import Iterable
+
+from chessclock.common import CENT
+from .theme import Theme
+
+
+class TimeFormatter:
+	"""
+	Memoizes the strings rendered by a theme's format methods.
+	Times are cached by display quantum : every time inside the same hundredth (or second) of the display
+	shares one cached string, so each string is only built once per visible change.
+
+	Format methods overridden by a theme are only cached when the theme also tells how precise they are
+	(see Theme.display_quantum); otherwise, the theme's own method is called every time.
+	"""
+
+	def __init__(self, theme: Theme, maxsize: int = 4096):
+		"""
+		TimeFormatter constructor.
+		:param theme: the theme whose format methods are to be cached
+		:param maxsize: maximum number of strings kept per cache; the oldest strings are evicted first
+		"""
+		if not isinstance(theme, Theme) or not isinstance(maxsize, int):
+			raise TypeError
+		if maxsize <= 0:
+			raise ValueError
+		cls = type(theme)
+		self.theme = theme
+		self.maxsize = maxsize
+		self.caches_time: bool = cls.format_time is Theme.format_time or cls.display_quantum is not Theme.display_quantum
+		self.caches_incr: bool = cls.format_incr is Theme.format_incr
+		self.composes_time_control: bool = cls.format_time_control is Theme.format_time_control
+		self._time: dict[int, dict[int, str]] = {}
+		self._incr: dict[int, str] = {}
+
+	def _store(self, cache: dict[int, str], key: int, text: str) -> None:
+		"""
+		Add a string to a cache, evicting the oldest entry when the cache is full.
+		:param cache: the cache to add to
+		:param key: the key of the string
+		:param text: the string
+		:return: None
+		"""
+		if len(cache) >= self.maxsize:
+			del cache[next(iter(cache))]
+		cache[key] = text
+
+	def time(self, ns: int) -> str:
+		"""
+		Cached equivalent of Theme.format_time.
+		:param ns: time left in nanoseconds
+		:return: a string representation of the given time
+		"""
+		if not self.caches_time:
+			return self.theme.format_time(ns)
+		q = self.theme.display_quantum(ns)
+		cache = self._time.get(q)
+		if cache is None:
+			cache = self._time[q] = {}
+		key = ns // q
+		text = cache.get(key)
+		if text is None:
+			text = self.theme.format_time(ns)
+			self._store(cache, key, text)
+		return text
+
+	def incr(self, ns: int) -> str:
+		"""
+		Cached equivalent of Theme.format_incr.
+		:param ns: increment in nanoseconds
+		:return: a string representation of the given increment
+		"""
+		if not self.caches_incr:
+			return self.theme.format_incr(ns)
+		key = ns // CENT
+		text = self._incr.get(key)
+		if text is None:
+			text = self.theme.format_incr(ns)
+			self._store(self._incr, key, text)
+		return text
+
+	def time_control(self, t: int = -1, i: int = -1) -> str:
+		"""
+		Cached equivalent of Theme.format_time_control.
+		:param t: starting time, in nanoseconds
+		:param i: increment per turn, in nanoseconds
+		:return: a string representation of the given time control scheme
+		"""
+		if not self.composes_time_control:
+			return self.theme.format_time_control(t, i)
+		return ' + '.join((self.time(t), self.incr(i)))
+
+	def times(self, values: Iterable[int]) -> list[str]:
+		"""
+		Format many times in one call, for instance every value returned by ClockPool.times().
+		:param values: times left in nanoseconds
+		:return: the string representation of each time, in the same order
+		"""
+		if not self.caches_time:
+			return list(map(self.theme.format_time, values))
+		quantum, render, store, caches = self.theme.display_quantum, self.theme.format_time, self._store, self._time
+		texts = []
+		for ns in values:
+			q = quantum(ns)
+			cache = caches.get(q)
+			if cache is None:
+				cache = caches[q] = {}
+			key = ns // q
+			text = cache.get(key)
+			if text is None:
+				text = render(ns)
+				store(cache, key, text)
+			texts.append(text)
+		return texts
@@ -0,0 +1,142 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Index of the themes that can be loaded, so that finding them imports none of them.
+
+Themes come from two places :
+	- the built-in themes, declared in chessclock/themes/extensions/__init__.py (BUILTIN_THEMES),
+	  and the data themes (JSON or TOML files) placed in the same directory ;
+	- the entry points of the group "chessclock.themes" of installed packages, named after their theme.
+	  A package declares its themes in its pyproject.toml :
+
+		[project.entry-points."chessclock.themes"]
+		venue = "venue_themes.venue:VenueTheme"
+
+Each theme is referred to by a target : "module:attribute" for Python themes, the path of the file for data themes.
+The attribute is a Theme subclass, a callable returning a Theme, or a Theme instance.
+
+The index is cached in a JSON file of the user cache directory, along with a key : the modification times of every
+directory of sys.path and of every file of the extensions directory. Installing, upgrading or removing a package
+adds or removes its metadata directory, named after its version, which changes the modification time of the directory
+it is installed in. As long as the key holds, package metadata is not read at all.
+"""
+
+import os
+import sys
+from importlib import import_module
+from pathlib import Path
+from typing import NamedTuple
+
+from .data import DataTheme, DATA_THEME_SUFFIXES
+from .theme import Theme
+
+ENTRY_POINT_GROUP = 'chessclock.themes'
+BUILTIN_SOURCE = 'chessclock'
+EXTENSIONS = Path(__file__).parent / 'extensions'
+INDEX_FILE = 'themes.json'
+INDEX_VERSION = 1  # to be increased whenever the format of the index changes
+
+
+class ThemeEntry(NamedTuple):
+	"""
+	A theme that can be loaded, without loading it.
+	"""
+	name: str
+	target: str  # "module:attribute", or the path of a data theme
+	source: str = BUILTIN_SOURCE  # the package declaring the theme, with its version
+	data: bool = False  # True if target is the path of a data theme
+
+	def load(self) -> Theme:
+		"""
+		Import the theme and build an instance of it.
+		:return: an instance of the theme
+		"""
+		if self.data:
+			return DataTheme.load(self.target)
+		module, _, attribute = self.target.partition(':')
+		obj = import_module(module)
+		for part in attribute.split('.') if attribute else ():
+			obj = getattr(obj, part)
+		theme = obj if isinstance(obj, Theme) else obj()
+		if not isinstance(theme, Theme):
+			raise TypeError
+		return theme
+
+
+def cache_path() -> Path:
+	"""
+	Get where the index is cached : in $XDG_CACHE_HOME, defaulting to ~/.cache .
+	:return: the path of the index file
+	"""
+	root = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+	return Path(root) / 'chessclock' / INDEX_FILE
+
+
+def index_key(extensions: Path = EXTENSIONS) -> list[list]:
+	"""
+	Compute the key under which the index is cached, from file modification times only.
+	:param extensions: the directory of the built-in themes
+	:return: a list of [path, modification time in nanoseconds] pairs
+	"""
+	key = []
+	for entry in sys.path:
+		try:
+			key.append([entry, os.stat(entry or '.').st_mtime_ns])
+		except OSError:
+			continue
+	for path in sorted(extensions.iterdir()):
+		if path.is_file():
+			key.append([str(path), path.stat().st_mtime_ns])
+	return key
+
+
+def build_index(extensions: Path = EXTENSIONS) -> list[ThemeEntry]:
+	"""
+	Look for every theme, reading package metadata and data themes.
+	Python themes are not imported, data themes are parsed to read their name.
+	:param extensions: the directory of the built-in themes
+	:return: the themes, built-in themes first
+	"""
+	from importlib.metadata import entry_points
+	from .extensions import BUILTIN_THEMES
+	entries = [ThemeEntry(name, target) for name, target in BUILTIN_THEMES.items()]
+	for path in sorted(extensions.iterdir()):
+		if path.suffix in DATA_THEME_SUFFIXES:
+			entries.append(ThemeEntry(DataTheme.load(path).name, str(path), data=True))
+	for ep in entry_points(group=ENTRY_POINT_GROUP):
+		source = f'{ep.dist.name} {ep.dist.version}' if ep.dist is not None else ENTRY_POINT_GROUP
+		entries.append(ThemeEntry(ep.name, ep.value, source))
+	return entries
+
+
+def find_themes(path: str | Path | None = None, refresh: bool = False) -> list[ThemeEntry]:
+	"""
+	Get every theme, from the cached index if it is still valid, rebuilding and caching it otherwise.
+	Failing to write the cache is not an error : the index is then rebuilt on every launch.
+	:param path: the path of the index file; defaults to cache_path()
+	:param refresh: if True, rebuild the index even if the cached one is still valid
+	:return: the themes, built-in themes first
+	"""
+	import json
+	path = cache_path() if path is None else Path(path)
+	key = index_key()
+	if not refresh:
+		try:
+			with open(path, 'r') as f:
+				cached = json.load(f)
+			if cached['version'] == INDEX_VERSION and cached['key'] == key:
+				return [ThemeEntry(*entry) for entry in cached['themes']]
+		except (OSError, ValueError, TypeError, KeyError):
+			pass  # missing, unreadable or outdated : rebuilt below
+	entries = build_index()
+	try:
+		path.parent.mkdir(parents=True, exist_ok=True)
+		temporary = path.with_name(f'{path.name}.{os.getpid()}')
+		with open(temporary, 'w') as f:
+			json.dump({'version': INDEX_VERSION, 'key': key, 'themes': entries}, f)
+		os.replace(temporary, path)  # atomic : concurrent launches never read half an index
+	except OSError:
+		pass
+	return entries
@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from bisect import bisect_right
+from typing import Sequence
+
+from .theme import Theme
+
+RGBA = tuple[int, int, int, int]
+COLOR_METHODS = ('rgb_background', 'rgb_foreground', 'rgb_meta')
+
+
+class Palette:
+	"""
+	Every color of a theme, precomputed into a lookup table.
+	Entries are keyed by (is_current, is_running, time bucket),
+	where time buckets are delimited by a sorted sequence of thresholds, in nanoseconds :
+	bucket 0 holds times below the first threshold, and the last bucket holds times from the last threshold upwards.
+	"""
+
+	def __init__(self, thresholds: Sequence[int], table: Sequence[tuple[RGBA, RGBA, RGBA]]):
+		"""
+		Palette constructor.
+		:param thresholds: sorted times, in nanoseconds, at which colors change
+		:param table: (background, foreground, meta) colors for each key, indexed by Palette.index
+		"""
+		thresholds = tuple(thresholds)
+		if list(thresholds) != sorted(thresholds):
+			raise ValueError
+		if len(table) != 4 * (len(thresholds) + 1):
+			raise ValueError
+		self.thresholds: tuple[int, ...] = thresholds
+		self.buckets: int = len(thresholds) + 1
+		self.table: tuple[tuple[RGBA, RGBA, RGBA], ...] = tuple(table)
+
+	def index(self, is_current: bool, is_running: bool, bucket: int) -> int:
+		"""
+		Get the position of a key in the table.
+		:param is_current: True if coloring the active side of the clock
+		:param is_running: True if the clock is running, False otherwise
+		:param bucket: the time bucket
+		:return: the index of the colors for this key in the table
+		"""
+		return (2 * bool(is_current) + bool(is_running)) * self.buckets + bucket
+
+	def bucket(self, time_left_ns: int) -> int:
+		"""
+		Get the time bucket in which a time falls.
+		:param time_left_ns: the time left on the counter, in nanoseconds
+		:return: the index of the time bucket
+		"""
+		return bisect_right(self.thresholds, time_left_ns)
+
+	def colors(self, is_current: bool, is_running: bool, time_left_ns: int) -> tuple[RGBA, RGBA, RGBA]:
+		"""
+		Look up the colors of one side of the clock.
+		:param is_current: True if coloring the active side of the clock
+		:param is_running: True if the clock is running, False otherwise
+		:param time_left_ns: the time left on the counter, in nanoseconds
+		:return: a tuple((rgba_background), (rgba_foreground), (rgba_meta)), with all elements usable by pyglet
+		"""
+		return self.table[(2 * bool(is_current) + bool(is_running)) * self.buckets + bisect_right(self.thresholds, time_left_ns)]
+
+	@staticmethod
+	def compilable(theme: Theme) -> bool:
+		"""
+		Whether the colors of a theme only depend on the keys of a palette.
+		That is the case for themes that do not override any color method,
+		and for themes that do but declare the times at which their colors change (Theme.time_buckets).
+		Animated themes are never compilable.
+		:param theme: the theme
+		:return: True if the theme can be compiled into a palette, False otherwise
+		"""
+		cls = type(theme)
+		if theme.animated or theme.time_buckets is None:
+			return False
+		overrides = any(getattr(cls, m) is not getattr(Theme, m) for m in COLOR_METHODS)
+		declares = any('time_buckets' in vars(c) for c in cls.__mro__ if c is not Theme)
+		return not overrides or declares
+
+	@staticmethod
+	def from_theme(theme: Theme) -> 'Palette':
+		"""
+		Compile a theme by evaluating its color methods once for every key.
+		:param theme: a compilable theme
+		:return: the palette of the theme
+		"""
+		thresholds = tuple(sorted(theme.time_buckets))
+		samples = (0,) + thresholds
+		table = [
+			(
+				theme.get_back_color(is_current, is_running, t),
+				theme.get_text_color(is_current, is_running, t),
+				theme.get_meta_color(is_current, is_running, t),
+			)
+			for is_current in (False, True)
+			for is_running in (False, True)
+			for t in samples
+		]
+		return Palette(thresholds, table)
+
+
+def compile_theme(theme: Theme) -> Palette | None:
+	"""
+	Get the palette of a theme, if it has one.
+	:param theme: the theme
+	:return: the palette of the theme, or None if its colors must be computed on every frame
+	"""
+	palette = getattr(theme, 'palette', None)
+	if isinstance(palette, Palette):
+		return palette
+	if Palette.compilable(theme):
+		return Palette.from_theme(theme)
+	return None
@@ -2,7 +2,7 @@
 #
 # SPDX-License-Identifier: GPL-3.0-only
 
-from chessclock.common import time_parts
+from chessclock.common import time_parts, CENT, MINUTE, SECOND
 
 
 class Theme:
@@ -12,6 +12,19 @@ class Theme:
 	They must return iterables of three integers.
 	"""
 
+	animated: bool = False
+	"""
+	Set to True in themes whose colors change over time on their own,
+	so that the display keeps being redrawn while no digit changes.
+	"""
+
+	time_buckets: tuple[int, ...] | None = ()
+	"""
+	Times left, in nanoseconds, at which the colors of this theme change.
+	Themes overriding color methods should declare them, so that their colors can be precomputed.
+	None means the colors may depend on the time left in any way.
+	"""
+
 	@classmethod
 	def get_theme_name(cls):
 		"""
@@ -20,6 +33,16 @@ class Theme:
 		"""
 		return cls.__name__.lower()
 
+	def set_frame(self, frame_ns: int) -> None:
+		"""
+		Called by the user interface before it colors a frame of an animated theme.
+		Every color of the frame should be that of this time, rather than of the time of each call to a color method,
+		so that all labels are colored alike and animations do not read the clock (see chessclock.themes.animation).
+		:param frame_ns: the time of the frame, in nanoseconds
+		:return: None
+		"""
+		pass
+
 	def get_back_color(self, is_current: bool, is_running: bool, time_left_ns: int) -> tuple[int, int, int, int]:
 		"""
 		Get opaque background color formatted for use in pyglet.
@@ -29,7 +52,7 @@ class Theme:
 		:param time_left_ns: the time left on the counter, in nanoseconds
 		:return: a tuple(r, g, b, a) representation of the color to use for the background of this side of the clock
 		"""
-		return tuple(list(self.rgb_background(is_current, is_running, time_left_ns)) + [255])
+		return *self.rgb_background(is_current, is_running, time_left_ns), 255
 
 	def get_text_color(self, is_current: bool, is_running: bool, time_left_ns: int) -> tuple[int, int, int, int]:
 		"""
@@ -40,7 +63,7 @@ class Theme:
 		:param time_left_ns: the time left on the counter, in nanoseconds
 		:return: a tuple(r, g, b, a) representation of the color to use for the text of this side of the clock
 		"""
-		return tuple(list(self.rgb_foreground(is_current, is_running, time_left_ns)) + [255])
+		return *self.rgb_foreground(is_current, is_running, time_left_ns), 255
 
 	def get_meta_color(self, is_current: bool, is_running: bool, time_left_ns: int) -> tuple[int, int, int, int]:
 		"""
@@ -51,7 +74,7 @@ class Theme:
 		:param time_left_ns: the time left on the counter, in nanoseconds
 		:return: a tuple(r, g, b, a) representation of the color to use for additional information on this side of the clock
 		"""
-		return tuple(list(self.rgb_meta(is_current, is_running, time_left_ns)) + [255])
+		return *self.rgb_meta(is_current, is_running, time_left_ns), 255
 
 	def get_colors(self, is_current: bool, is_running: bool, time_left_ns) -> tuple[tuple[int, int, int, int], tuple[int, int, int, int], tuple[int, int, int, int]]:
 		"""
@@ -124,6 +147,18 @@ class Theme:
 			f'.{c:02d}' if h == 0 and m == 0 else '',
 		])
 
+	def display_quantum(self, ns: int) -> int:
+		"""
+		Get the smallest change in time that format_time can show, for a given time.
+		Themes overriding format_time should also override this method,
+		otherwise the finest precision is assumed.
+		:param ns: time left in nanoseconds
+		:return: the precision of the displayed time, in nanoseconds
+		"""
+		if type(self).format_time is not Theme.format_time:
+			return CENT
+		return CENT if ns < MINUTE else SECOND
+
 	def format_incr(self, ns: int) -> str:
 		"""
 		Get a human readable, displayable string representation for a given time increment per turn.
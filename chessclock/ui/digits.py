@@ -0,0 +1,251 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+Times drawn from glyphs rasterized ahead of time, instead of pyglet labels.
+
+Assigning the text of a pyglet label lays the whole text out again and rebuilds its vertex lists.
+A DigitLabel instead shows each character in a sprite of its own, all of them cut from one texture atlas holding the
+glyphs of the characters a clock may show (GLYPHS) : changing a character swaps the texture coordinates of its sprite
+and moves it by the bearing of the new glyph, a few vertex attribute writes.
+"""
+
+from typing import Literal
+
+import pyglet
+
+GLYPHS = '0123456789:.+- '  # characters shown by the clock, whatever the time left
+BORDER = 1  # blank pixels around each glyph in the atlas, so that neighbours never bleed into each other
+
+
+def glyph_image(glyph: pyglet.font.base.Glyph) -> pyglet.image.ImageData:
+	"""
+	Copy the image of a glyph, to be drawn by a sprite exactly as a pyglet label draws the glyph.
+	Labels color glyphs by their alpha channel only, whereas sprites multiply their color by every channel of their
+	texture : the copy is white, with the alpha channel of the glyph.
+	:param glyph: the glyph
+	:return: the image of the glyph, bottom row first
+	"""
+	img = glyph.get_image_data()
+	data = bytearray(img.get_data('RGBA', -4 * img.width))  # glyph regions come top row first
+	data[0::4] = data[1::4] = data[2::4] = b'\xff' * (img.width * img.height)
+	return pyglet.image.ImageData(img.width, img.height, 'RGBA', bytes(data))
+
+
+class DigitAtlas:
+	"""
+	The glyphs of GLYPHS for one font and size, rasterized into a single texture.
+	"""
+
+	def __init__(self, font_name: str | None, font_size: float):
+		"""
+		DigitAtlas constructor.
+		:param font_name: the name of the font
+		:param font_size: the size of the font, in points
+		"""
+		font = pyglet.font.load(font_name, font_size)
+		glyphs, _ = font.get_glyphs(GLYPHS)
+		images = [glyph_image(g) for g in glyphs]
+		width = sum(i.width + 2 * BORDER for i in images)
+		height = max(i.height for i in images) + 2 * BORDER
+		self.atlas = pyglet.image.atlas.TextureAtlas(width, height)
+		self.font_name = font_name
+		self.font_size = font_size
+		self.ascent: int = font.ascent
+		self.descent: int = font.descent
+		self.regions: dict[str, pyglet.image.TextureRegion] = {}
+		self.bearings: dict[str, tuple[int, int]] = {}  # offset of each glyph from its origin on the baseline
+		self.advances: dict[str, int] = {}
+		for char, glyph, img in zip(GLYPHS, glyphs, images):
+			self.regions[char] = self.atlas.add(img, border=BORDER)
+			self.bearings[char] = glyph.vertices[0], glyph.vertices[1]
+			self.advances[char] = glyph.advance
+
+
+def get_atlas(font_name: str | None, font_size: float) -> DigitAtlas:
+	"""
+	Get the atlas of a font at a given size, rasterizing it on first use.
+	Atlases are textures : as pyglet does for fonts, they are cached in the object space of the current OpenGL context,
+	so that a window never draws from the texture of another, possibly closed, window.
+	:param font_name: the name of the font
+	:param font_size: the size of the font, in points
+	:return: the atlas, shared by every label using this font at this size
+	"""
+	object_space = pyglet.gl.current_context.object_space
+	if not hasattr(object_space, 'chessclock_digit_atlases'):
+		object_space.chessclock_digit_atlases = {}
+	atlases: dict[tuple[str | None, float], DigitAtlas] = object_space.chessclock_digit_atlases
+	key = font_name, font_size
+	atlas = atlases.get(key)
+	if atlas is None:
+		atlas = atlases[key] = DigitAtlas(font_name, font_size)
+	return atlas
+
+
+class DigitLabel:
+	"""
+	A single line of text made of GLYPHS only, with the attributes of pyglet.text.Label the clock uses.
+	Sprites are only laid out again when the length of the text, the position or the size of the label changes.
+	"""
+
+	def __init__(
+			self,
+			text: str = '',
+			x: float = 0,
+			y: float = 0,
+			font_name: str | None = None,
+			font_size: float = 12,
+			color: tuple[int, int, int, int] = (255, 255, 255, 255),
+			anchor_x: Literal['left', 'center', 'right'] = 'left',
+			anchor_y: Literal['baseline', 'bottom', 'center', 'top'] = 'baseline',
+			batch: pyglet.graphics.Batch | None = None,
+			group: pyglet.graphics.Group | None = None,
+	):
+		"""
+		DigitLabel constructor.
+		:param text: the text to show, made of characters of GLYPHS
+		:param x: the horizontal position of the anchor, in pixels
+		:param y: the vertical position of the anchor, in pixels
+		:param font_name: the name of the font
+		:param font_size: the size of the font, in points
+		:param color: the color of the text, as a tuple (r, g, b, a)
+		:param anchor_x: the horizontal anchor : 'left', 'center' or 'right'
+		:param anchor_y: the vertical anchor : 'baseline', 'bottom', 'center' or 'top'
+		:param batch: the batch to draw the label in
+		:param group: the parent group of the sprites of the label
+		"""
+		if anchor_x not in ('left', 'center', 'right') or anchor_y not in ('baseline', 'bottom', 'center', 'top'):
+			raise ValueError
+		self.font_name = font_name
+		self.anchor_x = anchor_x
+		self.anchor_y = anchor_y
+		self.batch = batch
+		self.group = group
+		self._x, self._y = x, y
+		self._color = tuple(color)
+		self._atlas: DigitAtlas = get_atlas(font_name, font_size)
+		self._text: str = ''
+		self._sprites: list[pyglet.sprite.Sprite] = []
+		self._origins: list[int] = []  # where each character starts on the baseline
+		self._baseline: int = 0
+		self.text = text
+
+	def _layout(self) -> None:
+		"""
+		Place every character of the text, adding sprites if the text is longer than ever before.
+		This method should only be called from inside this class.
+		:return: None
+		"""
+		atlas, text = self._atlas, self._text
+		while len(self._sprites) < len(text):
+			sprite = pyglet.sprite.Sprite(atlas.regions[' '], batch=self.batch, group=self.group)
+			sprite.color = self._color
+			self._sprites.append(sprite)
+		width = sum(atlas.advances[c] for c in text)
+		# whole pixels, so that glyphs are drawn as sharp as they were rasterized
+		left = round(self._x - {'left': 0, 'center': width / 2, 'right': width}[self.anchor_x])
+		self._baseline = round(self._y - {
+			'baseline': 0,
+			'bottom': atlas.descent,
+			'center': (atlas.ascent + atlas.descent) / 2,
+			'top': atlas.ascent,
+		}[self.anchor_y])
+		self._origins = []
+		for char in text:
+			self._origins.append(left)
+			left += atlas.advances[char]
+		for i, sprite in enumerate(self._sprites):
+			if i < len(text):
+				self._place(i, text[i])
+			elif sprite.visible:
+				sprite.visible = False
+
+	def _place(self, i: int, char: str) -> None:
+		"""
+		Show a character in the sprite of a slot.
+		This method should only be called from inside this class.
+		:param i: the slot
+		:param char: the character
+		:return: None
+		"""
+		sprite = self._sprites[i]
+		atlas = self._atlas
+		sprite.image = atlas.regions[char]  # the same texture : only texture coordinates are written
+		dx, dy = atlas.bearings[char]
+		sprite.position = self._origins[i] + dx, self._baseline + dy, 0
+		visible = char != ' '
+		if sprite.visible != visible:
+			sprite.visible = visible
+
+	@property
+	def text(self) -> str:
+		return self._text
+
+	@text.setter
+	def text(self, text: str) -> None:
+		if text == self._text:
+			return
+		previous, self._text = self._text, text
+		advances = self._atlas.advances
+		if len(text) != len(previous) or any(advances[a] != advances[b] for a, b in zip(text, previous)):
+			self._layout()
+			return
+		for i, (a, b) in enumerate(zip(text, previous)):
+			if a != b:
+				self._place(i, a)
+
+	@property
+	def color(self) -> tuple[int, int, int, int]:
+		return self._color
+
+	@color.setter
+	def color(self, color: tuple[int, int, int, int]) -> None:
+		self._color = tuple(color)
+		for sprite in self._sprites:
+			sprite.color = self._color
+
+	@property
+	def x(self) -> float:
+		return self._x
+
+	@x.setter
+	def x(self, x: float) -> None:
+		self._x = x
+		self._layout()
+
+	@property
+	def y(self) -> float:
+		return self._y
+
+	@y.setter
+	def y(self, y: float) -> None:
+		self._y = y
+		self._layout()
+
+	@property
+	def position(self) -> tuple[float, float, float]:
+		return self._x, self._y, 0
+
+	@position.setter
+	def position(self, position: tuple[float, float, float]) -> None:
+		self._x, self._y = position[:2]  # (x, y, z), as for pyglet labels; sprites of digits are flat
+		self._layout()
+
+	@property
+	def font_size(self) -> float:
+		return self._atlas.font_size
+
+	@font_size.setter
+	def font_size(self, font_size: float) -> None:
+		self._atlas = get_atlas(self.font_name, font_size)
+		self._layout()
+
+	def delete(self) -> None:
+		"""
+		Remove the label from its batch.
+		:return: None
+		"""
+		for sprite in self._sprites:
+			sprite.delete()
+		self._sprites.clear()
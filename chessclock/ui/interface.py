@@ -2,13 +2,57 @@
 #
 # SPDX-License-Identifier: GPL-3.0-only
 
-from typing import Callable
+from typing import Callable, NamedTuple
 
 from chessclock.config import Action
-from chessclock.core import Side
+from chessclock.core import Side, TimeSource
 from chessclock.themes import Theme
 
 
+class ClockState(NamedTuple):
+	"""
+	The state of the clock at one instant, as shown by one frame.
+	Every time it holds comes from the same read of the time source of the clock.
+	"""
+	time_l: int  # time left, in nanoseconds
+	time_r: int
+	side: Side | None  # the side counting down, None before the first press
+	running: bool
+	base_l: int  # starting time, in nanoseconds
+	base_r: int
+	increment_l: int  # increment per turn, in nanoseconds
+	increment_r: int
+	stamp: int | None = None  # the time of the read, from the time source of the clock, or None if unknown
+
+	def time(self, side: Side) -> int:
+		"""
+		:param side: a side of the clock
+		:return: the time left to that side, in nanoseconds
+		"""
+		return self.time_l if side is Side.L else self.time_r
+
+	def base(self, side: Side) -> int:
+		"""
+		:param side: a side of the clock
+		:return: the starting time of that side, in nanoseconds
+		"""
+		return self.base_l if side is Side.L else self.base_r
+
+	def increment(self, side: Side) -> int:
+		"""
+		:param side: a side of the clock
+		:return: the increment per turn of that side, in nanoseconds
+		"""
+		return self.increment_l if side is Side.L else self.increment_r
+
+	@property
+	def times(self) -> dict[Side, int]:
+		return {Side.L: self.time_l, Side.R: self.time_r}
+
+
+GETTERS = ('get_base_time_ns', 'get_increment_ns', 'get_current_times_ns', 'get_current_side', 'is_running')
+
+
 class Interface:
 	"""
 	Subclass this class to create a functional binding between user interface and logic.
@@ -26,6 +70,24 @@ class Interface:
 		"""
 		return None
 
+	# STATE
+
+	def snapshot(self) -> ClockState:
+		"""
+		Get the whole state of the clock at once, reading the time only once, so that a frame never mixes times read
+		at different instants. User interfaces draw each frame from a single snapshot.
+		Override either this method or every getter below; by default, the snapshot is assembled from the getters.
+		:return: the state of the clock
+		"""
+		cls = type(self)
+		if any(getattr(cls, getter) is getattr(Interface, getter) for getter in GETTERS):
+			raise NotImplementedError  # neither the snapshot nor the getters are implemented
+		times, base, incr = self.get_current_times_ns(), self.get_base_time_ns(), self.get_increment_ns()
+		return ClockState(
+			times[Side.L], times[Side.R], self.get_current_side(), self.is_running(),
+			base[Side.L], base[Side.R], incr[Side.L], incr[Side.R], self.get_last_update_ns(),
+		)
+
 	# CONFIG
 
 	def get_base_time_ns(self) -> dict[Side, int]:
@@ -33,39 +95,67 @@ class Interface:
 		Get starting time for each player.
 		:return: a dictionary mapping each side to its starting time, in nanoseconds
 		"""
-		raise NotImplementedError
+		state = self.snapshot()
+		return {Side.L: state.base_l, Side.R: state.base_r}
 
 	def get_increment_ns(self) -> dict[Side, int]:
 		"""
 		Get increment per turn for each player.
 		:return: a dictionary mapping each side to its increment per turn, in nanoseconds
 		"""
-		raise NotImplementedError
+		state = self.snapshot()
+		return {Side.L: state.increment_l, Side.R: state.increment_r}
 
 	# GETTERS
 
 	def get_current_times_ns(self) -> dict[Side, int]:
 		"""
 		Get time left for each player.
-		:return: a dictionary mapping each side to its increment per turn, in nanoseconds
+		:return: a dictionary mapping each side to its time left, in nanoseconds
 		"""
-		raise NotImplementedError
+		return self.snapshot().times
 
 	def get_current_side(self) -> Side | None:
 		"""
 		Get the side that is currently counting down.
-		:return:
+		:return: the side, or None before the first press
 		"""
-		raise NotImplementedError
+		return self.snapshot().side
 
 	def is_running(self) -> bool:
-		raise NotImplementedError
+		return self.snapshot().running
+
+	# TIMING (optional, used for latency measurements)
+
+	def get_time_source(self) -> TimeSource | None:
+		"""
+		Get the source of time of the clock logic.
+		:return: a time source, or None if unknown
+		"""
+		return None
+
+	def get_last_update_ns(self) -> int | None:
+		"""
+		Get the time at which the clock logic last read its time source; right after a press, the time of the press.
+		:return: a time read from get_time_source(), in nanoseconds, or None if unknown
+		"""
+		return None
 
 	# ACTIONS
 
 	def get_action_map(self) -> dict[Action, Callable[[], None]]:
 		raise NotImplementedError
 
+	def act(self, action: Action | None, stamp: int | None = None) -> None:
+		"""
+		Perform an action.
+		Override this method to date presses by when they happened, rather than by when they are performed.
+		:param action: the action, or None to do nothing
+		:param stamp: when the action was triggered, read from get_time_source(), if known; ignored by default
+		:return: None
+		"""
+		self.get_action_map().get(action, lambda: None)()
+
 	# PROPERTIES and DEFAULT IMPLEMENTATIONS (no need to override)
 
 	def press_L(self) -> None:
@@ -0,0 +1,102 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from enum import Enum
+
+from chessclock.common import RollingHistogram, SECOND
+from chessclock.core import TimeSource, MonotonicClock
+
+
+class Stage(Enum):
+	"""
+	The stages a key press goes through, from the key event to the display of its effect.
+	The latency of a stage is measured from the moment the key event reached the user interface.
+	"""
+	STAMPED = 'stamped'  # the clock logic read the time of the press
+	DISPATCHED = 'dispatched'  # the keymap lookup and the action returned
+	SHOWN = 'shown'  # the next frame was handed to the display
+
+
+class LatencyProbe:
+	"""
+	Measures how long key presses take to register and to be shown.
+	Each stage keeps a rolling histogram of its latencies.
+	Recording a press only reads the time source a few times, so the probe can be left enabled.
+	"""
+
+	def __init__(self, time_source: TimeSource | None = None, window: int = 4096):
+		"""
+		LatencyProbe constructor.
+		:param time_source: the time source of the clock logic, so that its press stamps can be compared with key events
+		:param window: the number of most recent presses kept in the histograms
+		"""
+		if time_source is None:
+			time_source = MonotonicClock()
+		if not isinstance(time_source, TimeSource):
+			raise TypeError
+		self.time_source = time_source
+		self._now = time_source.now
+		self.histograms: dict[Stage, RollingHistogram] = {stage: RollingHistogram(window) for stage in Stage}
+		self._event: int | None = None
+		self._pending: list[int] = []
+		self.revision: int = 0  # incremented whenever a histogram changes
+
+	def key_event(self) -> None:
+		"""
+		Called as soon as a key event reaches the user interface.
+		:return: None
+		"""
+		self._event = self._now()
+
+	def dispatched(self, stamp_ns: int | None = None) -> None:
+		"""
+		Called once the action bound to the key has returned.
+		:param stamp_ns: the time at which the clock logic registered the press, if known
+		:return: None
+		"""
+		if self._event is None:
+			return
+		event, self._event = self._event, None
+		if stamp_ns is not None:
+			self.histograms[Stage.STAMPED].record(stamp_ns - event)
+		self.histograms[Stage.DISPATCHED].record(self._now() - event)
+		self._pending.append(event)
+		self.revision += 1
+
+	def shown(self) -> bool:
+		"""
+		Called after a frame has been handed to the display.
+		Completes every press dispatched since the previous frame.
+		:return: True if presses were completed, False otherwise
+		"""
+		if not self._pending:
+			return False
+		t = self._now()
+		for event in self._pending:
+			self.histograms[Stage.SHOWN].record(t - event)
+		self._pending.clear()
+		self.revision += 1
+		return True
+
+	def percentiles(self, stage: Stage, ps: tuple[float, ...] = (50, 90, 99, 100)) -> dict[float, int | None]:
+		"""
+		Get latency percentiles of a stage.
+		:param stage: the stage
+		:param ps: the percentiles, between 0 and 100
+		:return: a dictionary mapping each percentile to an upper bound of the latency, in nanoseconds
+		"""
+		return self.histograms[stage].percentiles(ps)
+
+	def summary(self) -> str:
+		"""
+		Describe the latencies of every stage, in milliseconds, for display in a debug overlay.
+		:return: a one line description of the median and 99th percentile of each stage
+		"""
+		ms = SECOND // 1000
+		parts = []
+		for stage in Stage:
+			h = self.histograms[stage]
+			if h.count:
+				parts.append(f'{stage.value} p50 {h.percentile(50) / ms:.2f} p99 {h.percentile(99) / ms:.2f}')
+		return f'latency (ms, {self.histograms[Stage.DISPATCHED].count} presses) : ' + ' | '.join(parts)
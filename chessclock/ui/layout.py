@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+How the wall display reads and lays out its boards, apart from the window : none of it needs pyglet or a display.
+"""
+
+from math import ceil, sqrt
+from typing import Callable
+
+from chessclock.core import Core, CompactCore, Side, new_snapshot
+from chessclock.core.compact import SIDES, TIME_L, TIME_R, SIDE, RUNNING
+from .interface import Interface
+
+Board = Interface | Core | CompactCore
+Reading = tuple[int, int, Side | None, bool]  # time left of the left and right sides, active side, running
+
+
+def board_reader(board: Board) -> Callable[[], Reading]:
+	"""
+	Build a function reading the state of a board, whatever kind of board it is.
+	:param board: an Interface, a Core or a CompactCore
+	:return: a callable taking no arguments and returning the time left of each side, the active side and whether
+	the clock runs
+	"""
+	if isinstance(board, CompactCore):
+		buffer = new_snapshot()
+
+		def read() -> Reading:
+			board.snapshot_into(buffer)
+			return buffer[TIME_L], buffer[TIME_R], SIDES[buffer[SIDE]], bool(buffer[RUNNING])
+	elif isinstance(board, Core):
+		def read() -> Reading:
+			times = board.times
+			return times[Side.L], times[Side.R], board.side, board.run
+	elif isinstance(board, Interface):
+		def read() -> Reading:
+			state = board.snapshot()
+			return state.time_l, state.time_r, state.side, state.running
+	else:
+		raise TypeError
+	return read
+
+
+def grid(count: int, width: int, height: int, columns: int | None = None) -> tuple[int, int]:
+	"""
+	Get the number of columns and rows of a grid of boards filling a window.
+	Unless given, the number of columns is chosen for cells about 5 units wide and 2 units high.
+	:param count: the number of boards
+	:param width: the width of the window, in pixels
+	:param height: the height of the window, in pixels
+	:param columns: the number of columns, if imposed
+	:return: a tuple (columns, rows)
+	"""
+	if count <= 0:
+		return 1, 1
+	if columns is None:
+		columns = round(sqrt(count * width * 2 / (height * 5)))
+	columns = min(count, max(1, columns))
+	return columns, ceil(count / columns)
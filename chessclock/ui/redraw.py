@@ -0,0 +1,76 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from chessclock.common import Side, SECOND
+from chessclock.config import FRAME_RATES
+from chessclock.themes import AnimatedTheme, Theme
+
+FIXED_INTERVAL_NS = SECOND // 30  # the rate of the 'fixed' policy, at which the clock used to redraw
+LOW_POWER_INTERVAL_NS = SECOND // 10  # the shortest time between two frames of the 'low-power' policy
+
+
+class RedrawScheduler:
+	"""
+	Works out when the display of the clock will change next,
+	so that the user interface can sleep until then instead of redrawing at a fixed rate.
+
+	How often the clock redraws depends on its policy (see FRAME_RATES) :
+		- 'adaptive' redraws whenever the display changes : once a second, on second boundaries, while whole seconds
+		  are shown, every hundredth of a second once they are shown, and never while the clock is paused,
+		  except for the frames of animated themes ;
+		- 'low-power' does the same, but never redraws more often than every LOW_POWER_INTERVAL_NS, still on
+		  boundaries of the displayed time, and does not animate themes while the clock is paused ;
+		- 'fixed' redraws every FIXED_INTERVAL_NS, whatever is shown.
+	User input always triggers a redraw of its own.
+	"""
+
+	def __init__(self, theme: Theme, animation_interval_ns: int = SECOND // 30, policy: str = 'adaptive'):
+		"""
+		RedrawScheduler constructor.
+		:param theme: the theme used to format and color the display
+		:param animation_interval_ns: time between two frames of an animated theme, in nanoseconds
+		:param policy: the frame rate policy, one of FRAME_RATES
+		"""
+		if not isinstance(theme, Theme) or not isinstance(animation_interval_ns, int) or not isinstance(policy, str):
+			raise TypeError
+		if policy not in FRAME_RATES:
+			raise ValueError
+		self.theme = theme
+		self.policy = policy
+		if isinstance(theme, AnimatedTheme):
+			# no need to redraw faster than the colors of the theme change
+			animation_interval_ns = max(animation_interval_ns, theme.step_ns)
+		if policy == 'low-power':
+			animation_interval_ns = max(animation_interval_ns, LOW_POWER_INTERVAL_NS)
+		self.animation_interval_ns = animation_interval_ns
+
+	def next_delay_ns(self, times: dict[Side, int], current_side: Side | None, is_running: bool) -> int | None:
+		"""
+		Get the time until the next visible change of the display,
+		assuming no user input happens in the meantime.
+		:param times: the time left for each side, in nanoseconds
+		:param current_side: the side that is currently counting down
+		:param is_running: True if the clock is running, False otherwise
+		:return: the delay until the next redraw, in nanoseconds, or None if the display will not change on its own
+		"""
+		if self.policy == 'fixed':
+			return FIXED_INTERVAL_NS
+		is_counting = is_running and isinstance(current_side, Side)
+		animates = self.theme.animated and (is_counting or self.policy != 'low-power')
+		delay = self.animation_interval_ns if animates else None
+		if is_counting:
+			ns = times[current_side]
+			if ns > 0:
+				quantum = self.theme.display_quantum(ns)
+				if self.policy == 'low-power' and quantum < LOW_POWER_INTERVAL_NS:
+					# hundredths only change every few frames, still on boundaries of the displayed time
+					quantum = LOW_POWER_INTERVAL_NS // quantum * quantum
+				# the displayed value changes as soon as the time drops below the current multiple of the quantum
+				change = ns % quantum + 1
+				# colors may also change when the time drops below one of the time buckets of the theme
+				crossed = [b for b in self.theme.time_buckets or () if 0 < b <= ns]
+				if crossed:
+					change = min(change, ns - max(crossed) + 1)
+				delay = change if delay is None else min(delay, change)
+		return delay
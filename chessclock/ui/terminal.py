@@ -0,0 +1,363 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+"""
+A user interface running in a terminal, with curses, for hosts without a display server, where pyglet cannot start.
+
+It shows the same clock as UI : the times formatted by the theme, in big digits drawn with block characters,
+and the time controls while the clock is paused, in the colors of the theme mapped to the nearest terminal colors.
+It redraws on the same schedule (see RedrawScheduler) : in between, it waits for a key press without using the CPU.
+Each side of the screen is laid out as rows of text, and only the part of a row that changed is written to curses.
+
+Terminals do not report presses of modifier keys alone : the default key bindings use A and L to end the turns of the
+left and right sides, and Escape quits.
+"""
+
+import curses
+import locale
+from math import ceil
+from time import perf_counter_ns
+
+from chessclock.common import Side
+from chessclock.config.keymap import Key, Keymap
+from chessclock.themes import Theme, TimeFormatter, compile_theme, get_theme
+from .interface import ClockState, Interface
+from .redraw import RedrawScheduler
+
+# glyphs of the big digits, 3 cells wide and 5 cells high
+FONT: dict[str, tuple[str, ...]] = {
+	'0': ('###', '# #', '# #', '# #', '###'),
+	'1': ('  #', '  #', '  #', '  #', '  #'),
+	'2': ('###', '  #', '###', '#  ', '###'),
+	'3': ('###', '  #', '###', '  #', '###'),
+	'4': ('# #', '# #', '###', '  #', '  #'),
+	'5': ('###', '#  ', '###', '  #', '###'),
+	'6': ('###', '#  ', '###', '# #', '###'),
+	'7': ('###', '  #', '  #', '  #', '  #'),
+	'8': ('###', '# #', '###', '# #', '###'),
+	'9': ('###', '# #', '###', '  #', '###'),
+	':': ('   ', ' # ', '   ', ' # ', '   '),
+	'.': ('   ', '   ', '   ', '   ', ' # '),
+	'+': ('   ', ' # ', '###', ' # ', '   '),
+	'-': ('   ', '   ', '###', '   ', '   '),
+	' ': ('   ', '   ', '   ', '   ', '   '),
+}
+FONT_WIDTH, FONT_HEIGHT = 3, 5
+BLOCK = '█'
+
+# the colors of terminals with only 8 or 16 colors, in the order of curses.COLOR_BLACK to curses.COLOR_WHITE
+BASIC_COLORS = (
+	(0, 0, 0), (205, 0, 0), (0, 205, 0), (205, 205, 0), (0, 0, 238), (205, 0, 205), (0, 205, 205), (229, 229, 229),
+)
+BRIGHT_COLORS = (
+	(127, 127, 127), (255, 0, 0), (0, 255, 0), (255, 255, 0),
+	(92, 92, 255), (255, 0, 255), (0, 255, 255), (255, 255, 255),
+)
+CUBE_LEVELS = (0, 95, 135, 175, 215, 255)  # of each channel in the 6x6x6 color cube of 256 color terminals
+
+Row = tuple[str, tuple]  # the text of a row of the screen and its colors, as a (foreground, background) key
+
+
+def terminal_color(rgb: tuple[int, ...], colors: int) -> int:
+	"""
+	Get the terminal color closest to a color of a theme.
+	:param rgb: the color, as a tuple (r, g, b) or (r, g, b, a); alpha is ignored
+	:param colors: the number of colors of the terminal, as in curses.COLORS
+	:return: the number of the closest color : from the 6x6x6 cube or the gray ramp of 256 color terminals,
+	or one of the 8 (or 16) basic colors otherwise
+	"""
+	r, g, b = rgb[:3]
+	if colors >= 256:
+		cube = [min(range(6), key=lambda i: abs(CUBE_LEVELS[i] - c)) for c in (r, g, b)]
+		gray = min(23, max(0, round(((r + g + b) / 3 - 8) / 10)))
+		candidates = {
+			16 + 36 * cube[0] + 6 * cube[1] + cube[2]: tuple(CUBE_LEVELS[i] for i in cube),
+			232 + gray: (8 + 10 * gray,) * 3,
+		}
+	else:
+		palette = BASIC_COLORS + (BRIGHT_COLORS if colors >= 16 else ())
+		candidates = dict(enumerate(palette))
+	return min(candidates, key=lambda n: sum((x - y) ** 2 for x, y in zip(candidates[n], (r, g, b))))
+
+
+def key_symbol(code: int) -> int | None:
+	"""
+	Translate a key read by curses into the key symbols keymaps are made of (see Key).
+	:param code: the key, as returned by curses.window.getch
+	:return: the key symbol, or None if the key cannot be bound
+	"""
+	if code in (10, 13):
+		return Key.ENTER
+	if code == curses.KEY_ENTER:
+		return Key.NUM_ENTER
+	if code == 27:
+		return Key.ESCAPE
+	if 32 <= code < 127:
+		return ord(chr(code).lower())  # letters are bound by their lowercase symbol, whatever the modifiers
+	return None
+
+
+def big_text(text: str, width: int, height: int) -> list[str]:
+	"""
+	Draw a text in big digits made of block characters, as large as fits.
+	Terminal cells are about twice as high as they are wide : digits are scaled twice as much horizontally.
+	:param text: the text, made of characters of FONT
+	:param width: the number of columns available
+	:param height: the number of rows available
+	:return: the rows of the drawing, or the text itself if it has characters out of FONT or big digits do not fit
+	"""
+	if not text or any(c not in FONT for c in text):
+		return [text]
+	columns = len(text) * (FONT_WIDTH + 1) - 1
+	scale = min(height // FONT_HEIGHT, width // (2 * columns))
+	sx, sy = (2 * scale, scale) if scale > 0 else (1, 1)
+	if columns * sx > width or FONT_HEIGHT * sy > height:
+		return [text]
+	rows = []
+	for y in range(FONT_HEIGHT):
+		row = ' '.join(FONT[c][y] for c in text)
+		row = ''.join(BLOCK * sx if c == '#' else ' ' * sx for c in row)
+		rows.extend([row] * sy)
+	return rows
+
+
+def changed_span(old: str, new: str) -> tuple[int, int] | None:
+	"""
+	Find the part of a row of the screen that changed.
+	:param old: the row shown
+	:param new: the row to show, as long as the row shown
+	:return: the (start, end) of the changed part, end excluded, or None if nothing changed
+	"""
+	if old == new:
+		return None
+	start, end = 0, len(new)
+	while old[start] == new[start]:
+		start += 1
+	while old[end - 1] == new[end - 1]:
+		end -= 1
+	return start, end
+
+
+class TerminalUI:
+	"""
+	The user interface for the chess clock, in a terminal.
+	"""
+
+	def __init__(
+			self,
+			interface_instance: Interface,
+			key_bindings: Keymap | None = None,
+			theme: Theme | None = None,
+			frame_rate: str = 'adaptive',
+	):
+		"""
+		TerminalUI constructor.
+		:param interface_instance: an Interface instance
+		:param key_bindings: a complete Keymap instance; defaults to A and L to end the turns of each side
+		:param theme: a Theme instance
+		:param frame_rate: when to redraw the display, one of chessclock.config.FRAME_RATES (see RedrawScheduler)
+		"""
+		# interface
+		if not isinstance(interface_instance, Interface):
+			raise TypeError
+		self.interface: Interface = interface_instance
+		# keymap
+		if key_bindings is None:
+			key_bindings = Keymap(key_press_l=Key.A, key_press_r=Key.L)
+		if not isinstance(key_bindings, Keymap):
+			raise TypeError
+		self.keymap = key_bindings
+		# theme
+		if theme is None:
+			theme = self.interface.get_theme()
+		if theme is None:
+			theme = Theme()
+		if isinstance(theme, str):
+			theme = get_theme(theme)
+		if not isinstance(theme, Theme):
+			raise TypeError
+		self.theme = theme
+		self.formatter = TimeFormatter(self.theme)
+		self.palette = compile_theme(self.theme)
+		# redraw
+		self.redraw = RedrawScheduler(self.theme, policy=frame_rate)
+		self.screen: curses.window | None = None
+		self.size: tuple[int, int] = 0, 0  # rows, columns
+		self._shown: dict[Side, tuple | None] = {side: None for side in Side}  # what each side shows
+		self._rows: dict[Side, list[Row]] = {side: [] for side in Side}
+		self._pairs: dict[tuple, int] = {}  # curses color pairs, by colors of the theme
+		self.cell_updates: int = 0
+
+	def _colors(self, is_current: bool, is_running: bool, time_left_ns: int):
+		"""
+		Get the background, text and meta colors of one side of the clock, as UI._colors does.
+		This method should only be called from inside this class.
+		:param is_current: True if coloring the active side of the clock
+		:param is_running: True if the clock is running, False otherwise
+		:param time_left_ns: the time left on the counter, in nanoseconds
+		:return: a tuple((rgba_background), (rgba_foreground), (rgba_meta))
+		"""
+		if self.palette is not None:
+			return self.palette.colors(is_current, is_running, time_left_ns)
+		return (
+			self.theme.get_back_color(is_current, is_running, time_left_ns),
+			self.theme.get_text_color(is_current, is_running, time_left_ns),
+			None if is_running else self.theme.get_meta_color(is_current, is_running, time_left_ns),
+		)
+
+	def compose(self, time: str, description: str | None, colors: tuple, width: int, height: int) -> list[Row]:
+		"""
+		Lay one side of the clock out.
+		:param time: the time left, formatted
+		:param description: the time control, formatted, or None to leave it out
+		:param colors: the background, text and meta colors of the side
+		:param width: the number of columns of the side
+		:param height: the number of rows of the side
+		:return: the rows of the side, from top to bottom
+		"""
+		back, fore, meta = colors
+		blank = ' ' * width
+		digits = big_text(time, max(0, width - 2), max(0, height - 2))
+		lines: list[Row] = [(d.center(width)[:width], (fore, back)) for d in digits]
+		if description is not None:
+			lines += [(blank, (fore, back)), (description.center(width)[:width], (meta or fore, back))]
+		top = max(0, (height - len(lines)) // 2)
+		rows: list[Row] = [(blank, (fore, back))] * height
+		rows[top:top + len(lines)] = lines[:height - top]
+		return rows
+
+	def _pair(self, colors: tuple) -> int:
+		"""
+		Get the curses attribute drawing in the given colors, allocating a color pair on first use.
+		This method should only be called from inside this class.
+		:param colors: the (foreground, background) colors of the theme
+		:return: the attribute
+		"""
+		pair = self._pairs.get(colors)
+		if pair is None:
+			if not curses.has_colors():
+				pair = 0
+			else:
+				pair = len(self._pairs) + 1
+				if pair >= curses.COLOR_PAIRS:
+					pair = 0  # out of pairs : default colors
+				else:
+					fore, back = (terminal_color(c, curses.COLORS) for c in colors)
+					curses.init_pair(pair, fore, back)
+			self._pairs[colors] = pair
+		return curses.color_pair(pair)
+
+	def _write(self, y: int, x: int, text: str, colors: tuple) -> None:
+		"""
+		Write to the screen.
+		This method should only be called from inside this class.
+		:param y: the row
+		:param x: the column
+		:param text: the text
+		:param colors: the (foreground, background) colors of the theme
+		:return: None
+		"""
+		try:
+			self.screen.addstr(y, x, text, self._pair(colors))
+		except curses.error:
+			pass  # writing the bottom right cell moves the cursor out of the screen, after writing it
+		self.cell_updates += len(text)
+
+	def draw(self) -> ClockState:
+		"""
+		Update the screen to the state of the clock, writing only the cells that changed.
+		:return: the state of the clock shown
+		"""
+		state = self.interface.snapshot()
+		is_running, current_side = state.running, state.side
+		if self.theme.animated:
+			self.theme.set_frame(perf_counter_ns())
+		height, width = self.size
+		for side in Side:
+			colors = self._colors(side == current_side, is_running, state.time(side))
+			time = self.formatter.time(state.time(side))
+			description = None if is_running else self.formatter.time_control(state.base(side), state.increment(side))
+			shown = time, description, colors, self.size
+			if shown == self._shown[side]:
+				continue
+			self._shown[side] = shown
+			left = 0 if side is Side.L else width // 2
+			side_width = width // 2 if side is Side.L else width - width // 2
+			rows = self.compose(time, description, colors, side_width, height)
+			previous = self._rows[side]
+			for y, (text, row_colors) in enumerate(rows):
+				if y < len(previous) and previous[y][1] == row_colors:
+					span = changed_span(previous[y][0], text)
+					if span is not None:
+						self._write(y, left + span[0], text[span[0]:span[1]], row_colors)
+				else:
+					self._write(y, left, text, row_colors)
+			self._rows[side] = rows
+		self.screen.refresh()
+		return state
+
+	def on_resize(self) -> None:
+		"""
+		Lay the whole screen out again, at the size of the terminal.
+		:return: None
+		"""
+		self.size = self.screen.getmaxyx()
+		self.screen.erase()
+		self._shown = {side: None for side in Side}
+		self._rows = {side: [] for side in Side}
+
+	def on_key(self, code: int) -> bool:
+		"""
+		Handle a key read by curses.
+		:param code: the key, as returned by curses.window.getch
+		:return: False if the key quits the clock, True otherwise
+		"""
+		if code == curses.KEY_RESIZE:
+			self.on_resize()
+			return True
+		symbol = key_symbol(code)
+		if symbol == Key.ESCAPE:
+			return False
+		action = self.keymap.get(symbol)
+		self.interface.action_map.get(action, lambda: None)()
+		return True
+
+	def _main(self, screen: curses.window) -> None:
+		"""
+		Run the clock in a screen set up by curses.wrapper.
+		This method should only be called from inside this class.
+		:param screen: the screen
+		:return: None
+		"""
+		self.screen = screen
+		try:
+			curses.curs_set(0)
+		except curses.error:
+			pass  # the terminal cannot hide its cursor
+		if curses.has_colors():
+			curses.start_color()
+		curses.set_escdelay(25)
+		screen.keypad(True)
+		self.on_resize()
+		while True:
+			stamp = perf_counter_ns()
+			state = self.draw()
+			delay = self.redraw.next_delay_ns(state.times, state.side, state.running)
+			if delay is None:
+				screen.timeout(-1)  # wait for a key press only
+			else:
+				delay -= perf_counter_ns() - stamp
+				screen.timeout(max(0, ceil(delay / 10 ** 6)))
+			code = screen.getch()
+			if code != -1 and not self.on_key(code):
+				return
+
+	def run(self) -> None:
+		"""
+		Starts the application, until Escape is pressed.
+		:return: None
+		"""
+		self.interface.reset()
+		locale.setlocale(locale.LC_ALL, '')  # so that curses writes block characters
+		curses.wrapper(self._main)
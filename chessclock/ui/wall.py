@@ -0,0 +1,214 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from time import perf_counter_ns
+from typing import Callable, Sequence
+
+import pyglet
+
+from chessclock.core import Side
+from chessclock.themes import Theme, TimeFormatter, compile_theme, get_theme
+from .digits import GLYPHS, DigitLabel
+from .layout import Board, Reading, board_reader, grid
+
+
+class WallDisplay(pyglet.window.Window):
+	"""
+	A single window showing the clocks of many boards, such as every board of a tournament.
+
+	Every widget of every board lives in one shared batch, drawn in a single call.
+	Each frame, a widget is only updated when what it shows changes : the text of a time is formatted through a
+	TimeFormatter, its colors looked up in the compiled palette of the theme, and both are compared to what is shown.
+	"""
+
+	def __init__(
+			self,
+			boards: Sequence[Board],
+			theme: Theme | str | None = None,
+			size: tuple[int, int] | None = None,
+			columns: int | None = None,
+	):
+		"""
+		WallDisplay constructor.
+		:param boards: the boards, in display order, each one an Interface, a Core or a CompactCore
+		:param theme: a Theme instance or the name of a theme; defaults to the default theme
+		:param size: if given, the (width, height) of a window to open instead of going fullscreen, in pixels
+		:param columns: the number of columns of the grid; chosen from the size of the window if not given
+		"""
+		if size is not None and (len(size) != 2 or not all(isinstance(x, int) and x > 0 for x in size)):
+			raise ValueError
+		if columns is not None and (not isinstance(columns, int) or columns <= 0):
+			raise ValueError
+		self.readers: list[Callable[[], Reading]] = [board_reader(b) for b in boards]
+		super().__init__(*(size or ()), fullscreen=size is None)
+		# theme
+		if theme is None or isinstance(theme, str):
+			theme = get_theme(theme)
+		if not isinstance(theme, Theme):
+			raise TypeError
+		self.theme = theme
+		self.formatter = TimeFormatter(self.theme)
+		self.palette = compile_theme(self.theme)
+		self.columns = columns
+		self.widget_updates: int = 0
+		# widgets, indexed by side of board, as in ClockPool : 2 * board + side.value - 1
+		self.batch = pyglet.graphics.Batch()
+		back, fore = pyglet.graphics.Group(order=0), pyglet.graphics.Group(order=1)
+		count = 2 * len(self.readers)
+		self.areas: list[pyglet.shapes.Rectangle] = [
+			pyglet.shapes.Rectangle(0, 0, 1, 1, batch=self.batch, group=back) for _ in range(count)
+		]
+		# times are drawn from a glyph atlas, unless the theme formats them its own way, as in UI
+		time_label = DigitLabel if type(self.theme).format_time is Theme.format_time else pyglet.text.Label
+		self.times: list[DigitLabel | pyglet.text.Label] = [
+			time_label(
+				font_name=self.theme.get_font(),
+				anchor_x='center',
+				anchor_y='center',
+				batch=self.batch,
+				group=fore,
+			) for _ in range(count)
+		]
+		self.numbers: list[pyglet.text.Label] = [
+			pyglet.text.Label(
+				text=str(b + 1),
+				font_name=self.theme.get_font(),
+				anchor_x='center',
+				anchor_y='top',
+				batch=self.batch,
+				group=fore,
+			) for b in range(len(self.readers))
+		]
+		# what each widget shows
+		self._text: list[str | None] = [None] * count
+		self._fore: list[tuple | None] = [None] * count
+		self._back: list[tuple | None] = [None] * count
+		self._valid_from: list[int] = [0] * count
+		self._valid_until: list[int] = [0] * count
+		self._shown_side: list[Side | None] = [None] * len(self.readers)
+		self._shown_running: list[bool | None] = [None] * len(self.readers)  # None : never shown
+		self.set_mouse_visible(size is not None)
+
+	def _colors(self, is_current: bool, is_running: bool, time_left_ns: int):
+		"""
+		Get the background, text and meta colors of one side of a board, as UI._colors does.
+		This method should only be called from inside this class.
+		:param is_current: True if coloring the active side of the board
+		:param is_running: True if the clock of the board is running, False otherwise
+		:param time_left_ns: the time left on the counter, in nanoseconds
+		:return: a tuple((rgba_background), (rgba_foreground), (rgba_meta))
+		"""
+		if self.palette is not None:
+			return self.palette.colors(is_current, is_running, time_left_ns)
+		return (
+			self.theme.get_back_color(is_current, is_running, time_left_ns),
+			self.theme.get_text_color(is_current, is_running, time_left_ns),
+			None,
+		)
+
+	def on_resize(self, w, h):
+		super().on_resize(w, h)
+		columns, rows = grid(len(self.readers), w, h, self.columns)
+		cell_w, cell_h = w // columns, h // rows
+		side_w = cell_w // 2
+		gap = max(1, min(cell_w, cell_h) // 40)  # a thin line between boards
+		for b in range(len(self.readers)):
+			x, y = (b % columns) * cell_w, h - (b // columns + 1) * cell_h
+			for side in Side:
+				i = 2 * b + side.value - 1
+				left = x + side_w * (side.value - 1)
+				area = self.areas[i]
+				area.position = left + gap * (side is Side.L), y + gap
+				area.width, area.height = side_w - gap, cell_h - 2 * gap
+				label = self.times[i]
+				label.font_size = max(1, min(cell_h // 3, side_w // 5))
+				label.position = left + side_w // 2, y + cell_h * 2 // 5, 0
+			number = self.numbers[b]
+			number.x, number.y = x + cell_w // 2, y + cell_h - gap
+			number.font_size = max(1, cell_h // 8)
+		self.prewarm_glyphs()
+
+	def prewarm_glyphs(self) -> None:
+		"""
+		Render every glyph the boards may show, at the sizes of the labels, as UI.prewarm_glyphs does.
+		:return: None
+		"""
+		if self.times and isinstance(self.times[0], pyglet.text.Label):
+			pyglet.font.load(self.theme.get_font(), self.times[0].font_size).get_glyphs(GLYPHS)
+
+	def _show(self, i: int, ns: int, is_current: bool, is_running: bool) -> int:
+		"""
+		Update the widgets of one side of a board, and work out for how long they stay valid.
+		This method should only be called from inside this class.
+		:param i: the index of the side of the board
+		:param ns: the time left on that side, in nanoseconds
+		:param is_current: True if that side is the active side of the board
+		:param is_running: True if the clock of the board is running
+		:return: the number of widget updates
+		"""
+		updates = 0
+		text = self.formatter.time(ns)
+		if text != self._text[i]:
+			self._text[i] = self.times[i].text = text
+			updates += 1
+		back, fore, _ = self._colors(is_current, is_running, ns)
+		if fore != self._fore[i]:
+			self._fore[i] = self.times[i].color = fore
+			updates += 1
+		if back != self._back[i]:
+			self._back[i] = self.areas[i].color = back
+			updates += 1
+		# times from low to high (excluded) show the same text in the same colors
+		low = high = 0  # empty : shown anew on every frame
+		if self.formatter.caches_time and self.palette is not None:
+			q = self.theme.display_quantum(ns)
+			low = ns - ns % q
+			high = low + q
+			thresholds = self.palette.thresholds
+			bucket = self.palette.bucket(ns)
+			if bucket > 0:
+				low = max(low, thresholds[bucket - 1])
+			if bucket < len(thresholds):
+				high = min(high, thresholds[bucket])
+		self._valid_from[i], self._valid_until[i] = low, high
+		return updates
+
+	def update(self) -> int:
+		"""
+		Read every board and update the widgets whose content changed.
+		Sides whose time stays within the range showing the same text in the same colors are skipped,
+		so that a frame costs a read and a few comparisons per board, plus the updates of the sides that changed.
+		:return: the number of widget updates
+		"""
+		if self.theme.animated:
+			self.theme.set_frame(perf_counter_ns())  # one time for every board
+		low, high, sides, running_states = self._valid_from, self._valid_until, self._shown_side, self._shown_running
+		show = self._show
+		updates = 0
+		for b, read in enumerate(self.readers):
+			time_l, time_r, current, running = read()
+			changed = current is not sides[b] or running != running_states[b]
+			if changed:
+				sides[b], running_states[b] = current, running
+			i = 2 * b
+			if changed or not low[i] <= time_l < high[i]:
+				updates += show(i, time_l, current is Side.L, running)
+			i += 1
+			if changed or not low[i] <= time_r < high[i]:
+				updates += show(i, time_r, current is Side.R, running)
+		self.widget_updates += updates
+		return updates
+
+	def on_draw(self):
+		self.update()
+		self.clear()
+		self.batch.draw()
+
+	def run(self, interval: float = 1 / 60) -> None:
+		"""
+		Show the boards until the window is closed.
+		:param interval: the time between two frames, in seconds
+		:return: None
+		"""
+		pyglet.app.run(interval=interval)
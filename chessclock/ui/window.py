@@ -0,0 +1,297 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from time import perf_counter_ns
+
+import pyglet
+
+from chessclock.config.keymap import Action, Keymap
+from chessclock.themes import Theme, TimeFormatter, compile_theme, get_theme
+from chessclock.core import Side, SECOND
+from chessclock.input import InputBackend
+from .interface import Interface
+from .latency import LatencyProbe, Stage
+from .redraw import RedrawScheduler
+from .digits import GLYPHS, DigitLabel
+
+
+class UI(pyglet.window.Window):
+	"""
+	The user interface for the chess clock.
+	"""
+
+	@staticmethod
+	def screen_size():
+		"""
+		Get the size of the screen, in pixels.
+		:return: a tuple describing the size of the screen, in pixels, in format (width,height)
+		"""
+		# pyglet 2.1 renamed pyglet.canvas to pyglet.display
+		displays = getattr(pyglet, 'display', None) or pyglet.canvas
+		screen = displays.get_display().get_default_screen()
+		return screen.width, screen.height
+
+	def __init__(
+			self,
+			interface_instance: Interface,
+			key_bindings: Keymap | None = None,
+			theme: Theme | None = None,
+			size: tuple[int, int] | None = None,
+			latency_probe: LatencyProbe | None = None,
+			frame_rate: str = 'adaptive',
+			input_backend: InputBackend | None = None,
+	):
+		"""
+		UI constructor.
+		:param interface_instance: an Interface instance
+		:param key_bindings: a complete Keymap instance
+		:param theme: a Theme instance
+		:param size: if given, the (width, height) of a window to open instead of going fullscreen, in pixels
+		:param latency_probe: if given, measure the latency of key presses and show it in an overlay
+		:param frame_rate: when to redraw the display, one of chessclock.config.FRAME_RATES (see RedrawScheduler)
+		:param input_backend: if given, an input backend whose events are applied as soon as they arrive
+		"""
+		if size is not None and (len(size) != 2 or not all(isinstance(x, int) and x > 0 for x in size)):
+			raise ValueError
+		super().__init__(*(size or ()))
+		# interface
+		if not isinstance(interface_instance, Interface):
+			raise TypeError
+		self.interface: Interface = interface_instance
+		# keymap
+		if key_bindings is None:
+			key_bindings = Keymap()
+		if not isinstance(key_bindings, Keymap):
+			raise TypeError
+		self.keymap = key_bindings
+		# theme
+		if theme is None:
+			theme = self.interface.get_theme()
+		if theme is None:
+			theme = Theme()
+		if isinstance(theme, str):
+			theme = get_theme(theme)
+		if not isinstance(theme, Theme):
+			raise TypeError
+		self.theme = theme
+		self.formatter = TimeFormatter(self.theme)
+		self.palette = compile_theme(self.theme)
+		# redraw
+		self.event_driven: bool = False
+		self.redraw = RedrawScheduler(self.theme, policy=frame_rate)
+		self._shown: dict[tuple[int, str], object] = {}
+		self.widget_updates: int = 0
+		# latency
+		if latency_probe is not None and not isinstance(latency_probe, LatencyProbe):
+			raise TypeError
+		self.latency = latency_probe
+		self._latency_revision: int = -1
+		# input devices read on a thread of their own
+		if input_backend is not None and not isinstance(input_backend, InputBackend):
+			raise TypeError
+		self.input = input_backend
+		if self.input is not None:
+			self.input.wakeup = lambda: pyglet.app.platform_event_loop.post_event(self, 'on_device_input')
+		# fullscreen
+		if size is None:
+			self.scrwid, self.scrhei = UI.screen_size()
+			self.width = self.scrwid
+			self.height = self.scrhei
+			self.set_fullscreen(fullscreen=True, width=self.scrwid, height=self.scrhei)
+		else:
+			self.scrwid, self.scrhei = size
+		self.set_mouse_visible(False)
+		# widgets
+		self.back = pyglet.graphics.Batch()
+		self.fore = pyglet.graphics.Batch()
+		self.meta = pyglet.graphics.Batch()
+		self.areas: dict[Side, pyglet.shapes.Rectangle] = {
+			side: pyglet.shapes.Rectangle(
+				x=(self.scrwid // 2) * int(side is Side.R),
+				y=0,
+				width=self.scrwid,
+				height=self.scrhei,
+				batch=self.back,
+			) for side in Side
+		}
+		# times are drawn from a glyph atlas, unless the theme formats them its own way, with any character
+		time_label = DigitLabel if type(self.theme).format_time is Theme.format_time else pyglet.text.Label
+		self.times: dict[Side, DigitLabel | pyglet.text.Label] = {
+			side: time_label(
+				text='00:00:00',
+				font_name=self.theme.get_font(),
+				anchor_x='center',
+				anchor_y='baseline',
+				batch=self.fore,
+			) for side in Side
+		}
+		state = self.interface.snapshot()
+		self.description: dict[Side, pyglet.text.Label] = {
+			side: pyglet.text.Label(
+				text=self.formatter.time_control(state.base(side), state.increment(side)),
+				font_name=self.theme.get_font(),
+				anchor_x='center',
+				anchor_y='baseline',
+				align='center',
+				batch=self.meta,
+			) for side in Side
+		}
+		self.debug = pyglet.graphics.Batch()
+		self.overlay = pyglet.text.Label(
+			text='',
+			font_name=self.theme.get_font(),
+			x=8,
+			y=8,
+			batch=self.debug,
+		)
+
+	def run(self, interval: float | None = None) -> None:
+		"""
+		Starts the application.
+		:param interval: a fixed update interval / "framerate"; if None, the display is only redrawn when it changes
+		:return: None
+		"""
+		self.interface.reset()
+		self.event_driven = interval is None
+		if self.event_driven:
+			self.request_redraw()
+		pyglet.app.run(interval=interval)
+
+	def request_redraw(self, delay: float = 0.0) -> None:
+		"""
+		Replace any pending redraw with one happening after a given delay.
+		Only meaningful when the application is event driven.
+		:param delay: the time to wait before redrawing, in seconds
+		:return: None
+		"""
+		pyglet.clock.unschedule(self.draw)
+		pyglet.clock.schedule_once(self.draw, delay)
+
+	def _assign(self, widget, attribute: str, value) -> None:
+		"""
+		Set an attribute of a widget, unless it already holds the same value.
+		Avoids needless text layouts and vertex updates in pyglet.
+		:param widget: the widget to update
+		:param attribute: the name of the attribute to set
+		:param value: the new value of the attribute
+		:return: None
+		"""
+		key = id(widget), attribute
+		if self._shown.get(key) != value:
+			self._shown[key] = value
+			setattr(widget, attribute, value)
+			self.widget_updates += 1
+
+	def _colors(self, is_current: bool, is_running: bool, time_left_ns: int):
+		"""
+		Get the background, text and meta colors of one side of the clock.
+		Colors come from the compiled palette of the theme when it has one,
+		otherwise from the color methods of the theme (meta colors are then only computed while paused).
+		:param is_current: True if coloring the active side of the clock
+		:param is_running: True if the clock is running, False otherwise
+		:param time_left_ns: the time left on the counter, in nanoseconds
+		:return: a tuple((rgba_background), (rgba_foreground), (rgba_meta))
+		"""
+		if self.palette is not None:
+			return self.palette.colors(is_current, is_running, time_left_ns)
+		return (
+			self.theme.get_back_color(is_current, is_running, time_left_ns),
+			self.theme.get_text_color(is_current, is_running, time_left_ns),
+			None if is_running else self.theme.get_meta_color(is_current, is_running, time_left_ns),
+		)
+
+	def on_resize(self, w, h):
+		super().on_resize(w, h)
+		for side in Side:
+			self.areas[side].position = (self.scrwid // 2) * int(side is Side.R), 0
+			self.areas[side].width, self.areas[side].height = self.scrwid, self.scrhei
+			self.times[side].x = (w * (3 if side == Side.R else 1)) // 4
+			self.times[side].y = h // 2
+			self.times[side].font_size = h // 10
+			self.description[side].x = (w * (3 if side == Side.R else 1)) // 4
+			self.description[side].y = h * 5 // 6
+			self.description[side].font_size = h // 30
+		if self.event_driven:
+			self.request_redraw()
+		# after the pending redraw : the first frame only renders the glyphs it shows
+		pyglet.clock.unschedule(self.prewarm_glyphs)
+		pyglet.clock.schedule_once(self.prewarm_glyphs, 0)
+
+	def prewarm_glyphs(self, dt: float | None = None) -> None:
+		"""
+		Render every glyph the clock may show, at the sizes of the pyglet labels, ahead of the frames showing them.
+		Otherwise, a frame stalls whenever a digit appears for the first time.
+		Digit labels need none of this : their atlas is rasterized as soon as their size is set.
+		:param dt: time elapsed since this call was scheduled, in seconds (unused)
+		:return: None
+		"""
+		labels = self.description[Side.L], self.times[Side.L]
+		for size in {label.font_size for label in labels if isinstance(label, pyglet.text.Label)}:
+			pyglet.font.load(self.theme.get_font(), size).get_glyphs(GLYPHS)
+
+	def on_expose(self):
+		if self.event_driven:
+			self.request_redraw()
+
+	def on_device_input(self):
+		self.input.dispatch()
+		if self.event_driven:
+			self.request_redraw()
+
+	def on_draw(self):
+		if self.input is not None:
+			self.input.dispatch()  # before reading the clock : see InputBackend.dispatch
+		stamp = perf_counter_ns()
+		state = self.interface.snapshot()  # the whole frame shows the clock at a single instant
+		is_running, current_side = state.running, state.side
+		if self.theme.animated:
+			self.theme.set_frame(stamp)  # one time for the whole frame : every label shows the same step of the animation
+		colors = {side: self._colors(side == current_side, is_running, state.time(side)) for side in Side}
+		self.clear()
+		for side in Side:
+			back, text, _ = colors[side]
+			self._assign(self.times[side], 'text', self.formatter.time(state.time(side)))
+			self._assign(self.times[side], 'color', text)
+			self._assign(self.areas[side], 'color', back)
+		self.back.draw()
+		self.fore.draw()
+		if not is_running:
+			for side in Side:
+				time_control = self.formatter.time_control(state.base(side), state.increment(side))
+				self._assign(self.description[side], 'text', time_control)
+				self._assign(self.description[side], 'color', colors[side][2])
+			self.meta.draw()
+		if self.latency is not None:
+			if self.latency.revision != self._latency_revision:
+				self._latency_revision = self.latency.revision
+				self._assign(self.overlay, 'text', self.latency.summary())
+			self.debug.draw()
+		if self.event_driven:
+			delay = self.redraw.next_delay_ns(state.times, current_side, is_running)
+			pyglet.clock.unschedule(self.draw)
+			if delay is not None:
+				# account for the time spent drawing since the times were read
+				delay -= perf_counter_ns() - stamp
+				pyglet.clock.schedule_once(self.draw, max(0, delay) / SECOND)
+
+	def flip(self):
+		super().flip()
+		if self.latency is not None and self.latency.shown() and self.event_driven:
+			# show the new measurements in the overlay
+			self.request_redraw()
+
+	def on_key_press(self, symbol, modifiers):
+		if self.latency is not None:
+			self.latency.key_event()
+		super().on_key_press(symbol, modifiers)
+		action = self.keymap.get(symbol)
+		self.interface.action_map.get(action, lambda: None)()
+		if self.latency is not None and action is not None:
+			is_press = action in (Action.PRESS_L, Action.PRESS_R)
+			self.latency.dispatched(self.interface.get_last_update_ns() if is_press else None)
+		if self.event_driven:
+			self.request_redraw()
+
+
+UI.register_event_type('on_device_input')  # posted by the reader thread of the input backend
@@ -0,0 +1,41 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import pytest
+
+from chessclock.config import Config, Mode, Stage, TimeControl
+from chessclock.config.args import parse_args, parse_control
+
+
+def test_parse_control():
+	assert parse_control('') is None
+	assert parse_control('40/90+30,30+30') == TimeControl([Stage(5400, 40, 30), Stage(1800, 0, 30)])
+	assert parse_control('5:00d5') == TimeControl([Stage(300, 0, 5, Mode.DELAY)])
+	assert parse_control('1:30:00b10') == TimeControl([Stage(5400, 0, 10, Mode.BRONSTEIN)])
+	assert parse_control('hourglass:1') == TimeControl([Stage(60)], hourglass=True)
+	assert parse_control('40/120, 20/60') == TimeControl([Stage(7200, 40), Stage(3600, 20)])
+	for spec in ('40/', '90x30', '90+', '30+30,40/90', '0+5'):
+		with pytest.raises(ValueError):
+			parse_control(spec)
+
+
+def test_invalid_control_is_a_usage_error(monkeypatch, capsys):
+	for argv in (['--control', '40/abc'], ['--control-r', '30+30,40/90'], ['-t', '1:2:3:4']):
+		monkeypatch.setattr('sys.argv', ['chessclock', *argv])
+		with pytest.raises(SystemExit) as exit_info:
+			parse_args()
+		assert exit_info.value.code == 2
+		assert f'invalid value "{argv[1]}"' in capsys.readouterr().err
+
+
+def test_config_controls():
+	cfg = Config(time_seconds=60, increment_seconds=2)
+	assert cfg.control_l == cfg.control_r == TimeControl.fischer(60, 2)
+	assert (cfg.time_l, cfg.increment_r) == (60, 2)
+	fide = parse_control('40/90+30,30+30')
+	cfg = Config(time_seconds=60, control=fide, control_r=parse_control('5d5'))
+	assert cfg.control_l == fide and not fide.simple
+	assert (cfg.time_l, cfg.increment_l, cfg.time_r, cfg.increment_r) == (5400, 30, 300, 0)
+	cfg.swap_sides()
+	assert cfg.control_r == fide and cfg.time_r == 5400
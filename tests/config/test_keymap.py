@@ -0,0 +1,37 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import subprocess
+import sys
+from textwrap import dedent
+
+import pytest
+
+
+# in a process of its own : importing pyglet.window connects to a display, unless in headless mode (EGL)
+KEY_SYMBOLS = dedent('''
+	import sys
+	import pyglet
+	pyglet.options['headless'] = True
+	try:
+		from pyglet.window import key
+	except Exception:
+		sys.exit(77)  # no EGL display
+	from chessclock.config.keymap import Key
+	for name, value in vars(Key).items():
+		if name.isupper():
+			assert getattr(key, name) == value, name
+''')
+
+
+def test_key_symbols_match_pyglet():
+	result = subprocess.run([sys.executable, '-c', KEY_SYMBOLS], capture_output=True, text=True)
+	if result.returncode == 77:
+		pytest.skip('pyglet cannot load without a display')
+	assert result.returncode == 0, result.stderr
+
+
+def test_logic_loads_without_pyglet():
+	code = "import sys, chessclock.core, chessclock.config; assert 'pyglet' not in sys.modules and 'asyncio' not in sys.modules"
+	subprocess.run([sys.executable, '-c', code], check=True)
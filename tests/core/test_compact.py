@@ -0,0 +1,87 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import random
+import sys
+import tracemalloc
+from itertools import repeat
+
+from chessclock.common import Side, SECOND
+from chessclock.config import Config
+from chessclock.config.args import parse_control
+from chessclock.core import CompactCore, Core, VirtualClock, new_snapshot
+from chessclock.core.compact import SIDE, RUNNING, HALF_MOVES, STAMP
+
+
+def test_compact_core_matches_core():
+	clock = VirtualClock()
+	specs = ['1+2', '2d3', '1b2', 'hourglass:1', '3/1+1,2/1d1,1b1']
+	cfgs = [Config(control_l=parse_control(random.choice(specs)), control_r=parse_control(random.choice(specs))) for _ in range(10)]
+	cores = [Core(c, clock) for c in cfgs]
+	compact = [CompactCore(c, clock) for c in cfgs]
+	snapshot = new_snapshot()
+	for _ in range(3000):
+		clock.advance(random.randint(0, 3 * SECOND))
+		b = random.randrange(len(cores))
+		match random.randrange(6):
+			case 0 | 1:
+				side = random.choice(list(Side))
+				at = random.choice((None, clock.time - random.randint(0, 2 * SECOND)))  # dated by an input device
+				cores[b].press(side, at)
+				compact[b].press(side, at)
+			case 2:
+				cores[b].add_time(Side.L, 2)
+				compact[b].add_time(Side.L, 2)
+			case 3:
+				cores[b].toggle_run()
+				compact[b].toggle_run()
+			case 4:
+				assert cores[b].swap_sides() == compact[b].swap_sides()
+			case 5:
+				if random.random() < 0.05:
+					cores[b].reset()
+					compact[b].reset()
+		for core, other in zip(cores, compact):
+			assert (core.side, core.run, core.half_moves, core.moves) == (other.side, other.run, other.half_moves, other.moves)
+			assert (core.times, core.flagged, core.describe, core.deadline) == (other.times, other.flagged, other.describe, other.deadline)
+			other.snapshot_into(snapshot)
+			assert [snapshot[s.value] for s in Side] == [core.times[s] for s in Side]
+			assert (snapshot[STAMP], snapshot[RUNNING], snapshot[HALF_MOVES]) == (core.stamp, core.run, core.half_moves)
+			assert snapshot[SIDE] == (core.side.value if core.side else 0)
+
+
+def test_compact_core_does_not_allocate():
+	clock = VirtualClock()
+	core = CompactCore(Config(control=parse_control('40/90+30,30+30')), clock)
+	snapshot = new_snapshot()
+	core.press(Side.R)
+
+	def frame():
+		clock.advance(SECOND // 60)
+		core.snapshot_into(snapshot)
+
+	def press():
+		clock.advance(SECOND)
+		core.press(core.side)
+
+	def allocated(step) -> int:
+		blocks = sys.getallocatedblocks()
+		for _ in repeat(None, 1000):
+			step()
+		return sys.getallocatedblocks() - blocks
+
+	tracemalloc.start()
+	try:
+		# past the cache of small integers for move counters
+		for _ in range(600):
+			frame()
+			press()
+		for step in (frame, press):
+			step()
+			before = tracemalloc.get_traced_memory()[0]
+			assert allocated(step) == allocated(lambda: None)
+			# integers of the state are replaced by integers of other sizes, but no object is kept
+			assert abs(tracemalloc.get_traced_memory()[0] - before) < 64
+	finally:
+		tracemalloc.stop()
@@ -0,0 +1,116 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import random
+import sys
+import threading
+
+from chessclock.common import Side, SECOND
+from chessclock.config import Config
+from chessclock.config.args import parse_control
+from chessclock.core import Core, MonotonicClock, Op, VirtualClock, new_snapshot
+from chessclock.core.compact import STAMP, TIME_L, TIME_R, RUNNING, HALF_MOVES
+from chessclock.core.concurrent import ConcurrentCore
+
+
+def test_concurrent_core_matches_core():
+	clock = VirtualClock()
+	specs = ['1+2', '2d3', '1b2', 'hourglass:1', '3/1+1,2/1d1,1b1']
+	for _ in range(10):
+		cfg = Config(control_l=parse_control(random.choice(specs)), control_r=parse_control(random.choice(specs)))
+		core, concurrent = Core(cfg, clock), ConcurrentCore(cfg, clock)
+		ops, other_ops = [], []
+		core.observers.append(lambda *args: ops.append(args))
+		concurrent.observers.append(lambda *args: other_ops.append(args))
+		# swaps happen while paused, stamped with the last update, which only reads of a Core move
+		unstamped = lambda log: [(op, side, arg, None if op is Op.SWAP_SIDES else stamp) for op, side, arg, stamp in log]
+		for _ in range(300):
+			elapsed = random.randint(0, 3 * SECOND)
+			clock.advance(elapsed)
+			match random.randrange(6):
+				case 0 | 1:
+					side = random.choice(list(Side))
+					# dated after the last read : reading a Core moves its stamp, and presses are never dated before it
+					at = random.choice((None, clock.time - random.randint(0, elapsed)))
+					core.press(side, at)
+					concurrent.press(side, at)
+				case 2:
+					core.add_time(Side.R, 3)
+					concurrent.add_time(Side.R, 3)
+				case 3:
+					core.toggle_run()
+					concurrent.toggle_run()
+				case 4:
+					assert core.swap_sides() == concurrent.swap_sides()
+				case 5:
+					core.reset()
+					concurrent.reset()
+			assert (core.side, core.run, core.half_moves, core.moves) == (concurrent.side, concurrent.run, concurrent.half_moves, concurrent.moves)
+			assert (core.times, core.flagged, core.incr) == (concurrent.times, concurrent.flagged, concurrent.incr)
+			assert core.stamp == concurrent.stamp
+		assert unstamped(ops) == unstamped(other_ops)
+
+
+def test_concurrent_core_under_contention():
+	# pressing and pausing from many threads while others read : every read is a state the clock was in
+	interval = sys.getswitchinterval()
+	sys.setswitchinterval(1e-5)  # switch threads as often as possible, in the middle of operations
+	core = ConcurrentCore(Config(time_seconds=3600, increment_seconds=1), MonotonicClock())
+	log: list[tuple[Op, Side | None, int, int]] = []
+	core.observers.append(lambda *args: log.append(args))
+	base = 2 * 3600 * SECOND
+	start = core.stamp
+	errors: list[str] = []
+	done = threading.Event()
+
+	def spent(snapshot) -> int:
+		# time counted down since the start, on both sides : the increments are given back
+		return base + SECOND * snapshot[HALF_MOVES] - snapshot[TIME_L] - snapshot[TIME_R]
+
+	def write(seed: int) -> None:
+		rng = random.Random(seed)
+		for _ in range(2000):
+			if rng.random() < 0.1:
+				core.toggle_run()
+			else:
+				core.press(rng.choice((Side.L, Side.R)))
+
+	def read() -> None:
+		snapshot, last = new_snapshot(), (start, 0)
+		while not done.is_set():
+			core.snapshot_into(snapshot)
+			stamp, counted = snapshot[STAMP], spent(snapshot)
+			# time only flows forward, and never faster than the time source
+			if not (stamp >= last[0] and last[1] <= counted <= last[1] + stamp - last[0]):
+				errors.append(f'{last} then {(stamp, counted)}')
+			last = stamp, counted
+
+	try:
+		writers = [threading.Thread(target=write, args=(seed,)) for seed in range(8)]
+		readers = [threading.Thread(target=read) for _ in range(4)]
+		for thread in readers + writers:
+			thread.start()
+		for thread in writers:
+			thread.join()
+		done.set()
+		for thread in readers:
+			thread.join()
+	finally:
+		sys.setswitchinterval(interval)
+	assert not errors, errors[:5]
+	# operations were notified one at a time, in order, and nothing was lost
+	presses = sum(op is Op.PRESS for op, _, _, _ in log)
+	assert len(log) == 8 * 2000 and presses > 8 * 1000
+	assert all(a[3] <= b[3] for a, b in zip(log, log[1:]))
+	# the time counted down is exactly the time the clock ran, as told by the operations
+	snapshot = core.snapshot_into(new_snapshot())
+	running, since, ran = False, start, 0
+	for op, _, arg, stamp in log:
+		if running:
+			ran += stamp - since
+		running, since = (True if op is Op.PRESS else bool(arg)), stamp
+	if running:
+		ran += snapshot[STAMP] - since
+	assert bool(snapshot[RUNNING]) == running
+	assert spent(snapshot) == ran
@@ -0,0 +1,87 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import random
+import threading
+import time
+
+from chessclock.common import Side, SECOND
+from chessclock.config import Config
+from chessclock.core import Core, VirtualClock
+from chessclock.core.flags import FlagScheduler
+
+
+def test_flag_deadlines_follow_operations():
+	clock = VirtualClock()
+	scheduler = FlagScheduler(clock)
+	fired = []
+	core = Core(Config(time_seconds=10), clock)
+	scheduler.attach(core, lambda c, side, t: fired.append((side, t)))
+	assert scheduler.next_deadline() is None
+	core.press(Side.R)
+	assert scheduler.next_deadline() == 10 * SECOND
+	clock.advance(4 * SECOND)
+	core.add_time(Side.L, 5)
+	core.run = False
+	clock.advance(100 * SECOND)
+	assert scheduler.poll() == 0
+	core.run = True
+	assert scheduler.next_deadline() == 115 * SECOND
+	clock.set(115 * SECOND - 1)
+	assert scheduler.poll() == 0
+	clock.advance(7)
+	assert scheduler.poll() == 1
+	assert fired == [(Side.L, 115 * SECOND)]
+	# pausing and resuming a flagged clock does not flag again, getting time back does
+	core.run = False
+	core.run = True
+	core.add_time(Side.L, 1)
+	clock.advance(SECOND)
+	assert scheduler.poll() == 1
+	assert fired[-1] == (Side.L, 116 * SECOND + 6)
+
+
+def test_flag_scheduler_matches_polling():
+	clock = VirtualClock()
+	scheduler = FlagScheduler(clock)
+	cores = [Core(Config(time_seconds=random.randint(1, 20)), clock) for _ in range(200)]
+	flagged = set()
+
+	def on_flag(i, c, side, t):
+		assert c.flagged[side] and t <= clock.now()
+		flagged.add((i, side))
+
+	for i, core in enumerate(cores):
+		scheduler.attach(core, lambda c, side, t, i=i: on_flag(i, c, side, t))
+	for _ in range(3000):
+		clock.advance(random.randint(0, SECOND // 2))
+		core = random.choice(cores)
+		match random.randrange(5):
+			case 0 | 1:
+				core.press(random.choice(list(Side)))
+			case 2:
+				core.toggle_run()
+			case 3:
+				core.swap_sides()
+			case 4:
+				core.add_time(random.choice([Side.L, Side.R, None]), random.randint(1, 3))
+		scheduler.poll()
+		for i, c in enumerate(cores):
+			if c.run and c.flagged[c.side]:
+				assert (i, c.side) in flagged
+
+
+def test_flag_thread():
+	scheduler = FlagScheduler()
+	fired = threading.Event()
+	core = Core(Config(time_seconds=1))
+	scheduler.attach(core, lambda c, side, t: fired.set())
+	scheduler.start()
+	try:
+		begin = time.perf_counter()
+		core.press(Side.L)
+		assert fired.wait(5)
+		assert time.perf_counter() - begin >= 1
+	finally:
+		scheduler.stop()
@@ -0,0 +1,95 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import os
+
+import pytest
+
+from chessclock.common import Side, SECOND
+from chessclock.config import Config
+from chessclock.config.args import parse_control
+from chessclock.core import VirtualClock
+from chessclock.core.journal import FsyncPolicy, RECORD, open_journaled_core, read_journal
+
+
+def play(core, clock):
+	core.press(Side.R)
+	for _ in range(10):
+		clock.advance(3 * SECOND)
+		core.press(core.side)
+	core.add_time(Side.L, 20)
+
+
+def test_journal_recovers_game(tmp_path):
+	path = tmp_path / 'game.ccj'
+	clock = VirtualClock()
+	core, journal = open_journaled_core(path, Config(time_l=60, time_r=60, increment_l=2, increment_r=2), clock, FsyncPolicy.NEVER)
+	core.run = True
+	play(core, clock)
+	expected = core.times
+	clock.advance(SECOND)  # time elapsed after the last operation is not journaled
+	journal.close()
+	recovered, journal = open_journaled_core(path, time_source=VirtualClock(123 * SECOND))
+	assert recovered.times == expected
+	assert recovered.side == core.side
+	assert recovered.half_moves == core.half_moves
+	assert not recovered.run
+	journal.close()
+
+
+def test_journal_spans_sessions(tmp_path):
+	path = tmp_path / 'game.ccj'
+	clock = VirtualClock()
+	core, journal = open_journaled_core(path, Config(time_l=60, time_r=60), clock, FsyncPolicy.ALWAYS)
+	play(core, clock)
+	journal.close()
+	clock = VirtualClock(5 * SECOND)
+	core, journal = open_journaled_core(path, time_source=clock)
+	clock.advance(SECOND)
+	core.run = True
+	clock.advance(4 * SECOND)
+	core.press(core.side)
+	expected = core.times
+	journal.close()
+	recovered, journal = open_journaled_core(path, time_source=VirtualClock())
+	assert recovered.times == expected
+	journal.close()
+
+
+def test_journal_recovers_time_control(tmp_path):
+	path = tmp_path / 'game.ccj'
+	clock = VirtualClock()
+	cfg = Config(control_l=parse_control('40/90+30,30+30'), control_r=parse_control('hourglass:5'))
+	core, journal = open_journaled_core(path, cfg, clock, FsyncPolicy.NEVER)
+	core.press(Side.R)
+	for _ in range(90):
+		clock.advance(SECOND)
+		core.press(core.side)
+	expected = core.times
+	journal.close()
+	recovered, journal = open_journaled_core(path, time_source=VirtualClock())
+	journal.close()
+	assert recovered.times == expected
+	assert recovered.schedule[Side.L].hourglass is False and recovered.schedule[Side.R].hourglass is True
+	with pytest.raises(ValueError):
+		open_journaled_core(path, Config(control=parse_control('40/90+30,30+30')), VirtualClock())
+
+
+def test_journal_drops_torn_record(tmp_path):
+	path = tmp_path / 'game.ccj'
+	clock = VirtualClock()
+	core, journal = open_journaled_core(path, time_source=clock)
+	play(core, clock)
+	journal.close()
+	_, records, valid = read_journal(path)
+	with open(path, 'ab') as f:
+		f.write(RECORD.pack(1, 2, 3, 1, 0)[:-1])
+	assert read_journal(path)[2] == valid
+	with open(path, 'r+b') as f:
+		f.seek(valid - 4)
+		f.write(b'\0\0\0\0')
+	_, torn, _ = read_journal(path)
+	assert len(torn) == len(records) - 1
+	open_journaled_core(path, time_source=VirtualClock())[1].close()
+	assert os.path.getsize(path) == valid  # the torn record was replaced by a session record
@@ -0,0 +1,59 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import random
+
+from chessclock.common import Side, SECOND
+from chessclock.config import Config
+from chessclock.core import ClockPool, Core, VirtualClock
+
+
+def test_pool_matches_core():
+	clock = VirtualClock()
+	cfgs = [Config(time_seconds=random.randint(1, 30), increment_seconds=random.randint(0, 5)) for _ in range(20)]
+	cores = [Core(c, clock) for c in cfgs]
+	pool = ClockPool(len(cfgs), cfgs, clock)
+	for _ in range(2000):
+		clock.advance(random.randint(0, 3 * SECOND))
+		b = random.randrange(len(cores))
+		match random.randrange(6):
+			case 0 | 1:
+				side = random.choice(list(Side))
+				cores[b].press(side)
+				pool.press(b, side)
+			case 2:
+				cores[b].add_time(Side.L, 2)
+				pool.add_time(b, Side.L, 2)
+			case 3:
+				cores[b].toggle_run()
+				pool.toggle_run(b)
+			case 4:
+				assert cores[b].swap_sides() == pool.swap_sides(b)
+			case 5:
+				if random.random() < 0.05:
+					cores[b].reset()
+					pool.reset(b)
+		times, flagged = pool.times(), pool.flagged()
+		for i, core in enumerate(cores):
+			assert core.side == pool.side(i)
+			assert core.run == pool.is_running(i)
+			assert core.half_moves == pool.half_moves[i]
+			for s in Side:
+				assert core.times[s] == times[ClockPool.index(i, s)]
+				assert core.flagged[s] == bool(flagged[ClockPool.index(i, s)])
+
+
+def test_pool_bulk_operations():
+	clock = VirtualClock()
+	pool = ClockPool(4, Config(time_seconds=60), clock)
+	pool.press_many(range(4), [Side.L] * 4)
+	clock.advance(10 * SECOND)
+	pool.pause_all()
+	assert not any(pool.is_running(b) for b in range(4))
+	clock.advance(10 * SECOND)
+	assert all(pool.board_times(b) == {Side.L: 60 * SECOND, Side.R: 50 * SECOND} for b in range(4))
+	pool.resume_all()
+	pool.add_time(seconds=5)
+	clock.advance(5 * SECOND)
+	assert list(pool.times()) == [65 * SECOND, 50 * SECOND] * 4
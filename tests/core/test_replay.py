@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import random
+
+from chessclock.common import Side, SECOND
+from chessclock.config import Config
+from chessclock.config.args import parse_control
+from chessclock.core import Op, VirtualClock
+from chessclock.core.journal import NO_SIDE, SESSION, FsyncPolicy, open_journaled_core
+from chessclock.core.replay import GameState, event, replay_core, replay_game, replay_games, replay_journals
+
+CONTROL = (60, 60, 1, 1)
+
+
+def game(think: int) -> list:
+	events = [event(0, Op.PRESS, Side.R)]
+	t = 0
+	side = Side.L
+	for _ in range(6):
+		t += think * SECOND
+		events.append(event(t, Op.PRESS, side))
+		side = side.opposite
+	return events
+
+
+def test_replay_game_states():
+	states = replay_game(CONTROL, game(2) + [event(13 * SECOND, Op.ADD_TIME, Side.L, 5)])
+	assert len(states) == 6
+	assert states[0] == GameState(1, 2 * SECOND, 59 * SECOND, 60 * SECOND, Side.R)
+	assert states[-1] == GameState(6, 12 * SECOND, 57 * SECOND, 57 * SECOND, Side.L)
+
+
+def test_replay_pause_and_swap():
+	events = game(2)[:3] + [
+		event(5 * SECOND, Op.RUN, arg=0),
+		event(50 * SECOND, Op.SWAP_SIDES),
+		event(50 * SECOND, Op.RUN, arg=1),
+		event(51 * SECOND, Op.PRESS, Side.R),
+	]
+	states = replay_game((60, 30, 0, 0), events)
+	# paused after the left player thought for one second, then the clock was turned around
+	assert states[-1] == GameState(3, 51 * SECOND, 28 * SECOND, 56 * SECOND, Side.L)
+
+
+def test_replay_games_in_pool():
+	games = [(CONTROL, game(t)) for t in range(1, 9)]
+	expected = [replay_game(*g) for g in games]
+	assert list(replay_games(games, processes=2, chunksize=3)) == expected
+	assert list(replay_games(games, processes=1)) == expected
+
+
+def test_replay_journals(tmp_path):
+	clock = VirtualClock()
+	core, journal = open_journaled_core(tmp_path / 'game.ccj', Config(time_seconds=60), clock, FsyncPolicy.NEVER)
+	core.press(Side.R)
+	for _ in range(4):
+		clock.advance(SECOND)
+		core.press(core.side)
+	journal.close()
+	states, = replay_journals([tmp_path / 'game.ccj'], processes=1)
+	assert [s.half_moves for s in states] == [1, 2, 3, 4]
+	assert (states[-1].time_l, states[-1].time_r) == (58 * SECOND, 58 * SECOND)
+
+
+def test_replay_journals_with_stages(tmp_path):
+	paths, expected = [], []
+	for spec in ('40/90+30,30+30', '5:00d5', '1:30:00b10', 'hourglass:5', '10:00+1'):
+		clock = VirtualClock()
+		paths.append(tmp_path / f'{len(paths)}.ccj')
+		core, journal = open_journaled_core(paths[-1], Config(control=parse_control(spec)), clock, FsyncPolicy.NEVER)
+		core.press(Side.R)
+		for move in range(90):
+			clock.advance((1 + move % 4) * 3 * SECOND)
+			core.press(core.side)
+		journal.close()
+		expected.append(core.times)
+		state = next(replay_journals(paths[-1:], processes=1))[-1]
+		assert (state.half_moves, {Side.L: state.time_l, Side.R: state.time_r}) == (90, core.times)
+	states = replay_journals(paths, processes=2, chunksize=2)
+	assert [{Side.L: s[-1].time_l, Side.R: s[-1].time_r} for s in states] == expected
+
+
+def test_replay_game_matches_core():
+	rng = random.Random(1)
+	for _ in range(50):
+		t = 0
+		events = []
+		for _ in range(200):
+			t += rng.randint(-SECOND, 10 * SECOND)
+			op = rng.choice(list(Op) + [Op.PRESS] * 6)
+			side = rng.choice([Side.L, Side.R, None]) if op is Op.ADD_TIME else rng.choice(list(Side))
+			if rng.random() < 0.01:
+				events.append((t, 0, SESSION, NO_SIDE))
+			events.append(event(t, op, side, rng.randint(0, 1) if op is Op.RUN else rng.randint(0, 20)))
+		control = (rng.randint(1, 120), rng.randint(1, 120), rng.randint(0, 5), rng.randint(0, 5))
+		assert replay_game(control, events) == replay_core(control, events)
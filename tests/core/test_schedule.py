@@ -0,0 +1,62 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from chessclock.common import Side, SECOND, MINUTE
+from chessclock.config import Config
+from chessclock.config.args import parse_control
+from chessclock.core import Core, VirtualClock
+
+
+def play(spec: str, thinking: list[int]) -> tuple[Core, VirtualClock]:
+	"""
+	Play a game in which the left player takes the given times for their moves, and the right player moves instantly.
+	"""
+	clock = VirtualClock()
+	core = Core(Config(control=parse_control(spec)), clock)
+	core.press(Side.R)
+	for t in thinking:
+		clock.advance(t)
+		core.press(Side.L)
+		core.press(Side.R)
+	return core, clock
+
+
+def test_stages():
+	core, _ = play('40/90+30,30+30', [MINUTE] * 39)
+	assert core.times[Side.L] == 90 * MINUTE - 39 * MINUTE + 39 * 30 * SECOND
+	core, _ = play('40/90+30,30+30', [MINUTE] * 41)
+	assert core.times[Side.L] == 120 * MINUTE - 41 * MINUTE + 41 * 30 * SECOND
+	assert core.moves == {Side.L: 41, Side.R: 41}
+	# the last stage repeats
+	core, _ = play('40/120,20/60', [MINUTE] * 80)
+	assert core.times[Side.L] == 300 * MINUTE - 80 * MINUTE
+	core, _ = play('40/120,20/60', [MINUTE] * 79)
+	assert core.times[Side.L] == 240 * MINUTE - 79 * MINUTE
+
+
+def test_delays():
+	core, clock = play('5d5', [3 * SECOND, 8 * SECOND])
+	assert core.times[Side.L] == 5 * MINUTE - 3 * SECOND
+	assert core.incr[Side.L] == 5 * SECOND
+	clock.advance(4 * SECOND)
+	core.press(Side.L)
+	assert core.times[Side.L] == 5 * MINUTE - 3 * SECOND
+	core, clock = play('5b5', [3 * SECOND, 8 * SECOND])
+	assert core.times[Side.L] == 5 * MINUTE - 3 * SECOND
+	# the delay is counted in the deadline, and pausing keeps what is left of it
+	core, clock = play('1d5', [])
+	clock.advance(2 * SECOND)
+	core.run = False
+	clock.advance(MINUTE)
+	core.run = True
+	assert core.deadline == clock.now() + 3 * SECOND + MINUTE
+	clock.advance(3 * SECOND + MINUTE)
+	assert core.flagged[Side.L]
+
+
+def test_hourglass():
+	core, clock = play('hourglass:1', [10 * SECOND, 5 * SECOND])
+	assert core.times == {Side.L: 45 * SECOND, Side.R: 75 * SECOND}
+	clock.advance(MINUTE)
+	assert core.times == {Side.L: 0, Side.R: 2 * MINUTE}
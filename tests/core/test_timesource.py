@@ -0,0 +1,40 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import pytest
+
+from chessclock.common import Side, SECOND, MINUTE, HOUR
+from chessclock.config import Config
+from chessclock.core import Core, MonotonicClock, VirtualClock
+
+
+def test_monotonic_clock_never_goes_back():
+	clock = MonotonicClock()
+	readings = [clock.now() for _ in range(1000)]
+	assert readings == sorted(readings)
+
+
+def test_virtual_clock_only_moves_forward():
+	clock = VirtualClock(5)
+	assert clock.advance(10) == 15
+	clock.set(20)
+	assert clock.now() == 20
+	with pytest.raises(ValueError):
+		clock.advance(-1)
+	with pytest.raises(ValueError):
+		clock.set(19)
+
+
+def test_core_on_virtual_clock():
+	clock = VirtualClock()
+	core = Core(Config(time_seconds=2 * 3600, increment_l=30, increment_r=30), clock)
+	core.press(Side.R)
+	for _ in range(40):
+		clock.advance(MINUTE)
+		core.press(core.side)
+	assert core.half_moves == 40
+	assert core.times == {Side.L: 2 * HOUR - 20 * MINUTE + 20 * 30 * SECOND, Side.R: 2 * HOUR - 20 * MINUTE + 20 * 30 * SECOND}
+	assert core.side is Side.L
+	clock.advance(3 * HOUR)
+	assert core.flagged == {Side.L: True, Side.R: False}
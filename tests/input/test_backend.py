@@ -0,0 +1,118 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import sys
+import threading
+
+import pytest
+
+from chessclock.common import Side, SECOND
+from chessclock.config import Action, Config, Keymap
+from chessclock.config.keymap import Key
+from chessclock.core import CompactCore, Core, VirtualClock
+from chessclock.default_interface import DefaultInterface
+from chessclock.input import InputBackend, SyntheticDevice
+from chessclock.input.devices import KEY_DOWN, KEY_REPEAT, KEY_UP
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='needs pipes that select can wait for')
+
+KEY_A, KEY_L, KEY_SPACE, KEY_F1 = 30, 38, 57, 59
+
+
+def started(backend: InputBackend) -> threading.Event:
+	# set by the reader thread whenever it queues events
+	queued = threading.Event()
+	backend.wakeup = queued.set
+	backend.start()
+	return queued
+
+
+def test_synthetic_events():
+	device = SyntheticDevice()
+	device.emit(KEY_A, KEY_DOWN, 5 * SECOND + 1234)
+	device.emit(KEY_A, KEY_REPEAT, 6 * SECOND)
+	device.emit(KEY_A, KEY_UP, 7 * SECOND)
+	device.emit(KEY_F1, KEY_DOWN, 8 * SECOND)  # not a key the clock knows
+	device.press(KEY_SPACE, 9 * SECOND)
+	assert device.read() == [(Key.A, 5 * SECOND + 1000), (Key.SPACE, 9 * SECOND)]  # to the microsecond, as evdev
+	assert device.read() == []
+	device.close()
+
+
+def test_presses_are_dated_by_the_device():
+	clock = VirtualClock()
+	core = Core(Config(time_seconds=60), clock)
+	backend = InputBackend()
+	device = SyntheticDevice()
+	backend.add_device(device, Keymap(key_press_l=Key.A, key_press_r=Key.L), core)
+	queued = started(backend)
+	try:
+		core.press(Side.R)  # the left side starts
+		clock.advance(5 * SECOND)
+		device.press(KEY_A, clock.time)
+		clock.advance(SECOND)  # a slow frame, before the press is dispatched
+		assert queued.wait(5)
+		assert backend.dispatch() == 1 and not backend.queue
+		assert core.stamp == 5 * SECOND and core.side is Side.R
+		assert core.times == {Side.L: 55 * SECOND, Side.R: 59 * SECOND}
+		# a press cannot be dated before the clock was last read : that time was already counted
+		queued.clear()
+		device.press(KEY_L, 5 * SECOND)
+		assert queued.wait(5)
+		backend.dispatch()
+		assert core.stamp == 6 * SECOND and core.side is Side.L
+	finally:
+		backend.close()
+
+
+def test_devices_have_keymaps_and_boards_of_their_own(monkeypatch):
+	monkeypatch.setattr('sys.argv', ['chessclock', '-t', '01:00'])
+	clock = VirtualClock()
+	interface = DefaultInterface()
+	interface.core.set_time_source(clock)
+	boards = [interface, Core(Config(time_seconds=60), clock), CompactCore(Config(time_seconds=60), clock)]
+	backend = InputBackend()
+	devices = [SyntheticDevice(f'board {b}') for b in range(len(boards))]
+	for device, board in zip(devices, boards):
+		keymap = Keymap(key_press_l=Key.L, key_press_r=Key.A)  # the same keys, on each device
+		keymap.remap(Key.SPACE, Action.RESET)
+		backend.add_device(device, keymap, board)
+	queued = started(backend)
+	try:
+		for b, device in enumerate(devices):
+			device.press(KEY_L, (b + 1) * SECOND)  # the right side of every board starts
+		clock.advance(10 * SECOND)
+		devices[1].press(KEY_A, 4 * SECOND)
+		devices[2].press(KEY_SPACE, 10 * SECOND)
+		while len(backend.queue) + backend.dispatched < 5:
+			assert queued.wait(5)
+			queued.clear()
+		assert backend.dispatch() == 5
+		core = interface.core
+		assert (core.side, core.stamp) == (Side.R, SECOND)
+		assert (boards[1].side, boards[1].stamp, boards[1].times[Side.R]) == (Side.L, 4 * SECOND, 58 * SECOND)
+		assert not boards[2].run and boards[2].side is None  # reset
+	finally:
+		backend.close()
+
+
+def test_presses_of_devices_read_together_are_applied_in_order():
+	clock = VirtualClock()
+	core = Core(Config(time_seconds=60), clock)
+	backend = InputBackend()
+	right, left = SyntheticDevice('right pedal'), SyntheticDevice('left pedal')  # read in that order
+	backend.add_device(right, Keymap(key_press_l=Key.L, key_press_r=Key.A), core)
+	backend.add_device(left, Keymap(key_press_l=Key.A, key_press_r=Key.L), core)
+	try:
+		core.press(Side.R)  # the left side starts
+		clock.advance(5 * SECOND)
+		right.press(KEY_A, 3 * SECOND)
+		left.press(KEY_A, 2 * SECOND)  # before the right side, on the device read last
+		assert backend.poll(1) == 2
+		assert [event.stamp for event in backend.queue] == [2 * SECOND, 3 * SECOND]
+		backend.dispatch()
+		assert (core.half_moves, core.side, core.stamp) == (2, Side.L, 3 * SECOND)
+		assert core.times == {Side.L: 58 * SECOND - 2 * SECOND, Side.R: 59 * SECOND}
+	finally:
+		backend.close()
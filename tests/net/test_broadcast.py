@@ -0,0 +1,97 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import asyncio
+import threading
+
+from chessclock.common import Side, SECOND
+from chessclock.config import Config
+from chessclock.core import Core, VirtualClock
+from chessclock.net import BoardState, BroadcastServer, Spectator, board_state, decode_frame, encode_frame, encode_update
+from chessclock.net.protocol import LENGTH
+from chessclock.net.server import Subscriber
+
+
+def test_delta_encoding():
+	a = BoardState(60 * SECOND, 60 * SECOND, 0, 0, 0)
+	b = a._replace(time_l=59 * SECOND, side=2, running=1)
+	assert len(encode_update(3, a, b)) < len(encode_update(3, None, b))
+	assert encode_update(3, b, b) == b''
+	states = {}
+	frame = encode_frame([encode_update(3, None, a), encode_update(3, a, b)])
+	assert decode_frame(frame[LENGTH.size:], states) == {3}
+	assert states == {3: b}
+
+
+class FakeTransport(asyncio.WriteTransport):
+	def __init__(self):
+		super().__init__()
+		self.frames: list[bytes] = []
+
+	def set_write_buffer_limits(self, high=None, low=None):
+		pass
+
+	def write(self, data):
+		self.frames.append(data)
+
+
+def apply(frames: list[bytes], states: dict) -> None:
+	for frame in frames:
+		decode_frame(frame[LENGTH.size:], states)
+
+
+def test_slow_subscriber_catches_up():
+	clock = VirtualClock()
+	cores = [Core(Config(), clock) for _ in range(3)]
+
+	async def scenario():
+		server = BroadcastServer(cores)
+		server._bind_loop()
+		await asyncio.sleep(0)
+		fast, slow = Subscriber(server), Subscriber(server)
+		fast.connection_made(FakeTransport())
+		slow.connection_made(FakeTransport())
+		slow.pause_writing()
+		for _ in range(10):
+			clock.advance(SECOND)
+			cores[1].press(Side.L)
+			await asyncio.sleep(0)
+		assert len(slow.transport.frames) == 1  # only the initial snapshot
+		assert len(fast.transport.frames) == 11
+		server.attach(Core(Config(), clock))
+		slow.resume_writing()
+		await asyncio.sleep(0)
+		assert len(slow.transport.frames) == 2  # every missed change in a single frame
+		for subscriber in (fast, slow):
+			states = {}
+			apply(subscriber.transport.frames, states)
+			assert states == {b: board_state(c) for b, c in enumerate(server.cores)}
+
+	asyncio.run(scenario())
+
+
+def test_spectators_follow_cores(tmp_path):
+	clock = VirtualClock()
+	cores = [Core(Config(), clock) for _ in range(4)]
+
+	async def scenario():
+		server = BroadcastServer(cores)
+		path = await server.start_unix(str(tmp_path / 'clock.sock'))
+		spectators = [await Spectator.connect_unix(path) for _ in range(5)]
+		for s in spectators:
+			await s.receive()
+		# operate the clocks from another thread, like the user interface does
+		thread = threading.Thread(target=lambda: [c.press(Side.R) for c in cores] + [cores[2].add_time(Side.L, 30)])
+		thread.start()
+		thread.join()
+		expected = {b: board_state(c) for b, c in enumerate(cores)}
+		for s in spectators:
+			while s.boards != expected:
+				await asyncio.wait_for(s.receive(), 1)
+			assert s.boards[2].active_side is Side.L
+			assert s.times(2)[Side.L] <= 630 * SECOND
+			await s.close()
+		await server.close()
+
+	asyncio.run(scenario())
@@ -0,0 +1,65 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import threading
+
+from chessclock.common import Side, SECOND
+from chessclock.config import Config
+from chessclock.core import Core, VirtualClock
+from chessclock.net import BoardState, SharedStateExporter, SharedStateReader, board_state
+from chessclock.net.shm import BODY, HEADER, SEQUENCE, SLOT
+
+
+def test_export_follows_cores():
+	clock = VirtualClock()
+	cores = [Core(Config(time_seconds=60), clock) for _ in range(3)]
+	exporter = SharedStateExporter(cores)
+	reader = SharedStateReader(exporter.name)
+	try:
+		assert reader.boards == 3
+		assert reader.poll(1).state == board_state(cores[1])
+		assert reader.poll(1) is None
+		cores[1].press(Side.L)
+		clock.advance(5 * SECOND)
+		snapshot = reader.poll(1)
+		assert snapshot.state == BoardState(60 * SECOND, 60 * SECOND, Side.R.value, 1, 0)
+		assert reader.times(snapshot, clock.now())[Side.R] == 55 * SECOND
+		assert reader.read(0).state == board_state(cores[0])
+	finally:
+		reader.close()
+		exporter.close()
+	assert not cores[1].observers
+
+
+def test_reader_never_sees_torn_writes():
+	exporter = SharedStateExporter(Core())
+	reader = SharedStateReader(exporter.name)
+	buf = exporter.shm.buf
+	SEQUENCE.pack_into(buf, HEADER.size, 0)
+	BODY.pack_into(buf, HEADER.size + SEQUENCE.size, 0, 0, 0, 0, 0, 0)
+	stop = threading.Event()
+
+	def write():
+		# every field of a consistent write holds the same value
+		n = 0
+		while not stop.is_set():
+			n += 1
+			SEQUENCE.pack_into(buf, HEADER.size, 2 * n - 1)
+			BODY.pack_into(buf, HEADER.size + SEQUENCE.size, n, n, n, n % 256, n % 256, n)
+			SEQUENCE.pack_into(buf, HEADER.size, 2 * n)
+
+	writer = threading.Thread(target=write)
+	writer.start()
+	try:
+		for _ in range(20_000):
+			snapshot = reader.read(retries=10 ** 6)
+			n = snapshot.stamp
+			assert snapshot.sequence == 2 * n
+			assert snapshot.state[:2] == (n, n) and snapshot.state.half_moves == n
+	finally:
+		stop.set()
+		writer.join()
+		reader.close()
+		exporter.close()
+	assert SLOT >= SEQUENCE.size + BODY.size
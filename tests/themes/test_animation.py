@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import pytest
+
+from chessclock.common import Side, SECOND
+from chessclock.themes import AnimatedTheme, ColorRamp, Keyframe, EASINGS
+from chessclock.themes.extensions.neon import Neon
+from chessclock.ui.redraw import RedrawScheduler
+
+RED, GREEN, BLUE = (255, 0, 0), (0, 255, 0), (0, 0, 255)
+
+
+def test_ramp_shows_keyframes_at_their_phase():
+	ramp = ColorRamp([Keyframe(0, RED), Keyframe(0.25, GREEN), Keyframe(0.5, BLUE)], 4 * SECOND, steps=8)
+	assert ramp.sample(0) == (*RED, 255)
+	assert ramp.sample(SECOND) == (*GREEN, 255)
+	assert ramp.sample(2 * SECOND) == (*BLUE, 255)
+	assert ramp.sample(3 * SECOND) == (128, 0, 128, 255)  # halfway back to the first keyframe
+	assert ramp.sample(4 * SECOND) == ramp.sample(0)
+	assert ramp.step_ns == SECOND // 2
+
+
+def test_ramp_wraps_before_first_keyframe():
+	ramp = ColorRamp([Keyframe(0.5, RED)], SECOND, steps=4)
+	assert set(ramp.colors) == {(*RED, 255)}
+	ramp = ColorRamp([Keyframe(0.25, RED), Keyframe(0.75, BLUE)], SECOND, steps=4)
+	assert ramp.colors == ((128, 0, 128, 255), (*RED, 255), (128, 0, 128, 255), (*BLUE, 255))
+
+
+def test_easings():
+	for name, ease in EASINGS.items():
+		assert ease(0) == 0
+		if name != 'step':
+			assert ease(1) == 1
+	ramp = ColorRamp([Keyframe(0, (0, 0, 0)), Keyframe(0.5, (200, 200, 200))], SECOND, 'step', steps=4)
+	assert [c[0] for c in ramp.colors] == [0, 0, 200, 200]
+
+
+def test_invalid_ramps():
+	with pytest.raises(ValueError):
+		ColorRamp([], SECOND)
+	with pytest.raises(ValueError):
+		ColorRamp([Keyframe(0.5, RED), Keyframe(0.25, BLUE)], SECOND)
+	with pytest.raises(ValueError):
+		ColorRamp([Keyframe(1, RED)], SECOND)
+	with pytest.raises(ValueError):
+		ColorRamp([Keyframe(0, (256, 0, 0))], SECOND)
+	with pytest.raises(KeyError):
+		ColorRamp([Keyframe(0, RED)], SECOND, 'bounce')
+
+
+def test_neon_goes_back_and_forth():
+	theme = Neon(period_ns=4 * SECOND)
+	colors = []
+	for frame in range(0, 12 * SECOND, SECOND):
+		theme.set_frame(frame)
+		colors.append(theme.get_text_color(True, True, 0))
+	assert colors[0] == (0xB2, 0x0F, 0x3D, 255)
+	assert colors[2] == (0x33, 0xCC, 0x33, 255)
+	assert colors[:4] == colors[4:8] == colors[8:]
+	assert all(0 <= c <= 255 for rgba in colors for c in rgba)
+	theme.set_frame(SECOND)
+	assert theme.rgb_meta(False, False, 0) == tuple(c ^ 0xff for c in theme.rgb_foreground(False, False, 0))
+
+
+def test_labels_share_the_frame_time():
+	a, b = Neon(), Neon()
+	a.set_frame(1234567890)
+	b.set_frame(1234567890)
+	assert a.get_text_color(True, True, 0) == b.get_text_color(False, False, SECOND)
+
+
+def test_theme_without_ramps_keeps_its_colors():
+	class Static(AnimatedTheme):
+		pass
+
+	theme = Static()
+	assert theme.get_back_color(True, True, 0) == (0, 48, 0, 255)
+	assert theme.get_meta_color(True, True, 0) == (255, 255, 255, 255)
+	theme.foreground = ColorRamp([Keyframe(0, RED), Keyframe(0.5, BLUE)], SECOND)
+	for frame in (0, SECOND // 2):
+		theme.set_frame(frame)
+		assert theme.get_meta_color(False, True, 0) == theme.get_text_color(False, True, 0)
+		assert theme.get_back_color(False, True, 0) == (32, 32, 32, 255)
+
+
+def test_redraw_follows_ramp_steps():
+	theme = Neon(period_ns=60 * SECOND)
+	scheduler = RedrawScheduler(theme, animation_interval_ns=SECOND // 30)
+	assert scheduler.next_delay_ns({Side.L: 0, Side.R: 0}, None, False) == 60 * SECOND // 240
@@ -0,0 +1,35 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import random
+
+from chessclock.common import CENT, HOUR
+from chessclock.themes import Theme, TimeFormatter
+
+
+class MilliTheme(Theme):
+	def format_time(self, ns: int) -> str:
+		return f'{ns // 10 ** 6}ms'
+
+
+def test_formatter_matches_theme():
+	theme = Theme()
+	formatter = TimeFormatter(theme, maxsize=64)
+	values = [random.randint(0, 3 * HOUR) for _ in range(10000)]
+	assert formatter.times(values) == [theme.format_time(v) for v in values]
+	for v in values[:1000]:
+		assert formatter.time(v) == theme.format_time(v)
+		assert formatter.incr(v) == theme.format_incr(v)
+		assert formatter.time_control(v, v % (30 * CENT)) == theme.format_time_control(v, v % (30 * CENT))
+	assert all(len(cache) <= 64 for cache in formatter._time.values())
+
+
+def test_formatter_falls_back_on_overridden_methods():
+	theme = MilliTheme()
+	formatter = TimeFormatter(theme)
+	assert not formatter.caches_time
+	for v in (1_234_567_890, 1_235_567_890):
+		assert formatter.time(v) == theme.format_time(v)
+		assert formatter.times([v]) == [theme.format_time(v)]
+		assert formatter.time_control(v, CENT) == theme.format_time_control(v, CENT)
@@ -0,0 +1,83 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import os
+import subprocess
+import sys
+
+from chessclock.themes import DataTheme, Theme
+from chessclock.themes import index
+from chessclock.themes.index import ThemeEntry, find_themes
+
+PLUGIN = '''
+from chessclock.themes import Theme
+
+
+class Venue(Theme):
+	pass
+'''
+
+
+def install_plugin(site, version: str) -> None:
+	(site / 'venue_themes.py').write_text(PLUGIN)
+	info = site / f'venue_themes-{version}.dist-info'
+	info.mkdir()
+	(info / 'METADATA').write_text(f'Metadata-Version: 2.1\nName: venue_themes\nVersion: {version}\n')
+	(info / 'entry_points.txt').write_text('[chessclock.themes]\nvenue = venue_themes:Venue\n')
+
+
+def test_builtin_themes_are_found(tmp_path):
+	entries = {e.name: e for e in find_themes(tmp_path / 'themes.json')}
+	assert entries['neon'] == ThemeEntry('neon', 'chessclock.themes.extensions.neon:Neon')
+	assert entries['alarm'].data
+	assert isinstance(entries['alarm'].load(), DataTheme)
+	assert entries['neon'].load().get_theme_name() == 'neon'
+
+
+def test_cached_index_is_reused(tmp_path, monkeypatch):
+	path = tmp_path / 'themes.json'
+	entries = find_themes(path)
+	assert path.exists()
+
+	def fail():
+		raise AssertionError('the index was rebuilt')
+
+	monkeypatch.setattr(index, 'build_index', fail)
+	assert find_themes(path) == entries
+
+
+def test_outdated_or_broken_index_is_rebuilt(tmp_path):
+	path = tmp_path / 'themes.json'
+	entries = find_themes(path)
+	path.write_text(path.read_text().replace('"key": [[', '"key": [["nowhere", 0], ['))
+	assert find_themes(path) == entries
+	path.write_text('{')
+	assert find_themes(path) == entries
+
+
+def test_entry_point_themes(tmp_path, monkeypatch):
+	site = tmp_path / 'site'
+	site.mkdir()
+	monkeypatch.syspath_prepend(str(site))
+	path = tmp_path / 'themes.json'
+	assert 'venue' not in (e.name for e in find_themes(path))
+	os.utime(site, ns=(0, 0))  # installing the package changes the modification time of its directory
+	install_plugin(site, '1.2')
+	entries = {e.name: e for e in find_themes(path)}
+	assert entries['venue'] == ThemeEntry('venue', 'venue_themes:Venue', 'venue_themes 1.2')
+	assert 'venue_themes' not in sys.modules
+	assert isinstance(entries['venue'].load(), Theme)
+
+
+def test_listing_themes_imports_none(tmp_path):
+	code = (
+		"import sys; from chessclock.themes import list_themes, get_theme; "
+		"assert {'neon', 'alarm'} <= set(list_themes()); "
+		"assert 'chessclock.themes.extensions.neon' not in sys.modules; "
+		"assert get_theme('neon').get_theme_name() == 'neon'"
+	)
+	env = dict(os.environ, XDG_CACHE_HOME=str(tmp_path))
+	for _ in range(2):  # building the index, then reading it
+		subprocess.run([sys.executable, '-c', code], env=env, check=True)
+	assert (tmp_path / 'chessclock' / 'themes.json').exists()
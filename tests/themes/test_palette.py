@@ -0,0 +1,54 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+from pathlib import Path
+
+from chessclock.common import SECOND, MINUTE
+from chessclock.themes import DataTheme, Palette, Theme, compile_theme
+from chessclock.themes.extensions import Neon
+
+
+class LowTime(Theme):
+	time_buckets = (10 * SECOND,)
+
+	def rgb_background(self, is_current: bool, is_running: bool, time_left_ns: int) -> tuple[int, int, int]:
+		if is_current and time_left_ns < 10 * SECOND:
+			return 255, 0, 0
+		return super().rgb_background(is_current, is_running, time_left_ns)
+
+
+class Undeclared(LowTime):
+	time_buckets = None
+
+
+def test_compiled_palette_matches_theme():
+	for theme in (Theme(), LowTime()):
+		palette = compile_theme(theme)
+		assert isinstance(palette, Palette)
+		for is_current in (False, True):
+			for is_running in (False, True):
+				for t in (0, SECOND, 10 * SECOND - 1, 10 * SECOND, MINUTE):
+					assert palette.colors(is_current, is_running, t) == (
+						theme.get_back_color(is_current, is_running, t),
+						theme.get_text_color(is_current, is_running, t),
+						theme.get_meta_color(is_current, is_running, t),
+					)
+
+
+def test_classic_themes_are_not_compiled():
+	assert compile_theme(Neon()) is None
+	assert compile_theme(Undeclared()) is None
+
+
+def test_data_theme(tmp_path: Path):
+	path = tmp_path / 'warning.json'
+	path.write_text('{"thresholds": [10], "background": {"current_running": ["#ff0000", "#003000"]}, "meta": {"default": [1, 2, 3]}}')
+	theme = DataTheme.load(path)
+	assert theme.name == 'warning'
+	assert compile_theme(theme) is theme.palette
+	assert theme.get_back_color(True, True, SECOND) == (255, 0, 0, 255)
+	assert theme.get_back_color(True, True, MINUTE) == (0, 48, 0, 255)
+	assert theme.get_back_color(False, False, MINUTE) == Theme().get_back_color(False, False, MINUTE)
+	assert theme.get_meta_color(False, True, 0) == (1, 2, 3, 255)
+	assert theme.get_text_color(True, False, 0) == (255, 255, 255, 255)
@@ -0,0 +1,50 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import os
+import subprocess
+import sys
+from textwrap import dedent
+
+import pytest
+
+# rendered offscreen in a process of its own, as pyglet's headless mode must be set before any window is created
+RENDER = dedent('''
+	import sys
+	import pyglet
+	pyglet.options['headless'] = True
+	try:
+		window = pyglet.window.Window(400, 200)
+	except Exception:
+		sys.exit(77)  # no EGL display
+	from chessclock.ui.digits import DigitLabel
+
+	def render(make):
+		window.clear()
+		batch = pyglet.graphics.Batch()
+		label = make(batch)
+		batch.draw()
+		pixels = bytes(pyglet.image.get_buffer_manager().get_color_buffer().get_image_data().get_data('RGBA', 1600))
+		label.delete()
+		return pixels
+
+	kwargs = dict(x=200, y=100, font_name='monospace', font_size=40, anchor_x='center', color=(200, 120, 30, 255))
+	window.switch_to()
+	digits = DigitLabel('-9.99', **kwargs)
+	sprites = list(digits._sprites)
+	for text in ('-9.98', '10.00', '59:59', '1:00:00', '12:34'):
+		digits.text = text
+	assert digits._sprites[:5] == sprites, 'sprites are reused'
+	expected = render(lambda batch: pyglet.text.Label('12:34', batch=batch, **kwargs))
+	assert render(lambda batch: DigitLabel('12:34', batch=batch, **kwargs)) == expected, 'same pixels as a label'
+	assert any(expected[0::4]), 'something was drawn'
+''')
+
+
+def test_digits_draw_like_labels():
+	env = dict(os.environ, PYGLET_SHADOW_WINDOW='0')
+	result = subprocess.run([sys.executable, '-c', RENDER], env=env, capture_output=True, text=True)
+	if result.returncode == 77:
+		pytest.skip('headless rendering unavailable')
+	assert result.returncode == 0, result.stderr
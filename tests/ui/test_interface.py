@@ -0,0 +1,84 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import pytest
+
+from chessclock.common import Side, SECOND
+from chessclock.core import VirtualClock
+from chessclock.default_interface import DefaultInterface
+from chessclock.ui.interface import ClockState, Interface
+
+
+class CountingClock(VirtualClock):
+	# a virtual clock moving forward on every read, counting reads
+
+	def __init__(self):
+		super().__init__()
+		self.reads = 0
+
+	def now(self) -> int:
+		self.reads += 1
+		return self.advance(1000)
+
+
+class GetterInterface(Interface):
+	# implements the getters only, as interfaces did before snapshots
+
+	def get_base_time_ns(self) -> dict[Side, int]:
+		return {Side.L: 60 * SECOND, Side.R: 90 * SECOND}
+
+	def get_increment_ns(self) -> dict[Side, int]:
+		return {Side.L: 0, Side.R: 2 * SECOND}
+
+	def get_current_times_ns(self) -> dict[Side, int]:
+		return {Side.L: 59 * SECOND, Side.R: 90 * SECOND}
+
+	def get_current_side(self) -> Side | None:
+		return Side.L
+
+	def is_running(self) -> bool:
+		return True
+
+
+def test_snapshot_reads_time_once(monkeypatch):
+	monkeypatch.setattr('sys.argv', ['chessclock', '-l', '01:00', '-r', '01:30', '-T', '2'])
+	interface = DefaultInterface()
+	clock = CountingClock()
+	interface.core.set_time_source(clock)
+	interface.press_R()
+	reads = clock.reads
+	state = interface.snapshot()
+	assert clock.reads == reads + 1
+	assert state.stamp == interface.get_last_update_ns()
+	assert state.side is Side.L and state.running
+	assert state.time(Side.L) == 60 * SECOND - 1000 and state.time_r == 90 * SECOND  # one read since the press
+	assert (state.base(Side.L), state.base(Side.R), state.increment(Side.R)) == (60 * SECOND, 90 * SECOND, 2 * SECOND)
+	with pytest.raises(AttributeError):
+		state.time_l = 0
+	assert not hasattr(state, '__dict__')
+	# the getters are views of a snapshot
+	assert interface.get_base_time_ns() == {Side.L: 60 * SECOND, Side.R: 90 * SECOND}
+	assert interface.get_current_side() is Side.L and interface.is_running()
+
+
+def test_snapshot_shows_the_bonus_of_the_next_move(monkeypatch):
+	monkeypatch.setattr('sys.argv', ['chessclock', '--control-l', '10d5', '--control-r', '2/10+3,5+7'])
+	interface = DefaultInterface()
+	interface.core.set_time_source(VirtualClock())
+	state = interface.snapshot()
+	assert (state.increment(Side.L), state.increment(Side.R)) == (5 * SECOND, 3 * SECOND)  # a delay, a first stage
+	for _ in range(2):
+		interface.press_L()
+		interface.press_R()  # a move of the right side
+	assert interface.snapshot().increment(Side.R) == 7 * SECOND  # the second stage
+
+
+def test_getters_make_a_snapshot():
+	assert GetterInterface().snapshot() == ClockState(
+		59 * SECOND, 90 * SECOND, Side.L, True, 60 * SECOND, 90 * SECOND, 0, 2 * SECOND, None,
+	)
+	with pytest.raises(NotImplementedError):
+		Interface().snapshot()
+	with pytest.raises(NotImplementedError):
+		Interface().get_current_times_ns()
@@ -0,0 +1,43 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import random
+
+from chessclock.common import RollingHistogram
+from chessclock.core import VirtualClock
+from chessclock.ui.latency import LatencyProbe, Stage
+
+
+def test_histogram_percentiles_are_close_upper_bounds():
+	h = RollingHistogram(window=10000)
+	samples = [random.randint(0, 10 ** 9) for _ in range(10000)]
+	for s in samples:
+		h.record(s)
+	ordered = sorted(samples)
+	for p in (1, 50, 90, 99, 100):
+		exact = ordered[max(1, -(-len(ordered) * p // 100)) - 1]
+		assert exact <= h.percentile(p) <= exact * (1 + 1 / h.sub_buckets) + 1
+
+
+def test_histogram_rolls():
+	h = RollingHistogram(window=4)
+	for s in (1000, 1000, 1000, 1000, 1, 2, 3, 4):
+		h.record(s)
+	assert h.count == 4
+	assert h.percentile(100) == 4
+
+
+def test_probe_stages():
+	clock = VirtualClock()
+	probe = LatencyProbe(clock)
+	probe.key_event()
+	clock.advance(100)
+	stamp = clock.now()
+	clock.advance(50)
+	probe.dispatched(stamp)
+	clock.advance(1000)
+	assert probe.shown()
+	assert not probe.shown()
+	for stage, latency in ((Stage.STAMPED, 100), (Stage.DISPATCHED, 150), (Stage.SHOWN, 1150)):
+		assert latency <= probe.percentiles(stage, (50,))[50] <= latency * 17 // 16
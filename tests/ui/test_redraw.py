@@ -0,0 +1,71 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import pytest
+
+from chessclock.common import Side, CENT, SECOND, MINUTE, HOUR
+from chessclock.themes import Theme
+from chessclock.themes.extensions import Neon
+from chessclock.ui.redraw import RedrawScheduler
+
+
+def test_next_delay_matches_displayed_precision():
+	theme = Theme()
+	scheduler = RedrawScheduler(theme)
+	for ns in (5 * MINUTE + 3 * SECOND + 7, MINUTE, MINUTE - 1, 12 * SECOND + 3 * CENT + 42, 1):
+		times = {Side.L: ns, Side.R: 0}
+		delay = scheduler.next_delay_ns(times, Side.L, True)
+		assert theme.format_time(ns - delay + 1) == theme.format_time(ns)
+		assert theme.format_time(ns - delay) != theme.format_time(ns)
+
+
+def test_no_redraw_when_idle():
+	scheduler = RedrawScheduler(Theme())
+	times = {Side.L: MINUTE, Side.R: MINUTE}
+	assert scheduler.next_delay_ns(times, Side.L, False) is None
+	assert scheduler.next_delay_ns(times, None, True) is None
+	assert scheduler.next_delay_ns({Side.L: 0, Side.R: MINUTE}, Side.L, True) is None
+
+
+def test_animated_theme_keeps_redrawing():
+	scheduler = RedrawScheduler(Neon(), animation_interval_ns=SECOND // 30)
+	assert scheduler.next_delay_ns({Side.L: MINUTE, Side.R: MINUTE}, None, False) == SECOND // 30
+
+
+def frames_per_hour(scheduler: RedrawScheduler, ns: int, is_running: bool) -> list[int]:
+	# the times left at which the display is redrawn during an hour, the left side counting down from ns
+	shown, elapsed = [], 0
+	while elapsed < HOUR:
+		delay = scheduler.next_delay_ns({Side.L: ns - elapsed, Side.R: MINUTE}, Side.L, is_running)
+		if delay is None or elapsed + delay >= HOUR:
+			break
+		elapsed += delay
+		shown.append(ns - elapsed)
+	return shown
+
+
+def test_adaptive_redraws_on_second_boundaries():
+	shown = frames_per_hour(RedrawScheduler(Theme()), 2 * HOUR + 250 * CENT, True)
+	assert len(shown) == 3600
+	assert all(ns % SECOND == SECOND - 1 for ns in shown)  # right after each second begins to show
+	assert frames_per_hour(RedrawScheduler(Theme()), 30 * SECOND, True)[:5] == [
+		30 * SECOND - 1 - i * CENT for i in range(5)
+	]
+
+
+def test_low_power_policy():
+	scheduler = RedrawScheduler(Theme(), policy='low-power')
+	assert len(frames_per_hour(scheduler, 2 * HOUR, True)) == 3600
+	shown = frames_per_hour(scheduler, MINUTE - 35 * CENT, True)
+	assert shown[:3] == [MINUTE - 40 * CENT - 1, MINUTE - 50 * CENT - 1, MINUTE - 60 * CENT - 1]
+	# paused : nothing to redraw, animated or not
+	assert RedrawScheduler(Neon(), policy='low-power').next_delay_ns({Side.L: MINUTE, Side.R: MINUTE}, None, False) is None
+	assert RedrawScheduler(Neon(), policy='low-power').animation_interval_ns >= SECOND // 10
+
+
+def test_fixed_policy():
+	scheduler = RedrawScheduler(Theme(), policy='fixed')
+	assert scheduler.next_delay_ns({Side.L: MINUTE, Side.R: MINUTE}, None, False) == SECOND // 30
+	with pytest.raises(ValueError):
+		RedrawScheduler(Theme(), policy='turbo')
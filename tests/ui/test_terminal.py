@@ -0,0 +1,147 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import os
+import select
+import sys
+import time
+
+import pytest
+
+from chessclock.common import Side, SECOND
+from chessclock.config import Config
+from chessclock.config.keymap import Key
+from chessclock.core import Core, VirtualClock
+from chessclock.ui.interface import Interface
+from chessclock.ui.terminal import TerminalUI, big_text, changed_span, key_symbol, terminal_color
+
+
+class CoreInterface(Interface):
+
+	def __init__(self, core: Core):
+		self.core = core
+
+	def get_base_time_ns(self) -> dict[Side, int]:
+		return {Side.L: self.core.config.time_l * SECOND, Side.R: self.core.config.time_r * SECOND}
+
+	def get_increment_ns(self) -> dict[Side, int]:
+		return {Side.L: self.core.config.increment_l * SECOND, Side.R: self.core.config.increment_r * SECOND}
+
+	def get_current_times_ns(self) -> dict[Side, int]:
+		return self.core.times
+
+	def get_current_side(self) -> Side | None:
+		return self.core.side
+
+	def is_running(self) -> bool:
+		return self.core.run
+
+
+class Screen:
+	# records what is written instead of writing it to a terminal
+
+	def __init__(self):
+		self.writes: list[tuple[int, int, str]] = []
+
+	def addstr(self, y: int, x: int, text: str, attr: int) -> None:
+		self.writes.append((y, x, text))
+
+	def refresh(self) -> None:
+		pass
+
+
+def test_terminal_colors():
+	assert terminal_color((0, 0, 0, 255), 256) == 16
+	assert terminal_color((255, 255, 255), 256) == 231
+	assert terminal_color((255, 0, 0), 256) == 196
+	assert terminal_color((128, 128, 128), 256) == 244
+	assert terminal_color((250, 10, 10), 8) == 1
+	assert terminal_color((250, 250, 250), 8) == 7
+	assert terminal_color((250, 250, 250), 16) == 15
+
+
+def test_keys():
+	assert key_symbol(ord('A')) == key_symbol(ord('a')) == Key.A
+	assert key_symbol(ord(' ')) == Key.SPACE
+	assert key_symbol(10) == Key.ENTER
+	assert key_symbol(27) == Key.ESCAPE
+	assert key_symbol(0x1ff) is None
+
+
+def test_big_text():
+	rows = big_text('1:00', 100, 12)
+	assert len(rows) == 10 and {len(r) for r in rows} == {(4 * 4 - 1) * 4}
+	assert big_text('1:00', 15, 5) == [
+		'  █     ███ ███',
+		'  █  █  █ █ █ █',
+		'  █     █ █ █ █',
+		'  █  █  █ █ █ █',
+		'  █     ███ ███',
+	]
+	assert big_text('1:00', 14, 5) == ['1:00']
+	assert big_text('10 min', 100, 100) == ['10 min']
+
+
+def test_changed_span():
+	assert changed_span('12:34', '12:34') is None
+	assert changed_span('12:34', '12:33') == (4, 5)
+	assert changed_span('12:34', '11:30') == (1, 5)
+
+
+def test_only_changed_cells_are_written(monkeypatch):
+	monkeypatch.setattr(TerminalUI, '_pair', lambda self, colors: 0)
+	clock = VirtualClock()
+	core = Core(Config(time_seconds=300), clock)
+	ui = TerminalUI(CoreInterface(core))
+	ui.screen = Screen()
+	ui.size = 24, 80
+	ui.draw()
+	assert len(ui.screen.writes) == 48 and ui.cell_updates == 24 * 80
+	ui.draw()
+	assert ui.cell_updates == 24 * 80  # nothing changed
+	core.press(Side.R)
+	clock.advance(SECOND)
+	ui.draw()  # the time controls are hidden on both sides
+	ui.screen.writes.clear()
+	updates = ui.cell_updates
+	clock.advance(SECOND)
+	ui.draw()  # 04:59 to 04:58 on the left : the cells of the last digit only
+	assert ui.screen.writes and all(x + len(text) <= 40 for _, x, text in ui.screen.writes)
+	assert ui.cell_updates - updates <= 5 * 6
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='needs a pseudo terminal')
+def test_terminal_frontend(tmp_path):
+	import pty
+	code = (
+		"import sys; sys.argv = ['chessclock', '--terminal', '-t', '00:45']; "
+		"import chessclock; chessclock.main(); "
+		"assert 'pyglet' not in sys.modules, 'the terminal frontend loads pyglet'"
+	)
+	pid, fd = pty.fork()
+	if pid == 0:
+		os.environ.update(TERM='xterm-256color', LINES='24', COLUMNS='80', XDG_CACHE_HOME=str(tmp_path))
+		os.execv(sys.executable, [sys.executable, '-c', code])
+
+	def output(seconds: float) -> bytes:
+		data, end = b'', time.monotonic() + seconds
+		while time.monotonic() < end:
+			if select.select([fd], [], [], 0.05)[0]:
+				try:
+					data += os.read(fd, 1 << 16)
+				except OSError:
+					break
+		return data
+
+	try:
+		assert output(2.0)  # the first frame
+		assert not output(1.0)  # paused : nothing to redraw
+		os.write(fd, b'l')
+		assert output(1.5)  # running : the left side counts down
+		os.write(fd, b'\x1b')
+		output(1.0)
+	finally:
+		_, status = os.waitpid(pid, 0)
+		os.close(fd)
+	assert os.waitstatus_to_exitcode(status) == 0
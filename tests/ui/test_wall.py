@@ -0,0 +1,55 @@
+# SPDX-FileCopyrightText: 2024 Boris Stefanovic <owldev@bluewin.ch>
+#
+# SPDX-License-Identifier: GPL-3.0-only
+
+import subprocess
+import sys
+
+import pytest
+
+from chessclock.common import Side, SECOND
+from chessclock.config import Config
+from chessclock.core import Core, CompactCore, VirtualClock
+from chessclock.ui.layout import board_reader, grid
+from chessclock.default_interface import DefaultInterface
+
+
+def test_readers_agree():
+	clock = VirtualClock()
+	cfg = Config(time_seconds=60, increment_seconds=2)
+	core, compact = Core(cfg, clock), CompactCore(cfg, clock)
+	read_core, read_compact = board_reader(core), board_reader(compact)
+	assert read_core() == read_compact() == (60 * SECOND, 60 * SECOND, None, False)
+	for board in (core, compact):
+		board.press(Side.R)
+	clock.advance(3 * SECOND)
+	assert read_core() == read_compact() == (57 * SECOND, 60 * SECOND, Side.L, True)
+	for board in (core, compact):
+		board.press(Side.L)
+		board.run = False
+	assert read_core() == read_compact() == (59 * SECOND, 60 * SECOND, Side.R, False)
+
+
+def test_interface_reader(monkeypatch):
+	monkeypatch.setattr('sys.argv', ['chessclock', '-t', '01:30'])
+	interface = DefaultInterface()
+	interface.core.set_time_source(VirtualClock())
+	assert board_reader(interface)() == (90 * SECOND, 90 * SECOND, None, False)
+	with pytest.raises(TypeError):
+		board_reader(object())
+
+
+def test_layout_loads_without_pyglet():
+	# pyglet connects to the display as soon as a window module is imported : these tests must run without one
+	code = "import sys, chessclock.ui.layout; assert 'pyglet' not in sys.modules"
+	subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_grid_fits_every_board():
+	for count in (1, 2, 7, 64, 500):
+		for width, height in ((1920, 1080), (1080, 1920), (800, 800)):
+			columns, rows = grid(count, width, height)
+			assert columns * rows >= count > columns * (rows - 1)
+	assert grid(500, 1920, 1080) == (19, 27)  # cells of 101 x 40 pixels
+	assert grid(10, 1920, 1080, columns=4) == (4, 3)
+	assert grid(3, 1920, 1080, columns=8) == (3, 1)